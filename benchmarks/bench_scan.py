@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Parallel directory scan.
+
+Generates a synthetic tree (once, reused between runs) and times
+scan_tree_parallel with an increasing number of workers.
+
+Usage:
+    python benchmarks/bench_scan.py [--files 1000000] [--root /tmp/aaa-bench-tree]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.file_scanner import scan_tree_parallel
+
+EXTENSIONS = [".txt", ".py", ".md", ".json", ".log", ".png", ""]
+FILES_PER_DIR = 100
+DIRS_PER_LEVEL = 100
+
+
+def generate_tree(root, files):
+    """
+    Create a tree of empty (sparse) files, 100 files per directory.
+
+    Args:
+        root: Directory to create the tree in.
+        files: Number of files to create.
+    """
+    marker = Path(root) / f".generated-{files}"
+    if marker.exists():
+        return
+
+    print(f"Generating {files} files in {root}...")
+    created = 0
+    index = 0
+    while created < files:
+        directory = Path(root) / f"d{index // DIRS_PER_LEVEL:04d}" / f"s{index % DIRS_PER_LEVEL:02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for i in range(min(FILES_PER_DIR, files - created)):
+            path = directory / f"f{i}{EXTENSIONS[i % len(EXTENSIONS)]}"
+            with open(path, "wb") as f:
+                f.truncate((created * 7919) % 1048576)
+            created += 1
+        index += 1
+
+    marker.touch()
+
+
+def time_scan(root, workers, mode):
+    """Run one scan and return (seconds, ScanStats)."""
+    start = time.perf_counter()
+    stats = scan_tree_parallel(root, workers=workers, mode=mode)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel directory scan benchmark")
+    parser.add_argument("--files", type=int, default=100000, help="Number of files (default: 100000)")
+    parser.add_argument("--root", default="/tmp/aaa-bench-tree", help="Tree location")
+    parser.add_argument("--mode", choices=["thread", "process"], default="process")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    root = os.path.join(args.root, str(args.files))
+    generate_tree(root, args.files)
+
+    # Warm the dentry/inode cache so all runs measure the same thing
+    time_scan(root, 1, args.mode)
+
+    workers = 1
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>10} {'files/s':>12} {'speedup':>8}")
+    while workers <= args.max_workers:
+        seconds, stats = time_scan(root, workers, args.mode)
+        baseline = baseline or seconds
+        print(f"{workers:>8} {seconds:>10.3f} {stats.total_files / seconds:>12.0f} {baseline / seconds:>8.2f}")
+        workers *= 2
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
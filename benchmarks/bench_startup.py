@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Cold start.
+
+Runs monitor.py in fresh interpreters and reports the median wall time of
+each scenario, plus the import time measured by python -X importtime and
+the slowest top-level imports.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--json startup.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MONITOR = Path(__file__).resolve().parent.parent / "monitor.py"
+
+# Scenario name -> monitor.py arguments (the output goes to a temp directory)
+SCENARIOS = {
+    "help": ["--help"],
+    "only_cpu_memory": ["--only", "cpu,memory"],
+    "one_shot": [],
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(arguments, workdir, importtime=False):
+    """
+    Run monitor.py once.
+
+    Returns:
+        Tuple (wall seconds, stderr text).
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += [str(MONITOR), *arguments]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(arguments)} failed: {completed.stdout[-500:]}{completed.stderr[-500:]}")
+    return seconds, completed.stderr
+
+
+def parse_importtime(stderr, top=5):
+    """
+    Summarize python -X importtime output.
+
+    Returns:
+        Tuple (total import microseconds, [(module, cumulative us)] of the
+        slowest top-level imports).
+    """
+    total = 0
+    roots = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:
+            total += cumulative
+            roots.append((module, cumulative))
+    roots.sort(key=lambda item: item[1], reverse=True)
+    return total, roots[:top]
+
+
+def bench_scenario(name, arguments, runs, workdir):
+    """Median wall time and import profile of one scenario."""
+    if "--help" not in arguments:
+        arguments = [*arguments, "--output", os.path.join(workdir, "index.html"),
+                     "--directory", workdir, "--state-dir", os.path.join(workdir, "state")]
+    # First run creates the saved CPU/network baselines, as any earlier run would
+    run_once(arguments, workdir)
+    times = [run_once(arguments, workdir)[0] for _ in range(runs)]
+    _seconds, stderr = run_once(arguments, workdir, importtime=True)
+    import_us, slowest = parse_importtime(stderr)
+    return {
+        "scenario": name,
+        "median_ms": round(statistics.median(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+        "import_ms": round(import_us / 1000, 1),
+        "slowest_imports": [{"module": module, "ms": round(us / 1000, 1)} for module, us in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="monitor.py cold start benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per scenario (default: 10)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios (default: {','.join(SCENARIOS)})")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="aaa-startup-") as workdir:
+        print(f"{'scenario':<18} {'median ms':>10} {'min ms':>8} {'imports ms':>11}  slowest imports")
+        for name in names:
+            result = bench_scenario(name, SCENARIOS[name], args.runs, workdir)
+            results.append(result)
+            slowest = ", ".join(f"{item['module']} {item['ms']:.0f}" for item in result["slowest_imports"][:3])
+            print(f"{name:<18} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f} "
+                  f"{result['import_ms']:>11.1f}  {slowest}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+        print(f"Results saved: {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
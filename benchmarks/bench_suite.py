@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Collectors, processing and rendering.
+
+Each case runs in its own subprocess (so peak RSS is per case) and reports
+wall time, tracemalloc allocations and peak RSS. Results are saved as JSON
+and compared against a saved baseline: a regression beyond the tolerance
+makes the run fail.
+
+Usage:
+    python benchmarks/bench_suite.py [--cases files_10k,render_large]
+    python benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+# Add project root for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_scan import generate_tree
+from src.api.html_generator import compile_template, generate_file
+from src.core.data_processor import get_template_variables
+from src.data.proc_backend import ProcBackend
+from src.data.snapshot_export import SnapshotExporter
+from src.data.snapshot_model import Snapshot
+from src.data.system_collector import ProcessSampler, collect_all, get_files_info, get_processes_info
+
+# Timing differences below this many seconds are noise, never regressions
+MIN_TIME_DELTA = 0.002
+
+METRICS = ("wall_s", "alloc_peak_bytes", "peak_rss_kb")
+
+
+# --- Cases ---
+# Each setup function returns (callable to measure, cleanup callable).
+
+def setup_files(files):
+    def setup(args):
+        root = os.path.join(args.root, str(files))
+        generate_tree(root, files)
+        return lambda: get_files_info(root), None
+    return setup
+
+
+def setup_processes(use_proc):
+    def setup(args):
+        sleep_binary = shutil.which("sleep")
+        command = [sleep_binary, "600"] if sleep_binary else [
+            sys.executable, "-c", "import time; time.sleep(600)"]
+        children = [subprocess.Popen(command) for _ in range(args.processes)]
+        sampler = ProcessSampler(use_proc=use_proc, prime_interval=0)
+
+        def cleanup():
+            for child in children:
+                child.kill()
+            for child in children:
+                child.wait()
+
+        return lambda: get_processes_info(top_n=10, sampler=sampler), cleanup
+    return setup
+
+
+def setup_counters(backend):
+    def setup(args):
+        # The counters read at each collection by get_cpu_info, get_memory_info,
+        # get_network_info and get_disk_info
+        source = ProcBackend() if backend == "proc" else psutil
+
+        def read():
+            source.cpu_times(percpu=True)
+            source.getloadavg()
+            source.cpu_count(logical=False)
+            source.virtual_memory()
+            source.swap_memory()
+            source.net_io_counters(pernic=True)
+            source.disk_io_counters(perdisk=True)
+            source.boot_time()
+
+        return read, getattr(source, "close", None)
+    return setup
+
+
+def make_raw_data(cores=256, interfaces=200, processes=50, extensions=100):
+    """Synthetic collect_all() data for a very large machine."""
+    return {
+        "timestamp": "2024-01-15 10:30:00",
+        "system": {"hostname": "bench", "uptime_formatted": "1d 2h"},
+        "cpu": {
+            "cpu_percent": 42.0,
+            "cpu_percent_per_core": [(i * 7) % 100 for i in range(cores)],
+            "physical_cores": cores // 2,
+            "logical_cores": cores,
+        },
+        "memory": {"percent": 60.0, "swap_percent": 5.0},
+        "disk": {"percent": 70.0},
+        "network": {
+            "interfaces": {f"eth{i}": f"10.0.{i // 256}.{i % 256}" for i in range(interfaces)},
+            "rates": {
+                f"eth{i}": {
+                    "bytes_sent_per_s_formatted": "1.0 KB/s",
+                    "bytes_recv_per_s_formatted": "2.0 KB/s",
+                    "packets_sent_per_s": 10.0,
+                    "packets_recv_per_s": 20.0,
+                    "errors_per_s": 0.0,
+                    "drops_per_s": 0.0,
+                }
+                for i in range(interfaces)
+            },
+        },
+        "processes": {
+            "total_count": 5000,
+            "top_n": processes,
+            "top_3_cpu": [{"pid": i, "name": f"proc{i}", "cpu_percent": 1.0, "memory_percent": 0.5}
+                          for i in range(processes)],
+            "top_3_memory": [{"pid": i, "name": f"proc{i}", "cpu_percent": 1.0, "memory_percent": 0.5}
+                             for i in range(processes)],
+        },
+        "files": {
+            "directory": "/data",
+            "total_files": 100000,
+            "by_extension": {f".e{i}": {"count": i, "size": i * 1000, "size_formatted": f"{i} KB",
+                                        "percentage": 0.1} for i in range(extensions)},
+            "top_5_largest": [],
+        },
+    }
+
+
+def setup_snapshots(compact, count=1000):
+    def setup(args):
+        # Held like FleetCollector holds agent payloads: alloc peak = count snapshots
+        payload = json.dumps(collect_all(files_directory=str(Path(__file__).parent)))
+        if compact:
+            return lambda: [Snapshot.from_dict(json.loads(payload)) for _ in range(count)], None
+        return lambda: [json.loads(payload) for _ in range(count)], None
+    return setup
+
+
+def setup_template_variables(args):
+    raw_data = make_raw_data()
+    return lambda: get_template_variables(raw_data), None
+
+
+def make_large_template(slots=5000, filler=200):
+    """A template of about 1 MB with thousands of slots."""
+    parts = []
+    for i in range(slots):
+        parts.append("<div class=\"row\">" + "x" * filler + f"{{{{var_{i % 500}}}}}</div>\n")
+    return "".join(parts)
+
+
+def setup_render(args):
+    template = compile_template(make_large_template())
+    variables = {f"var_{i}": f"value {i}" for i in range(500)}
+    return lambda: template.render(variables), None
+
+
+def setup_generate(args):
+    os.makedirs(args.root, exist_ok=True)
+    template_path = os.path.join(args.root, "large_template.html")
+    with open(template_path, "w", encoding="utf-8") as f:
+        f.write(make_large_template())
+    output_path = os.path.join(args.root, "large_page.html")
+    variables = {f"var_{i}": f"value {i}" for i in range(500)}
+    return lambda: generate_file(template_path, variables, output_path), None
+
+
+def setup_export(name):
+    def setup(args):
+        os.makedirs(args.root, exist_ok=True)
+        path = os.path.join(args.root, name)
+        if os.path.exists(path):
+            os.unlink(path)
+        raw_data = make_raw_data()
+        exporter = SnapshotExporter(path, keep=0)
+        return lambda: exporter.write(raw_data), exporter.close
+    return setup
+
+
+def setup_compile(args):
+    content = make_large_template()
+    return lambda: compile_template(content), None
+
+
+CASES = {
+    # name: (setup, default repeat)
+    "files_10k": (setup_files(10_000), 5),
+    "files_100k": (setup_files(100_000), 3),
+    "files_1m": (setup_files(1_000_000), 1),
+    "processes_psutil": (setup_processes(False), 5),
+    "processes_proc": (setup_processes(True), 5),
+    "counters_psutil": (setup_counters("psutil"), 200),
+    "counters_proc": (setup_counters("proc"), 200),
+    "template_variables": (setup_template_variables, 20),
+    "render_large": (setup_render, 20),
+    "generate_large": (setup_generate, 20),
+    "compile_large": (setup_compile, 10),
+    "export_jsonl": (setup_export("bench.jsonl"), 50),
+    "export_csv_gz": (setup_export("bench.csv.gz"), 50),
+    "snapshots_dict_1k": (setup_snapshots(False), 5),
+    "snapshots_compact_1k": (setup_snapshots(True), 5),
+}
+
+
+# --- Measurement ---
+
+def measure(func, repeat):
+    """
+    Time a callable, then trace its allocations in one extra run.
+
+    Returns:
+        Dictionary of metrics.
+    """
+    func()  # warm-up (caches, first samples)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_s": round(statistics.median(times), 6),
+        "wall_min_s": round(min(times), 6),
+        "repeat": repeat,
+        "alloc_peak_bytes": peak,
+        "alloc_retained_bytes": retained,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_case(name, args):
+    """Run one case in this process and print its result as JSON."""
+    setup, default_repeat = CASES[name]
+    func, cleanup = setup(args)
+    try:
+        result = measure(func, args.repeat or default_repeat)
+    finally:
+        if cleanup is not None:
+            cleanup()
+    print(json.dumps(result))
+    return 0
+
+
+def run_case_subprocess(name, args):
+    """Run one case in a fresh interpreter, return its result (None on failure)."""
+    command = [sys.executable, __file__, "--run-case", name,
+               "--root", args.root, "--processes", str(args.processes)]
+    if args.repeat:
+        command += ["--repeat", str(args.repeat)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"  {name}: FAILED\n{completed.stderr.strip()}")
+        return None
+    # Collectors may print warnings: the result is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# --- Baseline comparison ---
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """
+    Compare results with a baseline.
+
+    Returns:
+        List of regression messages.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            tolerance = time_tolerance if metric == "wall_s" else memory_tolerance
+            if metric == "wall_s" and new - old < MIN_TIME_DELTA:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"{'case':<20} {'wall ms':>10} {'vs base':>8} {'alloc MB':>10} {'RSS MB':>8}")
+    for name, result in results.items():
+        base = (baseline or {}).get("results", {}).get(name)
+        delta = f"{(result['wall_s'] / base['wall_s'] - 1) * 100:+.0f}%" if base and base.get("wall_s") else "-"
+        print(f"{name:<20} {result['wall_s'] * 1000:>10.2f} {delta:>8} "
+              f"{result['alloc_peak_bytes'] / 1048576:>10.2f} {result['peak_rss_kb'] / 1024:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collectors, processing and rendering benchmarks")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help="Comma-separated cases (default: all): " + ", ".join(CASES))
+    parser.add_argument("--repeat", type=int, default=None, help="Timed runs per case (default: per case)")
+    parser.add_argument("--root", default="/tmp/aaa-bench-tree", help="Location of the generated trees")
+    parser.add_argument("--processes", type=int, default=500, help="Dummy processes to spawn (default: 500)")
+    parser.add_argument("--output", default=str(Path(__file__).parent / "results.json"),
+                        help="Results file (default: benchmarks/results.json)")
+    parser.add_argument("--baseline", default=None, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", default=None, metavar="PATH", help="Also save the results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed wall time increase over the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="Allowed allocation/RSS increase over the baseline (default: 0.10)")
+    parser.add_argument("--run-case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        return run_case(args.run_case, args)
+
+    names = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    failed = []
+    for name in names:
+        print(f"Running {name}...", flush=True)
+        result = run_case_subprocess(name, args)
+        if result is None:
+            failed.append(name)
+        else:
+            results[name] = result
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved: {path}")
+
+    print()
+    print_results(results, baseline)
+
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance) if baseline else []
+    if regressions or failed:
+        print()
+        print("=" * 60)
+        print(f"PERFORMANCE REGRESSION ({len(regressions)}), FAILED CASES ({len(failed)})")
+        for message in regressions:
+            print(f"  {message}")
+        for name in failed:
+            print(f"  {name}: failed to run")
+        print("=" * 60)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,20 +7,30 @@ and generates a static HTML dashboard.
 
 Usage:
     python monitor.py [--directory /path] [--output index.html]
+    python monitor.py --daemon --interval 5
+    python monitor.py --serve --port 8000
+    python monitor.py --agent --host 0.0.0.0 --port 9100
+    python monitor.py --fleet node1:9100 node2:9100 --interval 10
 
 Author: AAA Project
 """
 
 import argparse
+import signal
 import sys
 from pathlib import Path
 
 # Add src path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.data.system_collector import collect_all
-from src.core.data_processor import get_template_variables
-from src.api.html_generator import generate_file
+# Only what argument parsing needs is imported here: each mode imports its
+# own modules (psutil, asyncio, http.server...), so --help and short runs
+# do not pay for the others.
+from src.data.collector_cache import DEFAULT_TTLS
+from src.data.counter_rates import set_state_dir
+from src.data.snapshot_export import split_path as split_export_path
+from src.core.alert_engine import AlertEngine, parse_rule
+from src.core.instrumentation import StageTimings, run_stage
 
 
 def parse_arguments():
@@ -34,6 +44,10 @@ Examples:
     python monitor.py --directory /home/user/Documents
     python monitor.py --output dashboard.html
     python monitor.py -d /var/log -o report.html
+    python monitor.py --daemon --interval 5
+    python monitor.py --serve --port 8000 --interval 5
+    python monitor.py --agent --host 0.0.0.0 --port 9100
+    python monitor.py --fleet node1:9100 node2:9100 --interval 10
         """
     )
 
@@ -64,7 +78,821 @@ Examples:
         help="Verbose mode with detailed output"
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the duration, memory delta and item count of every stage"
+    )
+
+    parser.add_argument(
+        "--timings-json",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write the stage timings of each run as JSON"
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Profile the run with cProfile and write the stats to PATH"
+    )
+
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Glob pattern of files/directories to skip (repeatable)"
+    )
+
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Maximum directory depth for the file analysis"
+    )
+
+    parser.add_argument(
+        "--one-filesystem",
+        action="store_true",
+        help="Do not cross filesystem boundaries during the file analysis"
+    )
+
+    parser.add_argument(
+        "--symlinks",
+        choices=["none", "files", "all"],
+        default="files",
+        help="Symbolic link policy for the file analysis (default: files)"
+    )
+
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        help="Number of parallel workers for the file analysis (default: 1)"
+    )
+
+    parser.add_argument(
+        "--scan-mode",
+        choices=["thread", "process"],
+        default="thread",
+        help="Worker pool used with --scan-workers (default: thread)"
+    )
+
+    parser.add_argument(
+        "--scan-index",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="SQLite index reused between runs to rescan only changed directories"
+    )
+
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Discard the scan index and rescan the whole directory"
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Daemon mode: keep file statistics current with inotify instead of rescanning"
+    )
+
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="SQLite history file recording every sample (with 1-minute/1-hour rollups)"
+    )
+
+    parser.add_argument(
+        "--export",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Append every snapshot to a .jsonl or .csv file, optionally .gz/.bz2/.xz compressed"
+    )
+
+    parser.add_argument(
+        "--export-data",
+        choices=("raw", "processed"),
+        default="raw",
+        help="Export collect_all data (raw, default) or processed display data"
+    )
+
+    parser.add_argument(
+        "--export-max-mb",
+        type=float,
+        default=64,
+        help="Rotate the export file at this size in MB (default: 64)"
+    )
+
+    parser.add_argument(
+        "--export-keep",
+        type=int,
+        default=10,
+        help="Number of rotated export files kept (default: 10)"
+    )
+
+    parser.add_argument(
+        "--alert",
+        action="append",
+        default=[],
+        metavar="RULE",
+        help='Alert rule, e.g. "memory > 90 for 3" or "disk_used growth > 1GB/hour" (repeatable)'
+    )
+
+    parser.add_argument(
+        "--alert-file",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="File with one alert rule per line (# comments allowed)"
+    )
+
+    parser.add_argument(
+        "--alert-log",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Append alert events as JSON lines to this file"
+    )
+
+    parser.add_argument(
+        "--alert-webhook",
+        type=str,
+        default=None,
+        metavar="URL",
+        help="POST alert events as JSON to this URL"
+    )
+
+    parser.add_argument(
+        "--alert-exec",
+        type=str,
+        default=None,
+        metavar="COMMAND",
+        help="Run this command for each alert event (JSON on stdin, ALERT_* variables)"
+    )
+
+    parser.add_argument(
+        "--state-dir",
+        type=str,
+        default="~/.cache/aaa-monitor",
+        help="Directory keeping counter snapshots between runs for rate computation "
+             "(default: ~/.cache/aaa-monitor, empty string to disable)"
+    )
+
+    parser.add_argument(
+        "--top-processes",
+        type=int,
+        default=3,
+        metavar="N",
+        help="Number of processes in the CPU and memory rankings (default: 3)"
+    )
+
+    parser.add_argument(
+        "--proc-direct",
+        action="store_true",
+        help="Read /proc/[pid]/stat directly for the process table (Linux)"
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=["psutil", "proc"],
+        default="psutil",
+        help="Source of the CPU, memory, load, network and disk I/O counters: psutil "
+             "(default) or proc, reading /proc directly with reused descriptors "
+             "(Linux, falls back to psutil)"
+    )
+
+    parser.add_argument(
+        "-p", "--parallel",
+        action="store_true",
+        help="Run the collectors concurrently with per-collector timeouts"
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Daemon/server modes: serve each section from a per-collector cache "
+             "refreshed in the background when older than its TTL"
+    )
+
+    parser.add_argument(
+        "--ttl",
+        action="append",
+        default=[],
+        metavar="SECTION=SECONDS",
+        help="TTL of a cached section, repeatable (defaults: "
+             + ", ".join(f"{name}={ttl:g}" for name, ttl in DEFAULT_TTLS.items()) + ")"
+    )
+
+    parser.add_argument(
+        "--only",
+        type=str,
+        default=None,
+        metavar="SECTIONS",
+        help="Collect only these comma-separated sections (" + ",".join(DEFAULT_TTLS)
+             + "); the others show N/A. E.g. --only cpu,memory for a fast check"
+    )
+
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and regenerate the dashboard every --interval seconds"
+    )
+
+    parser.add_argument(
+        "-i", "--interval",
+        type=float,
+        default=30.0,
+        help="Refresh interval in seconds for daemon, server and fleet modes, and between "
+             "the --history/--export/--alert samples of an agent (default: 30)"
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the dashboard over HTTP from memory instead of writing a file"
+    )
+
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Address for --serve (default: 127.0.0.1)"
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port for --serve (default: 8000)"
+    )
+
+    parser.add_argument(
+        "--metrics-ttl",
+        type=float,
+        default=10.0,
+        help="Seconds during which /metrics scrapes reuse the last collection (default: 10)"
+    )
+
+    parser.add_argument(
+        "--agent",
+        action="store_true",
+        help="Serve the collected data (gzipped JSON on /collect) for a fleet aggregator"
+    )
+
+    parser.add_argument(
+        "--agent-ttl",
+        type=float,
+        default=2.0,
+        help="Seconds during which agent requests reuse the last collection (default: 2)"
+    )
+
+    parser.add_argument(
+        "--fleet",
+        nargs="+",
+        default=[],
+        metavar="HOST:PORT",
+        help="Aggregator mode: poll these agents and write a fleet overview every --interval seconds"
+    )
+
+    parser.add_argument(
+        "--fleet-file",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="File listing agents (one HOST:PORT per line, # for comments)"
+    )
+
+    parser.add_argument(
+        "--fleet-output",
+        type=str,
+        default=".",
+        metavar="DIR",
+        help="Directory for fleet.html and the per-agent pages (default: script directory)"
+    )
+
+    parser.add_argument(
+        "--fleet-template",
+        type=str,
+        default="fleet_template.html",
+        help="Fleet overview template (default: fleet_template.html)"
+    )
+
+    parser.add_argument(
+        "--fleet-timeout",
+        type=float,
+        default=5.0,
+        help="Timeout in seconds for each agent request (default: 5)"
+    )
+
+    parser.add_argument(
+        "--fleet-concurrency",
+        type=int,
+        default=100,
+        help="Maximum number of agent requests in flight (default: 100)"
+    )
+
+    args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.export:
+        try:
+            split_export_path(args.export)
+        except ValueError as e:
+            parser.error(f"--export: {e}")
+    rules = list(args.alert)
+    if args.alert_file:
+        try:
+            with open(args.alert_file, "r", encoding="utf-8") as f:
+                rules += [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+        except OSError as e:
+            parser.error(f"--alert-file: {e}")
+    try:
+        args.alert_rules = [parse_rule(rule) for rule in rules]
+    except ValueError as e:
+        parser.error(f"--alert: {e}")
+    if args.export_max_mb <= 0:
+        parser.error("--export-max-mb must be positive")
+    if args.export_keep < 0:
+        parser.error("--export-keep must not be negative")
+    if args.metrics_ttl < 0:
+        parser.error("--metrics-ttl must not be negative")
+
+    ttls = {}
+    for item in args.ttl:
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_TTLS:
+            parser.error(f"--ttl: unknown section {name!r}")
+        try:
+            ttls[name] = float(value)
+        except ValueError:
+            parser.error(f"--ttl: invalid number of seconds in {item!r}")
+        if ttls[name] < 0:
+            parser.error(f"--ttl: negative TTL in {item!r}")
+    args.ttl = ttls
+
+    if args.only is not None:
+        only = [name.strip() for name in args.only.split(",") if name.strip()]
+        unknown = [name for name in only if name not in DEFAULT_TTLS]
+        if unknown or not only:
+            parser.error(f"--only: unknown section(s) {', '.join(unknown) or '(none given)'} "
+                         f"(known: {', '.join(DEFAULT_TTLS)})")
+        args.only = tuple(only)
+
+    return args
+
+
+def get_files_options(args):
+    """Build the get_files_info options from the command line arguments."""
+    return {
+        "symlinks": args.symlinks,
+        "max_depth": args.max_depth,
+        "exclude": args.exclude,
+        "one_filesystem": args.one_filesystem,
+        "workers": args.scan_workers,
+        "scan_mode": args.scan_mode,
+        "index_path": args.scan_index,
+        "rebuild_index": args.rebuild_index,
+    }
+
+
+def get_processes_options(args):
+    """Build the get_processes_info options from the command line arguments."""
+    return {"top_n": args.top_processes, "use_proc": args.proc_direct}
+
+
+def make_exporter(args):
+    """Build the snapshot exporter of --export (None when not requested)."""
+    if not args.export:
+        return None
+    from src.data.snapshot_export import SnapshotExporter
+
+    return SnapshotExporter(args.export, max_bytes=int(args.export_max_mb * 1024 * 1024),
+                            keep=args.export_keep)
+
+
+def export_snapshot(exporter, raw_data, args, data=None):
+    """
+    Append one snapshot to the export, warning instead of failing.
+
+    Args:
+        exporter: SnapshotExporter.
+        raw_data: Data collected by collect_all.
+        args: Parsed command line arguments (--export-data).
+        data: Result of process_all(raw_data), if already computed.
+    """
+    from src.core.data_processor import process_all
+
+    try:
+        if args.export_data == "processed":
+            exporter.write(data if data is not None else process_all(raw_data))
+        else:
+            exporter.write(raw_data)
+    except (OSError, ValueError) as e:
+        print(f"Warning: snapshot not exported: {e}")
+
+
+def make_alerts(args):
+    """
+    Build the alert engine and its dispatcher from the command line.
+
+    Events are always printed; --alert-log, --alert-webhook and
+    --alert-exec add sinks.
+
+    Returns:
+        Tuple (AlertEngine, AlertDispatcher) or (None, None) without rules.
+    """
+    if not args.alert_rules:
+        return None, None
+    from src.api.alert_sinks import AlertDispatcher, ExecSink, LogFileSink, WebhookSink
+
+    sinks = []
+    if args.alert_log:
+        sinks.append(LogFileSink(args.alert_log))
+    if args.alert_webhook:
+        sinks.append(WebhookSink(args.alert_webhook))
+    if args.alert_exec:
+        sinks.append(ExecSink(args.alert_exec))
+    return AlertEngine(args.alert_rules), AlertDispatcher(sinks)
+
+
+def check_alerts(engine, dispatcher, raw_data):
+    """Evaluate the alert rules on a new sample and queue the events."""
+    events = engine.evaluate(raw_data)
+    for event in events:
+        print(event["message"])
+    dispatcher.submit(events)
+
+
+def make_collector(args):
+    """
+    Build the collection function for long-running modes.
+
+    Sets up the optional file watcher, collector cache, history store,
+    snapshot exporter and alert engine once. collect() only runs
+    collect_all with the command line options, so extra callers (/metrics
+    scrapes, agent requests) have no side effect; record() stores one
+    scheduled sample and is run once per cycle.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Tuple (collect callable, record callable or None, cleanup callable).
+    """
+    from src.data.system_collector import collect_all, get_collectors
+
+    files_options = get_files_options(args)
+    watcher = None
+    if args.watch:
+        from src.data.file_watcher import FileWatcher
+
+        watcher = FileWatcher(
+            args.directory,
+            symlinks=args.symlinks,
+            max_depth=args.max_depth,
+            exclude=args.exclude,
+            one_filesystem=args.one_filesystem,
+        ).start()
+        files_options = {"watcher": watcher}
+        print(f"File watcher: {watcher.mode} mode on {args.directory}")
+
+    history = None
+    if args.history:
+        from src.data.history_store import HistoryStore
+
+        history = HistoryStore(args.history)
+    exporter = make_exporter(args)
+    alerts, dispatcher = make_alerts(args)
+
+    cache = None
+    if args.cache:
+        from src.data.collector_cache import CollectorCache
+
+        collectors = get_collectors(args.directory, files_options, get_processes_options(args),
+                                    args.only)
+        cache = CollectorCache(collectors, args.ttl)
+
+    def collect(timings=None):
+        if cache is not None:
+            raw_data = run_stage(timings, "collect.cache", cache.collect_all)
+        else:
+            raw_data = collect_all(
+                files_directory=args.directory,
+                parallel=args.parallel,
+                files_options=files_options,
+                processes_options=get_processes_options(args),
+                timings=timings,
+                sections=args.only,
+            )
+        return raw_data
+
+    def record(raw_data, data=None):
+        if history is not None:
+            history.record(raw_data)
+        if exporter is not None:
+            export_snapshot(exporter, raw_data, args, data)
+        if alerts is not None:
+            check_alerts(alerts, dispatcher, raw_data)
+
+    def cleanup():
+        if cache is not None:
+            cache.close()
+        if watcher is not None:
+            watcher.close()
+        if history is not None:
+            history.close()
+        if exporter is not None:
+            exporter.close()
+        if dispatcher is not None:
+            dispatcher.close()
+
+    if history is None and exporter is None and alerts is None:
+        record = None
+    return collect, record, cleanup
+
+
+def report_timings(timings, args, budget=None):
+    """
+    Print and/or save the stage timings of a run, as requested.
+
+    Args:
+        timings: StageTimings of the run.
+        args: Parsed command line arguments.
+        budget: Interval in seconds (adds the budget share column).
+    """
+    if args.timings:
+        print(timings.format_table(budget))
+    if args.timings_json:
+        import json
+
+        from src.api.html_generator import write_atomic
+
+        try:
+            write_atomic(args.timings_json, json.dumps(timings.as_dict(), indent=2) + "\n")
+        except OSError as e:
+            print(f"Warning: timings not written: {e}")
+
+
+def stage_ms(timings, name):
+    """Duration of the last stage with this name, e.g. "12.3 ms"."""
+    for stage in reversed(timings.as_dict()["stages"]):
+        if stage["stage"] == name:
+            return f"{stage['seconds'] * 1000:.1f} ms"
+    return "N/A"
+
+
+def run_cycle(collect, template_path, output_path, args=None, record=None):
+    """
+    Run one collect -> process -> generate cycle (daemon mode).
+
+    Args:
+        collect: Collection function from make_collector.
+        template_path: Path to the HTML template file.
+        output_path: Path for the output HTML file.
+        args: Parsed command line arguments (timings options).
+        record: Per-sample function from make_collector (None = nothing to record).
+
+    Returns:
+        True if the dashboard was generated.
+    """
+    from src.core.data_processor import get_template_variables, process_all
+    from src.api.html_generator import generate_file
+
+    timings = StageTimings()
+    raw_data = collect(timings=timings)
+    data = process_all(raw_data, timings)
+    if record is not None:
+        run_stage(timings, "record", record, raw_data, data)
+    template_vars = run_stage(timings, "process.variables", get_template_variables,
+                              raw_data, data, timings)
+    ok = generate_file(str(template_path), template_vars, str(output_path), timings)
+    if args is not None:
+        report_timings(timings, args, args.interval)
+    return ok
+
+
+def stop_on_sigterm():
+    """
+    Stop a long-running mode on SIGTERM as on Ctrl+C.
+
+    Supervisors (systemd, docker stop, kill) send SIGTERM: raising
+    KeyboardInterrupt runs the same shutdown path, so the history store
+    flushes its pending samples and compressed exports are closed whole.
+    """
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, interrupt)
+
+
+def run_daemon(args):
+    """
+    Regenerate the dashboard periodically in the same process.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Return code (0 = success, 1 = error).
+    """
+    script_dir = Path(__file__).parent
+    template_path = script_dir / args.template
+    output_path = script_dir / args.output
+
+    if not template_path.exists():
+        print(f"ERROR: Template not found: {template_path}")
+        return 1
+
+    from src.core.scheduler import run_periodic
+
+    collect, record, cleanup = make_collector(args)
+    stop_on_sigterm()
+
+    print(f"Daemon mode: refreshing {output_path} every {args.interval:g}s (Ctrl+C to stop)")
+    try:
+        run_periodic(lambda: run_cycle(collect, template_path, output_path, args, record), args.interval)
+    except KeyboardInterrupt:
+        print()
+        print("Daemon stopped.")
+    finally:
+        cleanup()
+
+    return 0
+
+
+def run_server(args):
+    """
+    Serve the dashboard over HTTP from memory.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Return code (0 = success, 1 = error).
+    """
+    template_path = Path(__file__).parent / args.template
+    if not template_path.exists():
+        print(f"ERROR: Template not found: {template_path}")
+        return 1
+
+    from src.api.server import serve
+
+    collect, record, cleanup = make_collector(args)
+    stop_on_sigterm()
+    try:
+        serve(collect, template_path, host=args.host, port=args.port, interval=args.interval,
+              metrics_ttl=args.metrics_ttl, on_sample=record)
+    except OSError as e:
+        print(f"ERROR: {e}")
+        return 1
+    finally:
+        cleanup()
+
+    return 0
+
+
+def run_agent(args):
+    """
+    Serve the collected data for a fleet aggregator.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Return code (0 = success, 1 = error).
+    """
+    from src.api.agent import serve_agent
+
+    collect, record, cleanup = make_collector(args)
+    stop_on_sigterm()
+    try:
+        serve_agent(collect, host=args.host, port=args.port, ttl=args.agent_ttl,
+                    on_sample=record, interval=args.interval)
+    except OSError as e:
+        print(f"ERROR: {e}")
+        return 1
+    finally:
+        cleanup()
+
+    return 0
+
+
+def load_fleet_addresses(args):
+    """Agent addresses from --fleet and --fleet-file."""
+    addresses = list(args.fleet)
+    if args.fleet_file:
+        with open(args.fleet_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    addresses.append(line)
+    # Keep the first occurrence of each agent
+    return list(dict.fromkeys(addresses))
+
+
+def run_fleet(args):
+    """
+    Poll the fleet agents and regenerate the fleet pages periodically.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Return code (0 = success, 1 = error).
+    """
+    script_dir = Path(__file__).parent
+    template_path = script_dir / args.template
+    fleet_template_path = script_dir / args.fleet_template
+    output_dir = script_dir / args.fleet_output
+
+    for path in (template_path, fleet_template_path):
+        if not path.exists():
+            print(f"ERROR: Template not found: {path}")
+            return 1
+
+    try:
+        addresses = load_fleet_addresses(args)
+    except OSError as e:
+        print(f"ERROR: {e}")
+        return 1
+    if not addresses:
+        print("ERROR: No agents given")
+        return 1
+
+    import asyncio
+
+    from src.data.fleet_collector import FleetCollector
+    from src.api.fleet_generator import copy_stylesheet, generate_fleet
+    from src.core.scheduler import run_periodic
+
+    copy_stylesheet(template_path, output_dir)
+    collector = FleetCollector(
+        addresses,
+        timeout=args.fleet_timeout,
+        backoff=args.interval,
+        concurrency=args.fleet_concurrency,
+        default_port=args.port,
+    )
+    # One event loop for the whole run, so agent connections are kept alive
+    loop = asyncio.new_event_loop()
+    rendered = {}
+
+    def cycle():
+        loop.run_until_complete(collector.poll_once())
+        return generate_fleet(collector.hosts, fleet_template_path, template_path,
+                              output_dir, rendered)
+
+    stop_on_sigterm()
+    print(f"Fleet mode: polling {len(addresses)} agent(s) every {args.interval:g}s (Ctrl+C to stop)")
+    try:
+        run_periodic(cycle, args.interval)
+    except KeyboardInterrupt:
+        print()
+        print("Fleet aggregator stopped.")
+    finally:
+        loop.run_until_complete(collector.close())
+        loop.close()
+
+    return 0
+
+
+def run_profiled(func, args, path, top=20):
+    """
+    Run func(args) under cProfile, save the stats and print the hottest calls.
+
+    Only the main thread is profiled (not the collector or server threads).
+
+    Args:
+        func: Mode function to run.
+        args: Parsed command line arguments.
+        path: File for the pstats data (readable with python -m pstats).
+        top: Number of functions to print, by cumulative time.
+
+    Returns:
+        Return code of func.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, args)
+    finally:
+        try:
+            profiler.dump_stats(path)
+            print(f"Profile saved: {path}")
+        except OSError as e:
+            print(f"Warning: profile not saved: {e}")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(top)
 
 
 def main():
@@ -75,36 +903,116 @@ def main():
         Return code (0 = success, 1 = error).
     """
     args = parse_arguments()
+    set_state_dir(args.state_dir)
+    if args.backend != "psutil":
+        from src.data.system_collector import set_backend
+
+        set_backend(args.backend)
+
+    if args.profile:
+        return run_profiled(run_mode, args, args.profile)
+    return run_mode(args)
+
+
+def run_mode(args):
+    """
+    Run the mode selected on the command line.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Return code (0 = success, 1 = error).
+    """
+    if args.serve:
+        return run_server(args)
+
+    if args.agent:
+        return run_agent(args)
+
+    if args.fleet or args.fleet_file:
+        return run_fleet(args)
+
+    if args.daemon:
+        return run_daemon(args)
+
+    from src.data.system_collector import collect_all
+    from src.core.data_processor import get_template_variables, process_all
+    from src.api.html_generator import generate_file
 
     print("=" * 50)
     print("  MONITORING DASHBOARD - AAA Project")
     print("=" * 50)
     print()
 
+    timings = StageTimings()
+
     # Step 1: Data collection (Data Layer)
     print("[1/3] Collecting system data...")
     try:
-        raw_data = collect_all(files_directory=args.directory)
+        raw_data = timings.call(
+            "collect",
+            collect_all,
+            files_directory=args.directory,
+            parallel=args.parallel,
+            files_options=get_files_options(args),
+            processes_options=get_processes_options(args),
+            timings=timings,
+            sections=args.only,
+        )
+
+        for section, value in raw_data.items():
+            if isinstance(value, dict) and "error" in value:
+                print(f"      Warning: {section} collection failed: {value['error']}")
 
         if args.verbose:
-            print(f"      - Hostname: {raw_data['system']['hostname']}")
-            print(f"      - OS: {raw_data['system']['os']} {raw_data['system']['os_version']}")
-            print(f"      - CPU: {raw_data['cpu']['cpu_percent']}%")
-            print(f"      - RAM: {raw_data['memory']['percent']}%")
-            print(f"      - Disk: {raw_data['disk']['percent']}%")
-            print(f"      - Processes: {raw_data['processes']['total_count']}")
-            print(f"      - Files analyzed: {raw_data['files']['total_files']}")
-
-        print("      Collection completed successfully!")
+            # Sections left out with --only are not listed
+            if "system" in raw_data:
+                print(f"      - Hostname: {raw_data['system'].get('hostname')}")
+                print(f"      - OS: {raw_data['system'].get('os')} {raw_data['system'].get('os_version')}")
+            if "cpu" in raw_data:
+                print(f"      - CPU: {raw_data['cpu'].get('cpu_percent')}%")
+            if "memory" in raw_data:
+                print(f"      - RAM: {raw_data['memory'].get('percent')}%")
+            if "disk" in raw_data:
+                print(f"      - Disk: {raw_data['disk'].get('percent')}%")
+            if "processes" in raw_data:
+                print(f"      - Processes: {raw_data['processes'].get('total_count')}")
+            if "files" in raw_data:
+                print(f"      - Files analyzed: {raw_data['files'].get('total_files')}")
+
+        print(f"      Collection completed successfully! ({stage_ms(timings, 'collect')})")
     except Exception as e:
         print(f"      ERROR: {e}")
         return 1
 
+    # Rules are evaluated on this single sample ("for N" needs --daemon or --serve)
+    alerts, dispatcher = make_alerts(args)
+    if alerts is not None:
+        check_alerts(alerts, dispatcher, raw_data)
+        dispatcher.close()
+
+    if args.history:
+        from src.data.history_store import HistoryStore
+
+        try:
+            with HistoryStore(args.history) as history:
+                history.record(raw_data)
+        except Exception as e:
+            print(f"      Warning: history not recorded: {e}")
+
     # Step 2: Data processing (Core Layer)
     print("[2/3] Processing data...")
     try:
-        template_vars = get_template_variables(raw_data)
-        print(f"      {len(template_vars)} variables generated")
+        data = process_all(raw_data, timings)
+        template_vars = timings.call("process.variables", get_template_variables,
+                                     raw_data, data, timings)
+        print(f"      {len(template_vars)} variables generated "
+              f"({stage_ms(timings, 'process.variables')})")
+
+        if args.export:
+            with make_exporter(args) as exporter:
+                export_snapshot(exporter, raw_data, args, data)
     except Exception as e:
         print(f"      ERROR: {e}")
         return 1
@@ -122,8 +1030,9 @@ def main():
 
         output_path = script_dir / args.output
 
-        if generate_file(str(template_path), template_vars, str(output_path)):
-            print(f"      Dashboard generated: {output_path}")
+        if timings.call("generate", generate_file, str(template_path), template_vars,
+                        str(output_path), timings):
+            print(f"      Dashboard generated: {output_path} ({stage_ms(timings, 'generate')})")
         else:
             print("      ERROR: Generation failed")
             return 1
@@ -131,6 +1040,10 @@ def main():
         print(f"      ERROR: {e}")
         return 1
 
+    if args.timings or args.timings_json:
+        print()
+        report_timings(timings, args)
+
     print()
     print("=" * 50)
     print("  MONITORING COMPLETED SUCCESSFULLY")
@@ -140,7 +1053,7 @@ def main():
     print(f"Open this file in a web browser.")
     print()
     print("The dashboard auto-refreshes every 30 seconds.")
-    print("To update data, run this script again.")
+    print("To update data, run this script again or use --daemon.")
     print()
 
     return 0
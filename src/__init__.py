@@ -1,10 +1,16 @@
 # src package - System monitoring modules
-from . import api
-from . import core
-from . import data
+# The layers are imported on first access (PEP 562): "import src.data.x"
+# only loads what that module needs.
+import importlib
 
 __all__ = [
     "api",
     "core",
     "data",
 ]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
@@ -1,12 +1,40 @@
-# API Layer - HTML generation from templates
-from .html_generator import (
-    generate_file,
-    load_template,
-    render,
-)
-
-__all__ = [
-    "generate_file",
-    "load_template",
-    "render",
-]
+# API Layer - HTML generation from templates, HTTP server, metrics export, fleet and alerts
+# Names are imported from their submodule on first access (PEP 562), so
+# importing one module of the package does not load all the others.
+import importlib
+
+_EXPORTS = {
+    "CompiledTemplate": "html_generator",
+    "compile_template": "html_generator",
+    "generate_file": "html_generator",
+    "load_compiled_template": "html_generator",
+    "load_template": "html_generator",
+    "render": "html_generator",
+    "write_atomic": "html_generator",
+    "CollectionCache": "metrics_exporter",
+    "format_metrics": "metrics_exporter",
+    "create_agent_server": "agent",
+    "serve_agent": "agent",
+    "generate_fleet": "fleet_generator",
+    "create_server": "server",
+    "serve": "server",
+    "AlertDispatcher": "alert_sinks",
+    "ExecSink": "alert_sinks",
+    "LogFileSink": "alert_sinks",
+    "WebhookSink": "alert_sinks",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
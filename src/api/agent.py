@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+API Layer - Fleet agent.
+This module serves the collect_all() payload of the local machine as
+compact, gzip-compressed JSON for an aggregator (monitor.py --fleet),
+over persistent HTTP/1.1 connections.
+"""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..core.scheduler import run_periodic
+from .metrics_exporter import CollectionCache
+
+# Idle keep-alive connections are closed after this many seconds
+IDLE_TIMEOUT = 120
+
+
+def encode_payload(raw_data, compress=True):
+    """
+    Encode collected data for the aggregator.
+
+    Args:
+        raw_data: Data collected by collect_all.
+        compress: Gzip the JSON.
+
+    Returns:
+        Bytes of compact JSON (gzipped when compress is True).
+    """
+    body = json.dumps(raw_data, separators=(",", ":"), default=str).encode("utf-8")
+    return gzip.compress(body, compresslevel=6) if compress else body
+
+
+class AgentHandler(BaseHTTPRequestHandler):
+    """Request handler; the collection cache is set on the subclass."""
+
+    collection = None
+    protocol_version = "HTTP/1.1"
+    server_version = "AAAMonitorAgent/1.0"
+    timeout = IDLE_TIMEOUT
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/collect":
+            self.send_error(404, "Not Found")
+            return
+
+        try:
+            raw_data, _age = self.collection.get()
+        except Exception as e:
+            self.send_error(500, f"Collection failed: {e}")
+            return
+
+        compress = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = encode_payload(raw_data, compress)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_agent_server(collect, host="0.0.0.0", port=8000, ttl=2.0):
+    """
+    Build the agent HTTP server (not started).
+
+    Args:
+        collect: Callable returning collect_all() data.
+        host: Address to bind.
+        port: Port to listen on (0 = any free port).
+        ttl: Requests within this many seconds share one collection.
+
+    Returns:
+        ThreadingHTTPServer.
+    """
+    handler = type("BoundAgentHandler", (AgentHandler,), {
+        "collection": CollectionCache(collect, ttl),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_sampling(server, on_sample, interval, stop_event):
+    """
+    Run on_sample on the agent's data every interval in a daemon thread.
+
+    Requests from the aggregator do not run it: their number depends on
+    how often the agent is polled, not on the sampling interval.
+
+    Returns:
+        The started thread.
+    """
+    collection = server.RequestHandlerClass.collection
+
+    def sample():
+        on_sample(collection.get()[0])
+        return True
+
+    thread = threading.Thread(target=run_periodic, args=(sample, interval),
+                              kwargs={"stop_event": stop_event, "verbose": False},
+                              name="agent-sampler", daemon=True)
+    thread.start()
+    return thread
+
+
+def serve_agent(collect, host="0.0.0.0", port=8000, ttl=2.0, on_sample=None, interval=30.0):
+    """
+    Serve the agent payload until interrupted.
+
+    Args:
+        collect: Callable returning collect_all() data.
+        host: Address to bind.
+        port: Port to listen on.
+        ttl: Requests within this many seconds share one collection.
+        on_sample: Callable(raw_data) run once per interval (history,
+            export, alerts), None for nothing.
+        interval: Seconds between on_sample calls.
+    """
+    server = create_agent_server(collect, host, port, ttl)
+    stop_event = threading.Event()
+    if on_sample is not None:
+        start_sampling(server, on_sample, interval, stop_event)
+    print(f"Agent serving http://{host}:{server.server_address[1]}/collect (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print("Agent stopped.")
+    finally:
+        stop_event.set()
+        server.server_close()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+API Layer - Alert delivery.
+This module sends alert events to pluggable sinks (JSON log file, HTTP
+webhook, external command) from a background thread fed by a bounded
+queue, so a slow or failing sink never delays collection.
+"""
+
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import urllib.request
+
+# Events waiting for delivery; further events are dropped when full
+DEFAULT_QUEUE_SIZE = 100
+
+
+class LogFileSink:
+    """Append each event as one JSON line to a file."""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, event):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def __str__(self):
+        return f"log {self.path}"
+
+
+class WebhookSink:
+    """POST each event as JSON to a URL."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, event):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(event).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def __str__(self):
+        return f"webhook {self.url}"
+
+
+class ExecSink:
+    """
+    Run a command for each event.
+
+    The event is passed as JSON on stdin and as ALERT_* environment
+    variables (ALERT_RULE, ALERT_STATE, ALERT_VALUE, ALERT_MESSAGE...).
+    """
+
+    def __init__(self, command, timeout=30.0):
+        self.command = shlex.split(command) if isinstance(command, str) else list(command)
+        self.timeout = timeout
+
+    def send(self, event):
+        env = dict(os.environ)
+        for key, value in event.items():
+            env[f"ALERT_{key.upper()}"] = str(value)
+        completed = subprocess.run(self.command, input=json.dumps(event), text=True, env=env,
+                                   capture_output=True, timeout=self.timeout)
+        if completed.returncode != 0:
+            raise RuntimeError(f"exit status {completed.returncode}: {completed.stderr.strip()[:200]}")
+
+    def __str__(self):
+        return f"exec {shlex.join(self.command)}"
+
+
+class AlertDispatcher:
+    """
+    Deliver alert events to sinks from a background thread.
+
+    submit() never blocks: when the queue is full (sinks too slow), the
+    new events are dropped and counted. A failing sink is reported and
+    does not prevent delivery to the others.
+    """
+
+    def __init__(self, sinks, queue_size=DEFAULT_QUEUE_SIZE):
+        self.sinks = list(sinks)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.delivered = 0
+        self.failures = 0
+        self.thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, events):
+        """
+        Queue events for delivery without waiting.
+
+        Args:
+            events: List of events from AlertEngine.evaluate().
+
+        Returns:
+            Number of events queued.
+        """
+        queued = 0
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+                queued += 1
+            except queue.Full:
+                self.dropped += 1
+                print(f"Warning: alert queue full, dropped: {event.get('message')}")
+        return queued
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            try:
+                if event is None:
+                    return
+                for sink in self.sinks:
+                    try:
+                        sink.send(event)
+                        self.delivered += 1
+                    except Exception as e:
+                        self.failures += 1
+                        print(f"Warning: alert not delivered to {sink}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def close(self, timeout=5.0):
+        """Deliver the queued events (up to timeout seconds) and stop."""
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            print("Warning: alert queue still full, pending alerts dropped")
+            return
+        self.thread.join(timeout)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+API Layer - Fleet pages generation.
+This module writes the fleet overview page and one drill-down dashboard
+per agent (the regular template filled with that agent's data).
+"""
+
+import shutil
+from pathlib import Path
+
+from ..core.data_processor import get_template_variables
+from ..core.fleet_processor import get_fleet_variables, host_page_name, process_fleet
+from .html_generator import load_compiled_template, write_atomic
+
+# File name of the overview page
+FLEET_PAGE = "fleet.html"
+
+
+def copy_stylesheet(template_path, output_dir):
+    """Copy template.css next to the fleet pages when they are written elsewhere."""
+    source = Path(template_path).parent / "template.css"
+    target = Path(output_dir) / "template.css"
+    if source.exists() and source.resolve() != target.resolve():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+
+
+def generate_fleet(hosts, fleet_template_path, template_path, output_dir, rendered=None):
+    """
+    Write the fleet overview and the drill-down pages.
+
+    Drill-down pages are only rewritten when their agent sent new data.
+
+    Args:
+        hosts: FleetCollector.hosts.
+        fleet_template_path: Path to the fleet overview template.
+        template_path: Path to the dashboard template (drill-down pages).
+        output_dir: Directory for the generated pages.
+        rendered: Dictionary agent name -> data version already written,
+            updated in place (None = write every page).
+
+    Returns:
+        True if the overview was generated.
+    """
+    fleet = process_fleet(hosts)
+    fleet_variables = get_fleet_variables(fleet)
+    overview = load_compiled_template(fleet_template_path, fleet_variables)
+    dashboard = load_compiled_template(template_path)
+    if overview is None or dashboard is None:
+        return False
+
+    rendered = {} if rendered is None else rendered
+    output_dir = Path(output_dir)
+
+    try:
+        for name, host in hosts.items():
+            if not host.get("data") or rendered.get(name) == host.get("version"):
+                continue
+            variables = get_template_variables(host["data"])
+            write_atomic(output_dir / host_page_name(name), dashboard.render(variables))
+            rendered[name] = host.get("version")
+
+        write_atomic(output_dir / FLEET_PAGE, overview.render(fleet_variables))
+    except OSError as e:
+        print(f"Write error: {e}")
+        return False
+
+    print(f"Fleet overview generated: {output_dir / FLEET_PAGE} "
+          f"({fleet['up']}/{fleet['total']} agents up)")
+    return True
@@ -4,9 +4,13 @@ API Layer - HTML generation from templates.
 This module handles variable substitution in the HTML template.
 """
 
+import os
 import re
+import tempfile
 from pathlib import Path
 
+from ..core.instrumentation import run_stage
+
 
 def load_template(template_path):
     """
@@ -29,12 +33,153 @@ def load_template(template_path):
         return ""
 
 
+# Matches {{ name }} slots, with optional whitespace around the name
+SLOT_PATTERN = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+
+# Compiled templates cache: path -> (mtime_ns, size, CompiledTemplate)
+_template_cache = {}
+
+
+class CompiledTemplate:
+    """
+    Template parsed once into literal chunks and variable slots.
+
+    Rendering is a single join over the chunks instead of one
+    regex substitution per variable over the whole document. Missing
+    variables are reported when they change, not again on every render.
+    """
+
+    def __init__(self, template_content):
+        self.chunks = []
+        self.slots = []
+        self.raw_slots = []
+        # Missing variables last reported (at compile time or render)
+        self.reported_missing = frozenset()
+
+        position = 0
+        for match in SLOT_PATTERN.finditer(template_content):
+            self.chunks.append(template_content[position:match.start()])
+            self.slots.append(match.group(1))
+            self.raw_slots.append(match.group(0))
+            position = match.end()
+        self.chunks.append(template_content[position:])
+
+        self.names = frozenset(self.slots)
+
+    def missing(self, variables):
+        """
+        List the template variables not provided.
+
+        Args:
+            variables: Dictionary of variables to substitute.
+
+        Returns:
+            Sorted list of missing variable names.
+        """
+        return sorted(self.names.difference(variables))
+
+    def iter_render(self, variables):
+        """
+        Generate HTML chunk by chunk (literal parts and slot values).
+
+        The page is never assembled: write the chunks as they come.
+
+        Args:
+            variables: Dictionary of variables to substitute.
+
+        Yields:
+            HTML chunks (str).
+        """
+        missing = self.missing(variables)
+        if missing and self.reported_missing != frozenset(missing):
+            remaining = [raw for name, raw in zip(self.slots, self.raw_slots)
+                         if name in missing]
+            print(f"Warning: Unsubstituted variables: {remaining}")
+        self.reported_missing = frozenset(missing)
+
+        yield self.chunks[0]
+        for name, raw, chunk in zip(self.slots, self.raw_slots, self.chunks[1:]):
+            yield str(variables.get(name, raw))
+            yield chunk
+
+    def render(self, variables):
+        """
+        Generate HTML by filling the slots.
+
+        Args:
+            variables: Dictionary of variables to substitute.
+
+        Returns:
+            HTML content with substituted variables.
+        """
+        return "".join(self.iter_render(variables))
+
+
+def compile_template(template_content, variables=None):
+    """
+    Parse template content into a CompiledTemplate.
+
+    Args:
+        template_content: HTML template content.
+        variables: Optional variable names to check against the slots.
+
+    Returns:
+        CompiledTemplate instance.
+    """
+    compiled = CompiledTemplate(template_content)
+
+    if variables is not None:
+        missing = compiled.missing(variables)
+        if missing:
+            print(f"Warning: Template variables without value: {missing}")
+        compiled.reported_missing = frozenset(missing)
+
+    return compiled
+
+
+def load_compiled_template(template_path, variables=None):
+    """
+    Load and compile a template, cached by path and modification time.
+
+    An unchanged template is never re-read or re-parsed.
+
+    Args:
+        template_path: Path to the HTML template file.
+        variables: Variable names checked against the slots when the
+            template is (re)compiled.
+
+    Returns:
+        CompiledTemplate or None on error.
+    """
+    key = str(template_path)
+    try:
+        stat = os.stat(key)
+    except FileNotFoundError:
+        print(f"Error: Template not found: {template_path}")
+        return None
+    except OSError as e:
+        print(f"Error reading template: {e}")
+        return None
+
+    cached = _template_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    template_content = load_template(key)
+    if not template_content:
+        return None
+
+    compiled = compile_template(template_content, variables)
+    _template_cache[key] = (stat.st_mtime_ns, stat.st_size, compiled)
+    return compiled
+
+
 def render(template_content, variables):
     """
     Generate HTML by replacing variables.
 
     Args:
-        template_content: HTML template content.
+        template_content: HTML template content or CompiledTemplate.
         variables: Dictionary of variables to substitute.
 
     Returns:
@@ -44,47 +189,72 @@ def render(template_content, variables):
     if not template_content:
         return ""
 
-    html = template_content
+    if isinstance(template_content, CompiledTemplate):
+        return template_content.render(variables)
 
-    # Replace {{variable}} patterns
-    for key, value in variables.items():
-        pattern = r"\{\{\s*" + re.escape(key) + r"\s*\}\}"
-        html = re.sub(pattern, str(value), html)
+    return compile_template(template_content).render(variables)
 
-    # Warning for unsubstituted variables
-    remaining = re.findall(r"\{\{[^}]+\}\}", html)
-    if remaining:
-        print(f"Warning: Unsubstituted variables: {remaining}")
 
-    return html
+def write_atomic(output_path, content):
+    """
+    Write a file atomically (temporary file then rename).
 
+    Readers of the output never see a partially written file.
+
+    Args:
+        output_path: Path for the output file.
+        content: Text content to write, or an iterable of text chunks
+            (written as they come, e.g. CompiledTemplate.iter_render).
 
-def generate_file(template_path, variables, output_path):
+    Returns:
+        Number of characters written.
+    """
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    chunks = [content] if isinstance(content, str) else content
+    written = 0
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{output.name}.", suffix=".tmp", dir=output.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                written += f.write(chunk)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output)
+        return written
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def generate_file(template_path, variables, output_path, timings=None):
     """
     Generate the output HTML file.
 
+    The page is streamed to the file chunk by chunk instead of being
+    rendered into one string first.
+
     Args:
         template_path: Path to the HTML template file.
         variables: Dictionary of variables to substitute.
         output_path: Path for the output HTML file.
+        timings: StageTimings recording "render.load" and "render"
+            (rendering and writing, with the characters written as items).
 
     Returns:
         True if generation succeeded, False otherwise.
     """
-    template_content = load_template(template_path)
-    if not template_content:
-        return False
-
-    html = render(template_content, variables)
-    if not html:
+    compiled = run_stage(timings, "render.load", load_compiled_template, template_path, variables)
+    if compiled is None:
         return False
 
     try:
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output, "w", encoding="utf-8") as f:
-            f.write(html)
+        run_stage(timings, "render", write_atomic, output_path,
+                  compiled.iter_render(variables), count=int)
 
         print(f"Dashboard generated: {output_path}")
         return True
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+API Layer - Prometheus metrics exporter.
+This module formats collect_all() data in the Prometheus text exposition
+format, and caches collections so that concurrent scrapes share one
+snapshot instead of each one sampling the CPU and walking the files.
+"""
+
+import inspect
+import threading
+import time
+
+from ..core.instrumentation import run_stage
+
+# Content type of the Prometheus text format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+PREFIX = "aaa_monitor"
+
+
+class CollectionCache:
+    """
+    Latest collect_all() result, refreshed when older than a TTL.
+
+    Collection runs under a lock: callers arriving during a collection
+    wait for it and reuse its result.
+    """
+
+    def __init__(self, collect, ttl=10.0, clock=time.monotonic):
+        self.collect = collect
+        try:
+            self.takes_timings = "timings" in inspect.signature(collect).parameters
+        except (TypeError, ValueError):
+            self.takes_timings = False
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.data = None
+        self.collected_at = None
+        self.collections = 0
+
+    def get(self, max_age=None, timings=None):
+        """
+        Return the cached data, collecting it again if too old.
+
+        Args:
+            max_age: Maximum age in seconds (default: the TTL, 0 = always
+                collect).
+            timings: StageTimings for the collection, if one runs (passed
+                to collect when it accepts a timings argument).
+
+        Returns:
+            Tuple (raw data, age in seconds).
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            if self.data is None or self.clock() - self.collected_at >= max_age:
+                if timings is not None and self.takes_timings:
+                    self.data = self.collect(timings=timings)
+                else:
+                    self.data = run_stage(timings, "collect", self.collect)
+                self.collected_at = self.clock()
+                self.collections += 1
+            return self.data, self.clock() - self.collected_at
+
+
+def escape_label_value(value):
+    """Escape a label value (backslash, double quote and newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsWriter:
+    """Accumulates metric families in the exposition format."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, metric_type, help_text, samples):
+        """
+        Add one metric family.
+
+        Args:
+            name: Metric name without the prefix.
+            metric_type: "gauge" or "counter".
+            help_text: HELP description.
+            samples: List of (labels dict, value); None values are skipped.
+        """
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            return
+        full_name = f"{PREFIX}_{name}"
+        self.lines.append(f"# HELP {full_name} {help_text}")
+        self.lines.append(f"# TYPE {full_name} {metric_type}")
+        for labels, value in samples:
+            if labels:
+                label_text = ",".join(f'{key}="{escape_label_value(val)}"' for key, val in labels.items())
+                self.lines.append(f"{full_name}{{{label_text}}} {float(value)!r}")
+            else:
+                self.lines.append(f"{full_name} {float(value)!r}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def format_metrics(raw_data, age=None):
+    """
+    Format collected data as Prometheus metrics.
+
+    Args:
+        raw_data: Data collected by collect_all.
+        age: Age of the data in seconds (exported when given).
+
+    Returns:
+        Metrics text (str).
+    """
+    writer = MetricsWriter()
+
+    sections = {}
+    up = []
+    for name in ("system", "cpu", "memory", "disk", "network", "processes", "files"):
+        section = raw_data.get(name)
+        if section is None:
+            # Not collected (--only): no collector_up sample
+            sections[name] = {}
+            continue
+        ok = isinstance(section, dict) and "error" not in section
+        sections[name] = section if ok else {}
+        up.append(({"collector": name}, 1 if ok else 0))
+    writer.family("collector_up", "gauge", "Whether the collector returned data (1) or failed (0).", up)
+
+    if age is not None:
+        writer.family("data_age_seconds", "gauge", "Age of the collected data.", [({}, round(age, 3))])
+    writer.family("collector_age_seconds", "gauge", "Age of each cached section.",
+                  [({"collector": name}, value)
+                   for name, value in (raw_data.get("collector_ages") or {}).items()])
+
+    system = sections["system"]
+    if system:
+        writer.family("system_info", "gauge", "Host information.", [({
+            "hostname": system.get("hostname", ""),
+            "os": system.get("os", ""),
+            "os_version": system.get("os_version", ""),
+            "architecture": system.get("architecture", ""),
+        }, 1)])
+        writer.family("system_uptime_seconds", "gauge", "Time since boot.",
+                      [({}, system.get("uptime_seconds"))])
+
+    cpu = sections["cpu"]
+    writer.family("cpu_usage_percent", "gauge", "Overall CPU usage.",
+                  [({}, cpu.get("cpu_percent"))])
+    writer.family("cpu_core_usage_percent", "gauge", "CPU usage per logical core.",
+                  [({"core": i}, value) for i, value in enumerate(cpu.get("cpu_percent_per_core", []))])
+    writer.family("cpu_cores", "gauge", "Number of CPU cores.", [
+        ({"kind": "physical"}, cpu.get("physical_cores")),
+        ({"kind": "logical"}, cpu.get("logical_cores")),
+    ])
+    writer.family("load_average", "gauge", "System load average.", [
+        ({"period": "1m"}, cpu.get("load_avg_1min")),
+        ({"period": "5m"}, cpu.get("load_avg_5min")),
+        ({"period": "15m"}, cpu.get("load_avg_15min")),
+    ])
+
+    memory = sections["memory"]
+    writer.family("memory_bytes", "gauge", "Physical memory.", [
+        ({"state": "total"}, memory.get("total")),
+        ({"state": "used"}, memory.get("used")),
+        ({"state": "available"}, memory.get("available")),
+    ])
+    writer.family("memory_usage_percent", "gauge", "Physical memory usage.",
+                  [({}, memory.get("percent"))])
+    writer.family("swap_bytes", "gauge", "Swap space.", [
+        ({"state": "total"}, memory.get("swap_total")),
+        ({"state": "used"}, memory.get("swap_used")),
+    ])
+    writer.family("swap_usage_percent", "gauge", "Swap usage.",
+                  [({}, memory.get("swap_percent"))])
+
+    disk = sections["disk"]
+    writer.family("disk_bytes", "gauge", "Root filesystem space.", [
+        ({"state": "total"}, disk.get("total")),
+        ({"state": "used"}, disk.get("used")),
+        ({"state": "free"}, disk.get("free")),
+    ])
+    writer.family("disk_usage_percent", "gauge", "Root filesystem usage.",
+                  [({}, disk.get("percent"))])
+
+    mounts = [mount for mount in disk.get("mounts", []) if "error" not in mount]
+    writer.family("filesystem_bytes", "gauge", "Space of each mounted filesystem.", [
+        ({"mountpoint": mount["mountpoint"], "device": mount["device"],
+          "fstype": mount["fstype"], "state": state}, mount.get(state))
+        for mount in mounts
+        for state in ("total", "used", "free")
+    ])
+    writer.family("filesystem_usage_percent", "gauge", "Usage of each mounted filesystem.", [
+        ({"mountpoint": mount["mountpoint"]}, mount.get("percent")) for mount in mounts
+    ])
+    writer.family("filesystem_up", "gauge", "1 if the filesystem usage could be read in time.", [
+        ({"mountpoint": mount["mountpoint"]}, 0 if "error" in mount else 1)
+        for mount in disk.get("mounts", [])
+    ])
+
+    io_counters = sorted(disk.get("io_counters", {}).items())
+    writer.family("disk_io_operations_total", "counter", "Completed I/O operations per device.", [
+        ({"device": device, "direction": direction}, counters.get(f"{direction}_count"))
+        for device, counters in io_counters
+        for direction in ("read", "write")
+    ])
+    writer.family("disk_io_bytes_total", "counter", "Bytes transferred per device.", [
+        ({"device": device, "direction": direction}, counters.get(f"{direction}_bytes"))
+        for device, counters in io_counters
+        for direction in ("read", "write")
+    ])
+    writer.family("disk_io_time_seconds_total", "counter", "Time spent on I/O operations per device.", [
+        ({"device": device, "direction": direction}, counters.get(f"{direction}_time", 0) / 1000)
+        for device, counters in io_counters
+        for direction in ("read", "write")
+    ])
+    writer.family("disk_io_busy_seconds_total", "counter", "Time each device was busy.", [
+        ({"device": device}, counters.get("busy_time", 0) / 1000) for device, counters in io_counters
+    ])
+
+    network = sections["network"]
+    writer.family("network_transmit_bytes_total", "counter", "Bytes sent on all interfaces.",
+                  [({}, network.get("bytes_sent"))])
+    writer.family("network_receive_bytes_total", "counter", "Bytes received on all interfaces.",
+                  [({}, network.get("bytes_recv"))])
+    writer.family("network_transmit_packets_total", "counter", "Packets sent on all interfaces.",
+                  [({}, network.get("packets_sent"))])
+    writer.family("network_receive_packets_total", "counter", "Packets received on all interfaces.",
+                  [({}, network.get("packets_recv"))])
+
+    processes = sections["processes"]
+    writer.family("processes", "gauge", "Number of processes.",
+                  [({}, processes.get("total_count"))])
+
+    files = sections["files"]
+    if files:
+        directory = files.get("directory", "")
+        by_extension = sorted(files.get("by_extension", {}).items())
+        writer.family("files", "gauge", "Files in the analyzed directory.",
+                      [({"directory": directory}, files.get("total_files"))])
+        writer.family("files_by_extension", "gauge", "Files per extension.",
+                      [({"directory": directory, "extension": ext}, stats.get("count"))
+                       for ext, stats in by_extension])
+        writer.family("files_by_extension_bytes", "gauge", "Total size of the files per extension.",
+                      [({"directory": directory, "extension": ext}, stats.get("size"))
+                       for ext, stats in by_extension])
+
+    return writer.text()
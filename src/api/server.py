@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+API Layer - Built-in HTTP server.
+This module serves the dashboard from memory: one background sampler
+collects and renders each snapshot once, and every viewer gets the same
+bytes (with ETag / 304 support). Open pages are kept current through a
+Server-Sent Events stream carrying only the changed template variables.
+Prometheus scrapes /metrics, served from the same cached collections;
+per-sample work (history, export, alerts) runs once per sampler cycle only.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from ..core.data_processor import get_template_variables, process_all
+from ..core.instrumentation import StageTimings, run_stage
+from ..core.scheduler import run_periodic
+from .html_generator import load_compiled_template
+from .metrics_exporter import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics_exporter import CollectionCache, format_metrics
+
+# Seconds between keep-alive comments on idle event streams
+KEEPALIVE_SECONDS = 15.0
+
+
+class Snapshot:
+    """
+    One rendered sample: HTML page and JSON data with their ETags.
+
+    variables_json holds all the template variables, changes_json only
+    those that differ from the previous snapshot (for live updates).
+    """
+
+    def __init__(self, version, html, data_json, tag, variables=None, changes=None):
+        self.version = version
+        self.html = html
+        self.data_json = data_json
+        self.variables = variables or {}
+        self.variables_json = _compact_json(self.variables)
+        self.changes_json = _compact_json(self.variables if changes is None else changes)
+        self.event_id = f"{tag}-{version}"
+        self.html_etag = f'"{tag}-{version}-h"'
+        self.json_etag = f'"{tag}-{version}-j"'
+        self.created = time.time()
+
+
+class SnapshotCache:
+    """Latest snapshot shared by all request handlers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.updated = threading.Condition(self.lock)
+        self.version = 0
+        self.snapshot = None
+        self.closed = False
+        # Distinguishes ETags across server restarts
+        self.tag = f"{os.getpid():x}{int(time.time()):x}"
+
+    def publish(self, html, data, variables=None):
+        """
+        Store a new snapshot and wake up the event streams.
+
+        Args:
+            html: Rendered HTML page (str).
+            data: process_all() output.
+            variables: Template variables used for the page.
+
+        Returns:
+            The new Snapshot.
+        """
+        data_json = _compact_json(data)
+        # Values are sent as rendered in the page
+        variables = {name: str(value) for name, value in (variables or {}).items()}
+        with self.lock:
+            previous = self.snapshot.variables if self.snapshot is not None else None
+            changes = None
+            if previous is not None:
+                changes = {name: value for name, value in variables.items()
+                           if previous.get(name) != value}
+            self.version += 1
+            self.snapshot = Snapshot(self.version, html.encode("utf-8"), data_json,
+                                     self.tag, variables, changes)
+            self.updated.notify_all()
+            return self.snapshot
+
+    def get(self):
+        """Return the latest Snapshot (None before the first sample)."""
+        with self.lock:
+            return self.snapshot
+
+    def wait_for_newer(self, version, timeout):
+        """
+        Wait for a snapshot newer than the given version.
+
+        Args:
+            version: Last version seen by the caller.
+            timeout: Maximum wait in seconds.
+
+        Returns:
+            The latest Snapshot, or None on timeout or when closed.
+        """
+        with self.lock:
+            self.updated.wait_for(
+                lambda: self.closed or (self.snapshot is not None and self.snapshot.version > version),
+                timeout,
+            )
+            if self.closed or self.snapshot is None or self.snapshot.version <= version:
+                return None
+            return self.snapshot
+
+    def parse_event_id(self, event_id):
+        """Version from a Last-Event-ID header (0 if from another server run)."""
+        tag, _, version = (event_id or "").rpartition("-")
+        if tag != self.tag or not version.isdigit():
+            return 0
+        return int(version)
+
+    def close(self):
+        """Release the waiting event streams."""
+        with self.lock:
+            self.closed = True
+            self.updated.notify_all()
+
+
+def _compact_json(value):
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class DashboardSampler:
+    """
+    Background thread running collect -> process -> render every interval.
+
+    The page is rendered at most once per sample, whatever the number of
+    connected viewers. on_sample(raw_data, data) runs once per sample,
+    never for the collections triggered by /metrics scrapes.
+    """
+
+    def __init__(self, collect, template_path, cache, interval=30.0, collection=None,
+                 on_sample=None):
+        self.collect = collect
+        self.collection = collection
+        self.on_sample = on_sample
+        self.template_path = template_path
+        self.cache = cache
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample_once(self):
+        """Collect, process and render one snapshot."""
+        timings = StageTimings()
+        if self.collection is not None:
+            raw_data, _age = self.collection.get(max_age=0, timings=timings)
+        else:
+            raw_data = run_stage(timings, "collect", self.collect)
+        data = process_all(raw_data, timings)
+        if self.on_sample is not None:
+            run_stage(timings, "record", self.on_sample, raw_data, data)
+        variables = get_template_variables(raw_data, data, timings)
+        # Pages get live updates from /events instead of reloading
+        variables["page_refresh_html"] = ""
+        variables["refresh_note"] = f"Live updates every {self.interval:g} seconds"
+        template = load_compiled_template(self.template_path, variables)
+        if template is None:
+            return False
+        html = run_stage(timings, "render", template.render, variables, count=len)
+        data["timings"] = timings.as_dict()
+        self.cache.publish(html, data, variables)
+        return True
+
+    def start(self):
+        """Take a first sample, then keep sampling in a daemon thread."""
+        self.sample_once()
+        self.thread = threading.Thread(target=self._run, name="dashboard-sampler", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        # The first cycle would duplicate the sample taken in start()
+        self.stop_event.wait(self.interval)
+        run_periodic(self.sample_once, self.interval, stop_event=self.stop_event, verbose=False)
+
+    def stop(self):
+        """Stop the sampling thread and close the event streams."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.cache.close()
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """Request handler; the cache and static files are set on the subclass."""
+
+    cache = None
+    collection = None
+    static_files = {}
+    head_only = False
+    server_version = "AAAMonitor/1.0"
+
+    def log_message(self, format, *args):
+        # Quiet by default: one line per request would flood the console
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        self.head_only = head
+        path = self.path.split("?", 1)[0]
+
+        if path in ("/", "/index.html"):
+            self.send_snapshot("html")
+        elif path == "/api/data":
+            self.send_snapshot("json")
+        elif path == "/events":
+            self.send_events()
+        elif path == "/metrics" and self.collection is not None:
+            self.send_metrics()
+        elif path in self.static_files:
+            body, content_type, etag = self.static_files[path]
+            self.send_body(body, content_type, etag)
+        else:
+            self.send_error(404, "Not Found")
+
+    def send_snapshot(self, kind):
+        """Send the latest rendered page or JSON data."""
+        snapshot = self.cache.get()
+        if snapshot is None:
+            self.send_error(503, "No data collected yet")
+            return
+
+        if kind == "html":
+            self.send_body(snapshot.html, "text/html; charset=utf-8", snapshot.html_etag)
+        else:
+            self.send_body(snapshot.data_json, "application/json", snapshot.json_etag)
+
+    def send_metrics(self):
+        """Send Prometheus metrics (collected again only when older than the TTL)."""
+        try:
+            raw_data, age = self.collection.get()
+        except Exception as e:
+            self.send_error(500, f"Collection failed: {e}")
+            return
+        body = format_metrics(raw_data, age).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not self.head_only:
+            self.wfile.write(body)
+
+    def send_events(self):
+        """
+        Stream updates as Server-Sent Events until the client leaves.
+
+        A client one version behind gets a "patch" event with the changed
+        variables only; a new or lagging client gets a "full" event.
+        """
+        version = self.cache.parse_event_id(self.headers.get("Last-Event-ID"))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if self.head_only:
+            return
+        self.close_connection = True
+
+        try:
+            while True:
+                snapshot = self.cache.wait_for_newer(version, KEEPALIVE_SECONDS)
+                if self.cache.closed:
+                    break
+                if snapshot is None:
+                    self.wfile.write(b": keep-alive\n\n")
+                    continue
+
+                if version and snapshot.version == version + 1:
+                    event, body = "patch", snapshot.changes_json
+                else:
+                    event, body = "full", snapshot.variables_json
+                header = f"id: {snapshot.event_id}\nevent: {event}\ndata: ".encode("utf-8")
+                self.wfile.write(header + body + b"\n\n")
+                version = snapshot.version
+        except OSError:
+            pass  # client gone (closed, reset, aborted or timed out)
+
+    def send_body(self, body, content_type, etag):
+        """Send a body, or 304 when the client already has this ETag."""
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if not self.head_only:
+            self.wfile.write(body)
+
+
+def load_static_files(template_path):
+    """Load the stylesheet next to the template (served as /template.css)."""
+    static_files = {}
+    css_path = Path(template_path).parent / "template.css"
+    try:
+        body = css_path.read_bytes()
+        etag = f'"css-{len(body):x}-{int(css_path.stat().st_mtime):x}"'
+        static_files["/template.css"] = (body, "text/css; charset=utf-8", etag)
+    except OSError:
+        pass
+    return static_files
+
+
+def create_server(collect, template_path, host="127.0.0.1", port=8000, interval=30.0,
+                  metrics_ttl=10.0, on_sample=None):
+    """
+    Build the HTTP server and its sampler (not started).
+
+    Args:
+        collect: Callable returning collect_all() data.
+        template_path: Path to the HTML template file.
+        host: Address to bind.
+        port: Port to listen on (0 = any free port).
+        interval: Seconds between samples.
+        metrics_ttl: Scrapes of /metrics reuse data younger than this.
+        on_sample: Callable(raw_data, data) run once per sample (history,
+            export, alerts), None for nothing.
+
+    Returns:
+        Tuple (ThreadingHTTPServer, DashboardSampler).
+    """
+    cache = SnapshotCache()
+    # Shared by the sampler and the scrapes: collections never overlap, and
+    # collect has no side effect, so scrapes only refresh the cached data
+    collection = CollectionCache(collect, metrics_ttl)
+    sampler = DashboardSampler(collect, str(template_path), cache, interval, collection, on_sample)
+
+    handler = type("BoundDashboardHandler", (DashboardHandler,), {
+        "cache": cache,
+        "collection": collection,
+        "static_files": load_static_files(template_path),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, sampler
+
+
+def serve(collect, template_path, host="127.0.0.1", port=8000, interval=30.0, metrics_ttl=10.0,
+          on_sample=None):
+    """
+    Serve the dashboard until interrupted.
+
+    Args:
+        collect: Callable returning collect_all() data.
+        template_path: Path to the HTML template file.
+        host: Address to bind.
+        port: Port to listen on.
+        interval: Seconds between samples.
+        metrics_ttl: Scrapes of /metrics reuse data younger than this.
+        on_sample: Callable(raw_data, data) run once per sample.
+    """
+    server, sampler = create_server(collect, template_path, host, port, interval, metrics_ttl,
+                                    on_sample)
+    sampler.start()
+    print(f"Serving dashboard on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print("Server stopped.")
+    finally:
+        sampler.stop()
+        server.server_close()
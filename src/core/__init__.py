@@ -1,28 +1,41 @@
 # Core Layer - Business logic and data processing
-from .data_processor import (
-    get_template_variables,
-    process_all,
-    get_color_class,
-    process_system,
-    process_cpu,
-    process_memory,
-    process_disk,
-    process_network,
-    process_processes,
-    process_files,
-    THRESHOLDS,
-)
+# Names are imported from their submodule on first access (PEP 562), so
+# importing one module of the package does not load all the others.
+import importlib
 
-__all__ = [
-    "get_template_variables",
-    "process_all",
-    "get_color_class",
-    "process_system",
-    "process_cpu",
-    "process_memory",
-    "process_disk",
-    "process_network",
-    "process_processes",
-    "process_files",
-    "THRESHOLDS",
-]
+_EXPORTS = {
+    "get_template_variables": "data_processor",
+    "process_all": "data_processor",
+    "get_color_class": "data_processor",
+    "process_system": "data_processor",
+    "process_cpu": "data_processor",
+    "process_memory": "data_processor",
+    "process_disk": "data_processor",
+    "process_network": "data_processor",
+    "process_processes": "data_processor",
+    "process_files": "data_processor",
+    "THRESHOLDS": "data_processor",
+    "run_periodic": "scheduler",
+    "get_fleet_variables": "fleet_processor",
+    "process_fleet": "fleet_processor",
+    "StageTimings": "instrumentation",
+    "run_stage": "instrumentation",
+    "AlertEngine": "alert_engine",
+    "AlertRule": "alert_engine",
+    "parse_rule": "alert_engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
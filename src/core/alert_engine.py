@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Core Layer - Threshold alert engine.
+This module evaluates alert rules over each new sample ("memory > 90 for
+3", "disk_used growth > 1GB/hour") with hysteresis and deduplication:
+a rule fires once when it starts breaching and resolves once when it
+clears. Each rule keeps O(1) state, history is never rescanned.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Relative margin between the firing and the clearing threshold
+DEFAULT_HYSTERESIS = 0.05
+
+# Samples used by growth rules to compute the rate
+DEFAULT_GROWTH_WINDOW = 12
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+RATE_PERIODS = {"s": 1, "sec": 1, "min": 60, "m": 60, "hour": 3600, "h": 3600, "day": 86400, "d": 86400}
+
+RULE_PATTERN = re.compile(
+    r"^(?:(?P<name>[\w.-]+):\s+)?"
+    r"(?P<metric>[\w:/.-]+)\s+"
+    r"(?:(?P<growth>growth)\s+)?"
+    r"(?P<op>[<>]=?)\s*(?P<value>[\d.]+\s*[KMGT]?B?)"
+    r"(?:/(?P<per>[a-z]+))?"
+    r"(?:\s+for\s+(?P<for_samples>\d+))?"
+    r"(?:\s+clear\s+(?P<clear>[\d.]+\s*[KMGT]?B?))?"
+    r"(?:\s+window\s+(?P<window>\d+))?\s*$"
+)
+
+
+def _mount(raw_data, mountpoint):
+    for mount in raw_data.get("disk", {}).get("mounts", []):
+        if mount.get("mountpoint") == mountpoint and "error" not in mount:
+            return mount
+    return {}
+
+
+# Metric name -> extractor from collect_all() data (None = not available)
+METRICS = {
+    "cpu": lambda d: d.get("cpu", {}).get("cpu_percent"),
+    "memory": lambda d: d.get("memory", {}).get("percent"),
+    "swap": lambda d: d.get("memory", {}).get("swap_percent"),
+    "disk": lambda d: d.get("disk", {}).get("percent"),
+    "disk_used": lambda d: d.get("disk", {}).get("used"),
+    "load1": lambda d: d.get("cpu", {}).get("load_avg_1min"),
+    "load5": lambda d: d.get("cpu", {}).get("load_avg_5min"),
+    "load15": lambda d: d.get("cpu", {}).get("load_avg_15min"),
+    "processes": lambda d: d.get("processes", {}).get("total_count"),
+    "net_sent_rate": lambda d: d.get("network", {}).get("bytes_sent_per_s"),
+    "net_recv_rate": lambda d: d.get("network", {}).get("bytes_recv_per_s"),
+}
+
+# Parameterized metrics: "mount:/var" (usage percent), "mount_used:/var" (bytes)
+MOUNT_METRICS = {
+    "mount": lambda d, path: _mount(d, path).get("percent"),
+    "mount_used": lambda d, path: _mount(d, path).get("used"),
+}
+
+
+def parse_size(text):
+    """Parse "90", "1.5GB" or "500M" into a number (binary units)."""
+    match = re.fullmatch(r"([\d.]+)\s*([KMGT]?)B?", text.strip())
+    if not match:
+        raise ValueError(f"invalid value: {text!r}")
+    return float(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def metric_getter(metric):
+    """
+    Return the extractor of a metric name.
+
+    Raises:
+        ValueError: Unknown metric.
+    """
+    if metric in METRICS:
+        return METRICS[metric]
+    kind, colon, argument = metric.partition(":")
+    if colon and kind in MOUNT_METRICS and argument:
+        extractor = MOUNT_METRICS[kind]
+        return lambda raw_data: extractor(raw_data, argument)
+    raise ValueError(f"unknown metric {metric!r} (known: {', '.join(METRICS)}, "
+                     f"mount:<path>, mount_used:<path>)")
+
+
+class AlertRule:
+    """
+    One alert rule and its incremental state.
+
+    The rule fires after for_samples consecutive breaching samples and
+    resolves after for_samples consecutive samples past the clearing
+    threshold (hysteresis). Growth rules compare the per-period rate over
+    the last window samples, kept in a fixed-size deque.
+    """
+
+    def __init__(self, name, metric, op, threshold, for_samples=1, clear=None,
+                 growth=False, period=3600, window=DEFAULT_GROWTH_WINDOW, text=None):
+        self.name = name
+        self.text = text
+        self.metric = metric
+        self.getter = metric_getter(metric)
+        self.op = op
+        self.threshold = threshold
+        self.for_samples = max(for_samples, 1)
+        above = op.startswith(">")
+        if clear is None:
+            clear = threshold * (1 - DEFAULT_HYSTERESIS if above else 1 + DEFAULT_HYSTERESIS)
+        self.clear = clear
+        self.growth = growth
+        self.period = period
+        self.history = deque(maxlen=max(window, 1) + 1) if growth else None
+
+        self.firing = False
+        self.count = 0
+        self.since = None
+        self.value = None
+
+    def breaches(self, value):
+        if self.op == ">":
+            return value > self.threshold
+        if self.op == ">=":
+            return value >= self.threshold
+        if self.op == "<":
+            return value < self.threshold
+        return value <= self.threshold
+
+    def clears(self, value):
+        return value < self.clear if self.op.startswith(">") else value > self.clear
+
+    def observe(self, raw_data, now):
+        """
+        Feed one sample.
+
+        Returns:
+            "firing", "resolved" or None (no change).
+        """
+        value = self.getter(raw_data)
+        if not isinstance(value, (int, float)):
+            return None
+        if self.growth:
+            self.history.append((now, value))
+            first_time, first_value = self.history[0]
+            if len(self.history) < 2 or now <= first_time:
+                return None
+            value = (value - first_value) / (now - first_time) * self.period
+        self.value = value
+
+        if not self.firing:
+            self.count = self.count + 1 if self.breaches(value) else 0
+            if self.count >= self.for_samples:
+                self.firing, self.count, self.since = True, 0, now
+                return "firing"
+        else:
+            self.count = self.count + 1 if self.clears(value) else 0
+            if self.count >= self.for_samples:
+                self.firing, self.count = False, 0
+                return "resolved"
+        return None
+
+    def describe(self):
+        """Human-readable rule, e.g. "memory > 90 for 3 samples"."""
+        if self.text:
+            return self.text
+        what = f"{self.metric} growth" if self.growth else self.metric
+        per = ""
+        if self.growth:
+            periods = {1: "s", 60: "min", 3600: "hour", 86400: "day"}
+            per = "/" + periods.get(self.period, f"{self.period:g}s")
+        return f"{what} {self.op} {self.threshold:g}{per} for {self.for_samples} samples"
+
+
+def parse_rule(text):
+    """
+    Parse a rule such as "memory > 90 for 3" or "disk_used growth > 1GB/hour".
+
+    Syntax: [name: ] metric [growth] op value[/period] [for N] [clear X] [window N]
+
+    Returns:
+        AlertRule.
+
+    Raises:
+        ValueError: Invalid rule.
+    """
+    match = RULE_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"invalid alert rule: {text!r}")
+    growth = bool(match.group("growth"))
+    per = match.group("per")
+    if per and not growth:
+        raise ValueError(f"/{per} is only valid for growth rules: {text!r}")
+    if per and per not in RATE_PERIODS:
+        raise ValueError(f"unknown period /{per} (known: {', '.join(RATE_PERIODS)})")
+
+    return AlertRule(
+        name=match.group("name") or text.strip(),
+        metric=match.group("metric"),
+        op=match.group("op"),
+        threshold=parse_size(match.group("value")),
+        for_samples=int(match.group("for_samples") or 1),
+        clear=parse_size(match.group("clear")) if match.group("clear") else None,
+        growth=growth,
+        period=RATE_PERIODS[per or "hour"],
+        window=int(match.group("window") or DEFAULT_GROWTH_WINDOW),
+        text=" ".join(text.split()[1:] if match.group("name") else text.split()),
+    )
+
+
+class AlertEngine:
+    """Evaluates a set of rules over each new sample (thread-safe)."""
+
+    def __init__(self, rules, clock=time.time):
+        self.rules = list(rules)
+        self.clock = clock
+        self.lock = threading.Lock()
+
+    def evaluate(self, raw_data, now=None):
+        """
+        Evaluate every rule against one sample.
+
+        Args:
+            raw_data: Data collected by collect_all.
+            now: Sample time (default: clock()).
+
+        Returns:
+            List of alert events (only state changes).
+        """
+        now = now if now is not None else self.clock()
+        hostname = raw_data.get("system", {}).get("hostname", "N/A")
+        events = []
+        with self.lock:
+            for rule in self.rules:
+                state = rule.observe(raw_data, now)
+                if state is None:
+                    continue
+                events.append({
+                    "rule": rule.name,
+                    "state": state,
+                    "metric": rule.metric,
+                    "value": round(rule.value, 3),
+                    "threshold": rule.threshold if state == "firing" else rule.clear,
+                    "hostname": hostname,
+                    "time": now,
+                    "timestamp": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+                    "message": (f"[{state.upper()}] {hostname}: {rule.describe()} "
+                                f"(value {rule.value:g})"),
+                })
+        return events
+
+    def active(self):
+        """Names of the rules currently firing."""
+        with self.lock:
+            return [rule.name for rule in self.rules if rule.firing]
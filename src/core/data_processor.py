@@ -4,6 +4,21 @@ Core Layer - Business logic and data processing.
 This module transforms raw data into a usable format for display.
 """
 
+from html import escape
+
+from .html_fragments import (
+    CORE_ROW,
+    DISK_IO_ROW,
+    EXTENSION_ROW,
+    INTERFACE_ROW,
+    LARGEST_FILE_ROW,
+    MOUNT_ROW,
+    NETWORK_RATE_ROW,
+    PROCESS_ROW,
+    TIMING_ROW,
+)
+from .instrumentation import format_delta, run_stage
+
 # Thresholds for color indicators
 THRESHOLDS = {
     "green": 50,    # 0-50%
@@ -11,6 +26,9 @@ THRESHOLDS = {
     "red": 100,     # 81-100%
 }
 
+# Reload delay of the static page (the built-in server pushes updates instead)
+PAGE_REFRESH_SECONDS = 30
+
 
 def get_color_class(percentage):
     """
@@ -99,6 +117,38 @@ def process_disk(raw_data):
     disk = raw_data.get("disk", {})
     percent = disk.get("percent", 0)
 
+    # One row per mount (unreachable mounts keep their error)
+    mounts_list = []
+    for mount in disk.get("mounts", []):
+        mount_percent = mount.get("percent", 0)
+        mounts_list.append({
+            "mountpoint": mount.get("mountpoint", "N/A"),
+            "device": mount.get("device") or "N/A",
+            "fstype": mount.get("fstype") or "N/A",
+            "total": mount.get("total_formatted", "N/A"),
+            "used": mount.get("used_formatted", "N/A"),
+            "free": mount.get("free_formatted", "N/A"),
+            "percent": mount_percent,
+            "percent_int": int(mount_percent),
+            "color_class": get_color_class(mount_percent),
+            "error": mount.get("error", ""),
+            "usage": (mount["error"] if "error" in mount
+                      else f"{mount_percent:.1f}% of {mount.get('total_formatted', 'N/A')}"),
+        })
+
+    # Per-device I/O rates (empty on the first collection)
+    io_list = []
+    for device, rates in sorted(disk.get("io_rates", {}).items()):
+        io_list.append({
+            "name": device,
+            "read_iops": round(rates.get("read_iops", 0), 1),
+            "write_iops": round(rates.get("write_iops", 0), 1),
+            "read": rates.get("read_bytes_per_s_formatted", "N/A"),
+            "write": rates.get("write_bytes_per_s_formatted", "N/A"),
+            "await_ms": round(rates.get("await_ms", 0), 2),
+            "util_percent": round(rates.get("util_percent", 0), 1),
+        })
+
     return {
         "total": disk.get("total_formatted", "N/A"),
         "used": disk.get("used_formatted", "N/A"),
@@ -106,6 +156,8 @@ def process_disk(raw_data):
         "percent": percent,
         "percent_int": int(percent),
         "color_class": get_color_class(percent),
+        "mounts": mounts_list,
+        "io": io_list,
     }
 
 
@@ -118,12 +170,28 @@ def process_network(raw_data):
     for iface, ip in net.get("interfaces", {}).items():
         interfaces_list.append({"name": iface, "ip": ip})
 
+    # Per-interface rates (empty on the first collection)
+    rates_list = []
+    for iface, rates in sorted(net.get("rates", {}).items()):
+        rates_list.append({
+            "name": iface,
+            "sent": rates.get("bytes_sent_per_s_formatted", "N/A"),
+            "recv": rates.get("bytes_recv_per_s_formatted", "N/A"),
+            "packets_sent": round(rates.get("packets_sent_per_s", 0), 1),
+            "packets_recv": round(rates.get("packets_recv_per_s", 0), 1),
+            "errors": round(rates.get("errors_per_s", 0), 2),
+            "drops": round(rates.get("drops_per_s", 0), 2),
+        })
+
     return {
         "bytes_sent": net.get("bytes_sent_formatted", "N/A"),
         "bytes_recv": net.get("bytes_recv_formatted", "N/A"),
         "packets_sent": net.get("packets_sent", 0),
         "packets_recv": net.get("packets_recv", 0),
+        "sent_rate": net.get("bytes_sent_per_s_formatted", "N/A"),
+        "recv_rate": net.get("bytes_recv_per_s_formatted", "N/A"),
         "interfaces": interfaces_list,
+        "rates": rates_list,
     }
 
 
@@ -133,6 +201,7 @@ def process_processes(raw_data):
 
     return {
         "total_count": procs.get("total_count", 0),
+        "top_n": procs.get("top_n", 3),
         "top_3_cpu": procs.get("top_3_cpu", []),
         "top_3_memory": procs.get("top_3_memory", []),
     }
@@ -163,39 +232,53 @@ def process_files(raw_data):
     }
 
 
-def process_all(raw_data):
+SECTION_PROCESSORS = (
+    ("system", process_system),
+    ("cpu", process_cpu),
+    ("memory", process_memory),
+    ("disk", process_disk),
+    ("network", process_network),
+    ("processes", process_processes),
+    ("files", process_files),
+)
+
+
+def process_all(raw_data, timings=None):
     """
     Process all data for display.
 
     Args:
         raw_data: Data collected by system_collector functions.
+        timings: StageTimings recording each step as "process.<name>".
 
     Returns:
         Dictionary with all formatted data.
     """
-    return {
-        "timestamp": raw_data.get("timestamp", "N/A"),
-        "system": process_system(raw_data),
-        "cpu": process_cpu(raw_data),
-        "memory": process_memory(raw_data),
-        "disk": process_disk(raw_data),
-        "network": process_network(raw_data),
-        "processes": process_processes(raw_data),
-        "files": process_files(raw_data),
-    }
-
-
-def get_template_variables(raw_data):
+    data = {"timestamp": raw_data.get("timestamp", "N/A")}
+    for name, func in SECTION_PROCESSORS:
+        if name in raw_data:
+            data[name] = run_stage(timings, f"process.{name}", func, raw_data)
+        else:
+            # Section not collected (--only): N/A placeholders, not a stage
+            data[name] = func(raw_data)
+    data["collector_ages"] = raw_data.get("collector_ages", {})
+    return data
+
+
+def get_template_variables(raw_data, data=None, timings=None):
     """
     Generate a flat dictionary of variables for the HTML template.
 
     Args:
         raw_data: Data collected by system_collector functions.
+        data: Result of process_all(raw_data), if already computed.
+        timings: StageTimings of the run, shown on the dashboard.
 
     Returns:
         Dictionary with all variables for substitution.
     """
-    data = process_all(raw_data)
+    if data is None:
+        data = process_all(raw_data, timings)
     variables = {
         # Timestamp
         "timestamp": data["timestamp"],
@@ -247,79 +330,63 @@ def get_template_variables(raw_data):
         "network_bytes_recv": data["network"]["bytes_recv"],
         "network_packets_sent": data["network"]["packets_sent"],
         "network_packets_recv": data["network"]["packets_recv"],
+        "network_sent_rate": data["network"]["sent_rate"],
+        "network_recv_rate": data["network"]["recv_rate"],
 
         # Processes
         "processes_total": data["processes"]["total_count"],
+        "processes_top_n": data["processes"]["top_n"],
 
         # Files
         "files_directory": data["files"]["directory"],
         "files_total": data["files"]["total_files"],
+
+        # Page
+        "page_refresh_html": f'<meta http-equiv="refresh" content="{PAGE_REFRESH_SECONDS}">',
+        "refresh_note": f"Auto-refresh every {PAGE_REFRESH_SECONDS} seconds",
     }
 
-    # Generate HTML for CPU cores
-    cores_html = ""
-    for core in data["cpu"]["cores"]:
-        cores_html += f'''
-        <div class="core-item">
-            <span class="core-label">Core {core["id"]}</span>
-            <div class="gauge-mini">
-                <div class="gauge-fill {core["color_class"]}" style="width: {core["percent"]}%;"></div>
-            </div>
-            <span class="core-value">{core["percent"]:.1f}%</span>
-        </div>'''
-    variables["cpu_cores_html"] = cores_html
-
-    # Generate HTML for network interfaces
-    interfaces_html = ""
-    for iface in data["network"]["interfaces"]:
-        interfaces_html += f'<li><strong>{iface["name"]}:</strong> {iface["ip"]}</li>'
-    variables["network_interfaces_html"] = interfaces_html
-
-    # Generate HTML for top 3 CPU processes
-    top_cpu_html = ""
-    for proc in data["processes"]["top_3_cpu"]:
-        top_cpu_html += f'''
-        <tr>
-            <td>{proc["pid"]}</td>
-            <td>{proc["name"]}</td>
-            <td>{proc["cpu_percent"]:.1f}%</td>
-            <td>{proc["memory_percent"]:.1f}%</td>
-        </tr>'''
-    variables["processes_top_cpu_html"] = top_cpu_html
-
-    # Generate HTML for top 3 memory processes
-    top_mem_html = ""
-    for proc in data["processes"]["top_3_memory"]:
-        top_mem_html += f'''
-        <tr>
-            <td>{proc["pid"]}</td>
-            <td>{proc["name"]}</td>
-            <td>{proc["cpu_percent"]:.1f}%</td>
-            <td>{proc["memory_percent"]:.1f}%</td>
-        </tr>'''
-    variables["processes_top_memory_html"] = top_mem_html
-
-    # Generate HTML for file extensions
-    extensions_html = ""
-    for ext in data["files"]["by_extension"]:
-        extensions_html += f'''
-        <tr>
-            <td>{ext["extension"]}</td>
-            <td>{ext["count"]}</td>
-            <td>{ext["size"]}</td>
-            <td>{ext["percentage"]}%</td>
-        </tr>'''
-    variables["files_extensions_html"] = extensions_html
-
-    # Generate HTML for largest files
-    largest_html = ""
-    for f in data["files"]["top_5_largest"]:
-        largest_html += f'''
-        <tr>
-            <td title="{f["path"]}">{f["name"]}</td>
-            <td>{f["size_formatted"]}</td>
-        </tr>'''
-    variables["files_largest_html"] = largest_html
+    # Age of each section when collectors are cached
+    ages = data.get("collector_ages") or {}
+    variables["collector_ages"] = ", ".join(
+        f"{name} {age:.0f}s" if age is not None else f"{name} N/A"
+        for name, age in ages.items()
+    )
+    if variables["collector_ages"]:
+        variables["collector_ages"] = "Data age: " + variables["collector_ages"]
+
+    # Generate the HTML fragments (values from the machine are escaped)
+    variables["cpu_cores_html"] = CORE_ROW.render(data["cpu"]["cores"])
+    variables["disk_mounts_html"] = MOUNT_ROW.render(data["disk"]["mounts"])
+    variables["disk_io_html"] = DISK_IO_ROW.render(data["disk"]["io"])
+    variables["network_interfaces_html"] = INTERFACE_ROW.render(data["network"]["interfaces"])
+    variables["network_rates_html"] = NETWORK_RATE_ROW.render(data["network"]["rates"])
+    variables["processes_top_cpu_html"] = PROCESS_ROW.render(data["processes"]["top_3_cpu"])
+    variables["processes_top_memory_html"] = PROCESS_ROW.render(data["processes"]["top_3_memory"])
+    variables["files_extensions_html"] = EXTENSION_ROW.render(data["files"]["by_extension"])
+    variables["files_largest_html"] = LARGEST_FILE_ROW.render(data["files"]["top_5_largest"])
+
+    # Stage timings recorded so far (collection, processing)
+    stages = timings.as_dict()["stages"] if timings is not None else []
+    variables["timings_html"] = TIMING_ROW.render(
+        {
+            "stage": stage["stage"] + ("" if stage["ok"] else " (failed)"),
+            "ms": stage["seconds"] * 1000,
+            "rss_delta": format_delta(stage["rss_delta"]),
+            "items": stage["items"] if stage["items"] is not None else "-",
+        }
+        for stage in stages
+    )
+    # Wall time of the run so far: stages nest ("collect" holds the
+    # "collect.<name>" stages), so their sum would count some time twice
+    variables["timings_total"] = (f"{timings.total() * 1000:.1f} ms"
+                                  if stages else "N/A")
+
+    # Scalar values come from the machine and the command line (hostname,
+    # directory, collector errors): escape them; *_html values are markup
+    for name, value in variables.items():
+        if isinstance(value, str) and not name.endswith("_html"):
+            variables[name] = escape(value)
 
     return variables
 
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Core Layer - Fleet data processing.
+This module turns the state of the polled agents into the rows and
+template variables of the fleet overview page.
+"""
+
+import hashlib
+import re
+from datetime import datetime
+from html import escape
+
+from .data_processor import (
+    PAGE_REFRESH_SECONDS,
+    get_color_class,
+    process_cpu,
+    process_disk,
+    process_memory,
+    process_processes,
+    process_system,
+)
+from .html_fragments import FLEET_HOST_ROW
+
+
+def host_slug(name):
+    """
+    File-name-safe, unique version of an agent name.
+
+    The readable part replaces other characters with "-", so distinct
+    names can clash ("10.0.0.5:8000" and "10-0-0-5:8000"); a short hash of
+    the full name keeps their pages apart
+    ("10.0.0.5:8000" -> "10-0-0-5-8000-<8 hex digits>").
+    """
+    readable = re.sub(r"[^A-Za-z0-9_-]+", "-", name).strip("-") or "host"
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{readable}-{digest}"
+
+
+def host_page_name(name):
+    """File name of the drill-down page of one agent."""
+    return f"fleet-{host_slug(name)}.html"
+
+
+def process_host(name, host):
+    """
+    Process the state of one agent for the overview.
+
+    Args:
+        name: Agent name ("host:port").
+        host: FleetCollector.hosts entry.
+
+    Returns:
+        Dictionary with the overview row data.
+    """
+    raw_data = host.get("data") or {}
+    system = process_system(raw_data)
+    cpu = process_cpu(raw_data)
+    memory = process_memory(raw_data)
+    disk = process_disk(raw_data)
+    last_seen = host.get("last_seen")
+    latency = host.get("latency")
+
+    return {
+        "name": name,
+        "page": host_page_name(name),
+        "status": host.get("status", "pending"),
+        "has_data": bool(raw_data),
+        "hostname": system["hostname"],
+        "uptime": system["uptime"],
+        "cpu_percent": cpu["percent"],
+        "cpu_color_class": cpu["color_class"],
+        "load_avg_1min": cpu["load_avg_1min"],
+        "memory_percent": memory["percent"],
+        "memory_color_class": memory["color_class"],
+        "disk_percent": disk["percent"],
+        "disk_color_class": disk["color_class"],
+        "processes": process_processes(raw_data)["total_count"],
+        "last_seen": (datetime.fromtimestamp(last_seen).strftime("%Y-%m-%d %H:%M:%S")
+                      if last_seen else "N/A"),
+        "latency_ms": round(latency * 1000) if latency is not None else "N/A",
+        "error": host.get("error") or "",
+    }
+
+
+def process_fleet(hosts):
+    """
+    Process the state of the whole fleet.
+
+    Args:
+        hosts: FleetCollector.hosts.
+
+    Returns:
+        Dictionary with the host rows (unreachable agents first) and the
+        fleet totals.
+    """
+    rows = [process_host(name, host) for name, host in hosts.items()]
+    rows.sort(key=lambda row: (row["status"] == "up", row["name"]))
+
+    up_rows = [row for row in rows if row["status"] == "up"]
+    cpu_avg = sum(row["cpu_percent"] for row in up_rows) / len(up_rows) if up_rows else 0
+    memory_avg = sum(row["memory_percent"] for row in up_rows) / len(up_rows) if up_rows else 0
+
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total": len(rows),
+        "up": len(up_rows),
+        "down": sum(1 for row in rows if row["status"] == "down"),
+        "pending": sum(1 for row in rows if row["status"] == "pending"),
+        "cpu_avg": round(cpu_avg, 1),
+        "cpu_avg_color_class": get_color_class(cpu_avg),
+        "memory_avg": round(memory_avg, 1),
+        "memory_avg_color_class": get_color_class(memory_avg),
+        "hosts": rows,
+    }
+
+
+def get_fleet_variables(fleet):
+    """
+    Generate the variables of the fleet overview template.
+
+    Args:
+        fleet: Result of process_fleet().
+
+    Returns:
+        Dictionary with all variables for substitution.
+    """
+    variables = {
+        "timestamp": fleet["timestamp"],
+        "fleet_total": fleet["total"],
+        "fleet_up": fleet["up"],
+        "fleet_down": fleet["down"],
+        "fleet_pending": fleet["pending"],
+        "fleet_cpu_avg": fleet["cpu_avg"],
+        "fleet_cpu_avg_int": int(fleet["cpu_avg"]),
+        "fleet_cpu_avg_color_class": fleet["cpu_avg_color_class"],
+        "fleet_memory_avg": fleet["memory_avg"],
+        "fleet_memory_avg_int": int(fleet["memory_avg"]),
+        "fleet_memory_avg_color_class": fleet["memory_avg_color_class"],
+        "page_refresh_html": f'<meta http-equiv="refresh" content="{PAGE_REFRESH_SECONDS}">',
+    }
+
+    # Agent names, hostnames and errors come from the network: escape them
+    rows = []
+    for row in fleet["hosts"]:
+        name_html = escape(row["name"])
+        if row["has_data"]:
+            name_html = f'<a href="{escape(row["page"])}">{name_html}</a>'
+        status_html = escape(row["status"])
+        if row["error"]:
+            status_html += f' <small>({escape(row["error"])})</small>'
+        rows.append(dict(row, name_html=name_html, status_html=status_html))
+    variables["fleet_hosts_html"] = FLEET_HOST_ROW.render(rows)
+
+    return variables
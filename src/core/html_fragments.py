@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Core Layer - HTML fragments of the dashboard tables and lists.
+This module renders rows (cores, processes, extensions, ...) through
+reusable row templates into a list buffer joined once, escaping the
+values that come from the machine (process names, paths, interfaces).
+"""
+
+from html import escape
+
+
+class RowTemplate:
+    """
+    Row markup with str.format fields, e.g. "<td>{name}</td>".
+
+    String values are HTML-escaped before formatting, except the fields
+    listed in raw (markup built by the caller). Numbers keep their format
+    specs ("{percent:.1f}").
+    """
+
+    def __init__(self, template, raw=()):
+        self.template = template
+        self.raw = frozenset(raw)
+
+    def format(self, row):
+        """
+        Format one row.
+
+        Args:
+            row: Dictionary of field values.
+
+        Returns:
+            Row HTML (str).
+        """
+        values = {
+            key: escape(value) if isinstance(value, str) and key not in self.raw else value
+            for key, value in row.items()
+        }
+        return self.template.format_map(values)
+
+    def write_rows(self, rows, write):
+        """
+        Format rows into a writer, without building the fragment.
+
+        Args:
+            rows: Iterable of row dictionaries.
+            write: Callable receiving each row (list.append, file.write, ...).
+
+        Returns:
+            Number of rows written.
+        """
+        count = 0
+        for row in rows:
+            write(self.format(row))
+            count += 1
+        return count
+
+    def render(self, rows):
+        """
+        Format rows into one fragment.
+
+        Args:
+            rows: Iterable of row dictionaries.
+
+        Returns:
+            Fragment HTML (str).
+        """
+        parts = []
+        self.write_rows(rows, parts.append)
+        return "".join(parts)
+
+
+CORE_ROW = RowTemplate('''
+        <div class="core-item">
+            <span class="core-label">Core {id}</span>
+            <div class="gauge-mini">
+                <div class="gauge-fill {color_class}" style="width: {percent}%;"></div>
+            </div>
+            <span class="core-value">{percent:.1f}%</span>
+        </div>''')
+
+MOUNT_ROW = RowTemplate('''
+        <div class="mount-item" title="{device} ({fstype})">
+            <span class="mount-label">{mountpoint}</span>
+            <div class="gauge-mini">
+                <div class="gauge-fill {color_class}" style="width: {percent}%;"></div>
+            </div>
+            <span class="mount-value">{usage}</span>
+        </div>''')
+
+DISK_IO_ROW = RowTemplate('''
+        <tr>
+            <td>{name}</td>
+            <td>{read_iops}</td>
+            <td>{write_iops}</td>
+            <td>{read}</td>
+            <td>{write}</td>
+            <td>{await_ms}</td>
+            <td>{util_percent}%</td>
+        </tr>''')
+
+INTERFACE_ROW = RowTemplate('<li><strong>{name}:</strong> {ip}</li>')
+
+NETWORK_RATE_ROW = RowTemplate('''
+        <tr>
+            <td>{name}</td>
+            <td>{recv}</td>
+            <td>{sent}</td>
+            <td>{packets_recv}</td>
+            <td>{packets_sent}</td>
+            <td>{errors}</td>
+            <td>{drops}</td>
+        </tr>''')
+
+PROCESS_ROW = RowTemplate('''
+        <tr>
+            <td>{pid}</td>
+            <td>{name}</td>
+            <td>{cpu_percent:.1f}%</td>
+            <td>{memory_percent:.1f}%</td>
+        </tr>''')
+
+EXTENSION_ROW = RowTemplate('''
+        <tr>
+            <td>{extension}</td>
+            <td>{count}</td>
+            <td>{size}</td>
+            <td>{percentage}%</td>
+        </tr>''')
+
+LARGEST_FILE_ROW = RowTemplate('''
+        <tr>
+            <td title="{path}">{name}</td>
+            <td>{size_formatted}</td>
+        </tr>''')
+
+TIMING_ROW = RowTemplate('''
+        <tr>
+            <td>{stage}</td>
+            <td>{ms:.2f}</td>
+            <td>{rss_delta}</td>
+            <td>{items}</td>
+        </tr>''')
+
+# name_html and status_html are built by get_fleet_variables (already escaped)
+FLEET_HOST_ROW = RowTemplate('''
+        <tr class="host-{status}">
+            <td>{name_html}</td>
+            <td>{hostname}</td>
+            <td>{status_html}</td>
+            <td>
+                <div class="gauge-mini"><div class="gauge-fill {cpu_color_class}" style="width: {cpu_percent}%;"></div></div>
+                {cpu_percent:.1f}%
+            </td>
+            <td>
+                <div class="gauge-mini"><div class="gauge-fill {memory_color_class}" style="width: {memory_percent}%;"></div></div>
+                {memory_percent:.1f}%
+            </td>
+            <td>
+                <div class="gauge-mini"><div class="gauge-fill {disk_color_class}" style="width: {disk_percent}%;"></div></div>
+                {disk_percent:.1f}%
+            </td>
+            <td>{load_avg_1min}</td>
+            <td>{processes}</td>
+            <td>{uptime}</td>
+            <td>{last_seen}</td>
+            <td>{latency_ms}</td>
+        </tr>''', raw=("name_html", "status_html"))
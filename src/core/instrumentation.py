@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Core Layer - Per-stage timing instrumentation.
+This module records how long each stage of a run takes (collectors,
+processing, rendering), with its memory delta and item count, so that the
+part eating the interval budget is visible at once.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None if unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def run_stage(timings, name, func, *args, count=None):
+    """Run func(*args), recorded as a stage when timings is not None."""
+    if timings is None:
+        return func(*args)
+    return timings.call(name, func, *args, count=count)
+
+
+class StageTimings:
+    """
+    Records of the stages of one run.
+
+    Each record holds the stage name, its duration, the RSS delta, the
+    Python allocation delta (only while tracemalloc is tracing, e.g. with
+    PYTHONTRACEMALLOC=1), an optional item count and whether it succeeded.
+    Stages may be recorded from several threads (parallel collectors).
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def call(self, name, func, *args, count=None, **kwargs):
+        """
+        Run func(*args, **kwargs) as a stage and return its result.
+
+        Args:
+            name: Stage name, e.g. "collect.files".
+            func: Callable to run.
+            count: Optional callable extracting an item count from the result.
+        """
+        rss_before = current_rss()
+        alloc_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        start = time.perf_counter()
+        ok = False
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            ok = not (isinstance(result, dict) and "error" in result)
+            return result
+        finally:
+            seconds = time.perf_counter() - start
+            rss_after = current_rss()
+            items = None
+            if ok and count is not None:
+                try:
+                    items = count(result)
+                except (TypeError, KeyError, AttributeError):
+                    items = None
+            record = {
+                "stage": name,
+                "seconds": round(seconds, 6),
+                "rss_delta": (rss_after - rss_before
+                              if rss_before is not None and rss_after is not None else None),
+                "alloc_delta": (tracemalloc.get_traced_memory()[0] - alloc_before
+                                if alloc_before is not None and tracemalloc.is_tracing() else None),
+                "items": items,
+                "ok": ok,
+            }
+            with self.lock:
+                self.stages.append(record)
+
+    def wrap(self, name, func, count=None):
+        """Return func instrumented as the given stage."""
+        def wrapper(*args, **kwargs):
+            return self.call(name, func, *args, count=count, **kwargs)
+        return wrapper
+
+    def total(self):
+        """Wall time since the recorder was created."""
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        """JSON-serializable summary."""
+        with self.lock:
+            stages = list(self.stages)
+        return {"total_seconds": round(self.total(), 6), "stages": stages}
+
+    def format_table(self, budget=None):
+        """
+        Format the stages as a text table.
+
+        Args:
+            budget: Interval in seconds; adds each stage's share of it.
+
+        Returns:
+            Table text (str).
+        """
+        summary = self.as_dict()
+        lines = [f"{'stage':<24} {'ms':>10} {'RSS delta':>11} {'alloc delta':>12} {'items':>9}"
+                 + (f" {'budget':>7}" if budget else "")]
+        for stage in summary["stages"]:
+            line = (f"{stage['stage'] + ('' if stage['ok'] else ' (failed)'):<24} "
+                    f"{stage['seconds'] * 1000:>10.2f} "
+                    f"{format_delta(stage['rss_delta']):>11} "
+                    f"{format_delta(stage['alloc_delta']):>12} "
+                    f"{stage['items'] if stage['items'] is not None else '-':>9}")
+            if budget:
+                line += f" {stage['seconds'] / budget * 100:>6.1f}%"
+            lines.append(line)
+        lines.append(f"{'total':<24} {summary['total_seconds'] * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+def format_delta(value):
+    """Signed human-readable byte delta ("-" when unknown)."""
+    if value is None:
+        return "-"
+    sign = "-" if value < 0 else "+"
+    value = abs(value)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
+    return f"{sign}{value:.1f} GB"
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Core Layer - In-process periodic scheduling.
+This module runs a task at a fixed interval without drift.
+"""
+
+import time
+from datetime import datetime
+
+
+def run_periodic(task, interval, max_cycles=None, clock=time.monotonic, sleep=time.sleep,
+                 stop_event=None, verbose=True):
+    """
+    Run a task on a drift-free schedule.
+
+    Cycles are aligned on start + k * interval, so the time spent in the
+    task does not shift the following cycles. When a cycle overruns its
+    budget, the missed slots are skipped instead of being run back to back.
+
+    Args:
+        task: Callable run each cycle, returns True on success.
+        interval: Seconds between cycle starts.
+        max_cycles: Stop after this many cycles (None = run forever).
+        clock: Monotonic clock function.
+        sleep: Sleep function.
+        stop_event: threading.Event ending the loop when set (also used
+            to wait between cycles, so stopping is immediate).
+        verbose: Print one timing line per cycle.
+
+    Returns:
+        Number of failed cycles.
+    """
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+
+    failures = 0
+    cycle = 0
+    next_run = clock()
+
+    if stop_event is not None:
+        sleep = stop_event.wait
+
+    while max_cycles is None or cycle < max_cycles:
+        if stop_event is not None and stop_event.is_set():
+            break
+        cycle += 1
+        start = clock()
+
+        try:
+            ok = task()
+        except Exception as e:
+            print(f"      ERROR: {e}")
+            ok = False
+        if not ok:
+            failures += 1
+
+        elapsed = clock() - start
+        if verbose or not ok:
+            usage = elapsed / interval * 100
+            status = "ok" if ok else "FAILED"
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] "
+                  f"cycle {cycle} {status}: {elapsed:.3f}s / {interval:.3f}s budget ({usage:.0f}%)")
+
+        next_run += interval
+        now = clock()
+        if now > next_run:
+            skipped = int((now - next_run) // interval) + 1
+            print(f"      Warning: cycle over budget, skipping {skipped} slot(s)")
+            next_run += skipped * interval
+
+        if max_cycles is not None and cycle >= max_cycles:
+            break
+
+        delay = next_run - clock()
+        if delay > 0:
+            sleep(delay)
+
+    return failures
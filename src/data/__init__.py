@@ -1,26 +1,55 @@
 # Data Layer - System data access via psutil
-from .system_collector import (
-    collect_all,
-    get_system_info,
-    get_cpu_info,
-    get_memory_info,
-    get_disk_info,
-    get_network_info,
-    get_processes_info,
-    get_files_info,
-    format_bytes,
-    format_uptime,
-)
+# Names are imported from their submodule on first access (PEP 562), so
+# importing one module of the package does not load all the others.
+import importlib
 
-__all__ = [
-    "collect_all",
-    "get_system_info",
-    "get_cpu_info",
-    "get_memory_info",
-    "get_disk_info",
-    "get_network_info",
-    "get_processes_info",
-    "get_files_info",
-    "format_bytes",
-    "format_uptime",
-]
+_EXPORTS = {
+    "CpuSampler": "system_collector",
+    "ProcessSampler": "system_collector",
+    "COLLECTOR_TIMEOUTS": "system_collector",
+    "collect_all": "system_collector",
+    "collect_parallel": "system_collector",
+    "get_collectors": "system_collector",
+    "get_system_info": "system_collector",
+    "get_cpu_info": "system_collector",
+    "get_memory_info": "system_collector",
+    "get_disk_info": "system_collector",
+    "get_network_info": "system_collector",
+    "get_processes_info": "system_collector",
+    "get_files_info": "system_collector",
+    "format_bytes": "formatting",
+    "format_uptime": "formatting",
+    "set_backend": "system_collector",
+    "ProcBackend": "proc_backend",
+    "ScanStats": "file_scanner",
+    "scan_tree": "file_scanner",
+    "scan_tree_parallel": "file_scanner",
+    "ScanIndex": "scan_index",
+    "scan_tree_incremental": "scan_index",
+    "FileWatcher": "file_watcher",
+    "HistoryStore": "history_store",
+    "SnapshotExporter": "snapshot_export",
+    "read_snapshots": "snapshot_export",
+    "Snapshot": "snapshot_model",
+    "deep_size": "snapshot_model",
+    "CounterRates": "counter_rates",
+    "set_state_dir": "counter_rates",
+    "CollectorCache": "collector_cache",
+    "AgentClient": "fleet_collector",
+    "FleetCollector": "fleet_collector",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Per-collector cache.
+This module keeps the last result of each collector with its own TTL, and
+refreshes stale sections in the background while the previous value is
+still served (stale-while-revalidate), so that an expensive collector
+such as the file scan never delays the fast ones.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+# Seconds a collected section stays fresh (inf = collected once)
+DEFAULT_TTLS = {
+    "system": float("inf"),
+    "cpu": 1,
+    "memory": 1,
+    "disk": 30,
+    "network": 1,
+    "processes": 60,
+    "files": 600,
+}
+
+# Cheap updates applied to a cached section at each read (system_collector
+# functions, looked up when a cache is built: importing this module for
+# DEFAULT_TTLS loads neither psutil nor concurrent.futures)
+LIVE_FIELDS = {
+    "system": "refresh_uptime",
+}
+
+
+class CacheEntry:
+    """Last value of one collector and its pending refresh."""
+
+    def __init__(self):
+        self.value = None
+        self.collected_at = None
+        self.future = None
+        self.error = None
+
+
+class CollectorCache:
+    """
+    Serve collector results from memory, refreshing them per TTL.
+
+    The first read of a section waits for it (up to its timeout); later
+    reads return the cached value immediately and, when it is older than
+    its TTL, start a refresh on a background thread. A failed collection
+    keeps the previous value and is retried on the next read.
+    """
+
+    def __init__(self, collectors, ttls=None, timeouts=None, clock=time.monotonic):
+        self.collectors = collectors
+        from . import system_collector
+
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.timeouts = timeouts or system_collector.COLLECTOR_TIMEOUTS
+        self.live_fields = {name: getattr(system_collector, func) for name, func in LIVE_FIELDS.items()}
+        self.clock = clock
+        self.entries = {name: CacheEntry() for name in collectors}
+        self.lock = threading.Lock()
+        # Daemon workers: a hung refresh (dead NFS mount) does not block exit
+        self.pool = system_collector.get_collector_pool()
+        self.closed = False
+
+    def close(self):
+        """Start no more refreshes (running collections are not waited for)."""
+        self.closed = True
+
+    def _timed(self, name):
+        """Run one collector, return (value, completion time)."""
+        value = self.collectors[name]()
+        return value, self.clock()
+
+    def _harvest(self, name):
+        """Record the result of a finished collection, if not done yet."""
+        with self.lock:
+            entry = self.entries[name]
+            if entry.future is None or not entry.future.done():
+                return
+            future, entry.future = entry.future, None
+        try:
+            value, collected_at = future.result()
+        except Exception as e:
+            entry.error = f"{type(e).__name__}: {e}"
+            print(f"Warning: {name} collector failed: {entry.error}")
+        else:
+            entry.value, entry.collected_at, entry.error = value, collected_at, None
+
+    def collect(self):
+        """
+        Return every section from the cache, refreshing stale ones.
+
+        Returns:
+            Tuple ({section name: data or error marker},
+                   {section name: age in seconds or None}).
+        """
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        start = self.clock()
+        waiting = {}
+        for name, entry in self.entries.items():
+            self._harvest(name)
+            if entry.future is not None or self.closed:
+                continue
+            ttl = self.ttls.get(name, 0)
+            if entry.value is None or entry.error or start - entry.collected_at >= ttl:
+                future = self.pool.submit(lambda name=name: self._timed(name))
+                with self.lock:
+                    entry.future = future
+                # Finished refreshes are recorded right away, not on the next read
+                future.add_done_callback(lambda _future, name=name: self._harvest(name))
+                if entry.value is None:
+                    waiting[name] = future
+
+        for name, future in waiting.items():
+            timeout = self.timeouts.get(name, 30)
+            try:
+                future.result(timeout=max(start + timeout - self.clock(), 0))
+            except FutureTimeoutError:
+                pass
+            except Exception:
+                pass  # reported by _harvest
+            self._harvest(name)
+
+        sections = {}
+        ages = {}
+        now = self.clock()
+        for name, entry in self.entries.items():
+            ages[name] = None
+            if entry.value is None:
+                if entry.future is not None:
+                    sections[name] = {"error": f"timeout after {self.timeouts.get(name, 30)}s"}
+                else:
+                    sections[name] = {"error": entry.error}
+                continue
+            live = self.live_fields.get(name)
+            sections[name] = live(entry.value) if live else entry.value
+            ages[name] = round(max(now - entry.collected_at, 0.0), 2)
+        return sections, ages
+
+    def collect_all(self):
+        """collect_all() equivalent served from the cache, with collector ages."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sections, ages = self.collect()
+        return {"timestamp": timestamp, **sections, "collector_ages": ages}
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Rates from cumulative counters.
+This module turns counters that only grow (network bytes, disk operations...)
+into per-second rates, keeping the previous snapshot in memory and
+optionally on disk so one-shot runs can compute rates too.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+# Directory for the snapshots persisted between runs (None = memory only)
+STATE_DIR = None
+
+
+def set_state_dir(path):
+    """
+    Enable persistence of counter snapshots between runs.
+
+    Args:
+        path: Directory for the state files (None = memory only).
+    """
+    global STATE_DIR
+    STATE_DIR = os.path.expanduser(path) if path else None
+
+
+def counter_delta(old, new, bits=None):
+    """
+    Difference between two counter readings.
+
+    A decrease means the counter was reset (interface re-created, stats
+    cleared, driver reloaded): there is no delta for that interval. Only a
+    counter known to be bits wide is assumed to have wrapped instead.
+
+    Args:
+        old: Previous reading.
+        new: Current reading.
+        bits: Width of the counter when known (e.g. 32), None otherwise.
+
+    Returns:
+        The increase, or None after a reset.
+    """
+    if new >= old:
+        return new - old
+    if bits and old < 2 ** bits:
+        return new + 2 ** bits - old
+    return None
+
+
+class CounterRates:
+    """
+    Per-second rates for keyed groups of counters.
+
+    Each call to update() receives {key: {counter: value}} (for instance
+    one entry per network interface) and returns the rates since the
+    previous call. Keys that just appeared, or whose counters went down
+    (reset), have no rate for that interval; keys that disappeared are
+    dropped. counter_bits is the counter width when known (decreases are
+    then taken as wraps).
+    """
+
+    def __init__(self, name, clock=time.time, counter_bits=None):
+        self.name = name
+        self.clock = clock
+        self.counter_bits = counter_bits
+        self.previous = None
+        self.previous_time = None
+        self.epoch = None
+        self._loaded = False
+
+    def _state_path(self):
+        return os.path.join(STATE_DIR, f"{self.name}.json") if STATE_DIR else None
+
+    def _load(self):
+        """Load the snapshot saved by a previous run, if any."""
+        self._loaded = True
+        path = self._state_path()
+        if not path or self.previous is not None:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.previous = state["counters"]
+            self.previous_time = state["time"]
+            self.epoch = state.get("epoch")
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        """Persist the current snapshot (atomic write)."""
+        path = self._state_path()
+        if not path:
+            return
+        try:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{self.name}.", dir=STATE_DIR)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"time": self.previous_time, "epoch": self.epoch, "counters": self.previous}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: cannot save {self.name} counters: {e}")
+
+    def update(self, counters, epoch=None):
+        """
+        Record a new snapshot and compute the rates.
+
+        Args:
+            counters: Dictionary key -> {counter name: cumulative value}.
+            epoch: Counter epoch, e.g. the boot time: a snapshot from a
+                different epoch is not used (counters were reset).
+
+        Returns:
+            Tuple (elapsed seconds or None, {key: {counter: rate per second}}).
+        """
+        if not self._loaded:
+            self._load()
+
+        now = self.clock()
+        previous, previous_time = self.previous, self.previous_time
+        if epoch != self.epoch:
+            previous = None
+        self.previous, self.previous_time, self.epoch = counters, now, epoch
+        self._save()
+
+        if previous is None or previous_time is None or now <= previous_time:
+            return None, {}
+
+        elapsed = now - previous_time
+        rates = {}
+        for key, values in counters.items():
+            old_values = previous.get(key)
+            if old_values is None:
+                continue
+            deltas = {name: counter_delta(old_values.get(name, value), value, self.counter_bits)
+                      for name, value in values.items()}
+            if None in deltas.values():
+                continue
+            rates[key] = {name: delta / elapsed for name, delta in deltas.items()}
+        return elapsed, rates
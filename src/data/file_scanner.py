@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Directory tree scanning.
+This module walks a directory with os.scandir and aggregates file statistics
+in bounded memory (extension histogram and top-N largest files).
+"""
+
+import heapq
+import multiprocessing
+import os
+import queue
+import threading
+from fnmatch import fnmatch
+
+# Symbolic link policies for scan_tree
+SYMLINK_POLICIES = ("none", "files", "all")
+
+# Worker pool kinds for scan_tree_parallel
+SCAN_MODES = ("thread", "process")
+
+# Extensions counted individually, everything else goes to ".other"
+TRACKED_EXTENSIONS = (
+    ".txt", ".py", ".pdf", ".jpg", ".jpeg", ".png",
+    ".md", ".html", ".css", ".json",
+)
+
+
+def file_extension(name):
+    """Return the lowercase extension of a file name (same rules as Path.suffix)."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ""
+
+
+class ScanStats:
+    """
+    Aggregated statistics of a scan.
+
+    Only the extension counters and a fixed-size heap of the largest
+    files are kept, so memory does not grow with the number of files.
+    """
+
+    def __init__(self, top_n=5):
+        self.top_n = top_n
+        self.total_files = 0
+        self.extensions = {ext: [0, 0] for ext in TRACKED_EXTENSIONS + (".other",)}
+        self.largest = []  # min-heap of (size, path)
+
+    def add(self, path, name, size):
+        """Account for one file."""
+        ext = file_extension(name)
+        counter = self.extensions.get(ext) or self.extensions[".other"]
+        counter[0] += 1
+        counter[1] += size
+        self.total_files += 1
+
+        if len(self.largest) < self.top_n:
+            heapq.heappush(self.largest, (size, path))
+        elif size > self.largest[0][0]:
+            heapq.heapreplace(self.largest, (size, path))
+
+    def merge(self, other):
+        """Merge the statistics of another scan into this one."""
+        self.total_files += other.total_files
+        for ext, (count, size) in other.extensions.items():
+            counter = self.extensions.setdefault(ext, [0, 0])
+            counter[0] += count
+            counter[1] += size
+        for item in other.largest:
+            if len(self.largest) < self.top_n:
+                heapq.heappush(self.largest, item)
+            elif item[0] > self.largest[0][0]:
+                heapq.heapreplace(self.largest, item)
+
+    def top_files(self):
+        """Return the largest files as (size, path), biggest first."""
+        return sorted(self.largest, reverse=True)
+
+
+def is_excluded(entry_path, name, exclude):
+    """Check a path against exclude glob patterns (matched on name and path)."""
+    for pattern in exclude:
+        if fnmatch(name, pattern) or fnmatch(entry_path, pattern):
+            return True
+    return False
+
+
+class ScanOptions:
+    """Options shared by the scan workers (picklable for process pools)."""
+
+    def __init__(self, symlinks="files", max_depth=None, exclude=(), one_filesystem=False):
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Unknown symlink policy: {symlinks}")
+        self.symlinks = symlinks
+        self.follow_dirs = symlinks == "all"
+        self.follow_files = symlinks != "none"
+        self.max_depth = max_depth
+        self.exclude = tuple(exclude)
+        self.one_filesystem = one_filesystem
+        self.root_dev = None
+
+
+def make_visit(seen, lock=None):
+    """
+    Build a visit(key) function for symlink loop detection.
+
+    visit() returns True the first time a (st_dev, st_ino) key is seen.
+    """
+    def visit(key):
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    if lock is None:
+        return visit
+
+    def locked_visit(key):
+        with lock:
+            return visit(key)
+
+    return locked_visit
+
+
+def scan_directory(directory, depth, stats, options, visit, push):
+    """
+    Scan the entries of one directory (not recursive).
+
+    Files are added to stats, subdirectories are handed to push() as
+    (path, depth) so the caller decides how they are walked.
+
+    Args:
+        directory: Directory to scan.
+        depth: Depth of the directory below the root.
+        stats: ScanStats to fill.
+        options: ScanOptions.
+        visit: Loop detection function from make_visit (symlinks="all" only).
+        push: Callable receiving (path, depth) of each subdirectory.
+    """
+    max_depth = options.max_depth
+    exclude = options.exclude
+    follow_dirs = options.follow_dirs
+    follow_files = options.follow_files
+    one_filesystem = options.one_filesystem
+    root_dev = options.root_dev
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if exclude and is_excluded(entry.path, entry.name, exclude):
+                        continue
+
+                    if entry.is_dir(follow_symlinks=follow_dirs):
+                        if max_depth is not None and depth >= max_depth:
+                            continue
+                        if one_filesystem or follow_dirs:
+                            st = entry.stat(follow_symlinks=follow_dirs)
+                            if one_filesystem and st.st_dev != root_dev:
+                                continue
+                            if follow_dirs and not visit((st.st_dev, st.st_ino)):
+                                continue
+                        push((entry.path, depth + 1))
+                    elif entry.is_file(follow_symlinks=follow_files):
+                        st = entry.stat(follow_symlinks=follow_files)
+                        if one_filesystem and st.st_dev != root_dev:
+                            continue
+                        stats.add(entry.path, entry.name, st.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+
+
+def prepare_scan(root, options):
+    """
+    Stat the scan root and record its device in the options.
+
+    Returns:
+        (st_dev, st_ino) of the root, or None if it cannot be read.
+    """
+    try:
+        root_stat = os.stat(root)
+    except OSError:
+        return None
+    options.root_dev = root_stat.st_dev
+    return (root_stat.st_dev, root_stat.st_ino)
+
+
+def scan_tree(root, stats=None, symlinks="files", max_depth=None,
+              exclude=(), one_filesystem=False, top_n=5):
+    """
+    Walk a directory tree iteratively with os.scandir.
+
+    The stat information cached in each DirEntry is reused, so a file
+    costs at most one stat call.
+
+    Args:
+        root: Directory to scan.
+        stats: ScanStats to fill (default: new one).
+        symlinks: Symbolic link policy: "none" (skip links), "files"
+            (count links to files, do not descend into linked
+            directories) or "all" (follow everything, loops are detected).
+        max_depth: Maximum directory depth (0 = root only, None = unlimited).
+        exclude: Glob patterns of files/directories to skip.
+        one_filesystem: Do not cross into other filesystems (st_dev).
+        top_n: Number of largest files to keep.
+
+    Returns:
+        ScanStats with the aggregated results.
+    """
+    options = ScanOptions(symlinks, max_depth, exclude, one_filesystem)
+    if stats is None:
+        stats = ScanStats(top_n)
+
+    root_key = prepare_scan(root, options)
+    if root_key is None:
+        return stats
+
+    visit = make_visit({root_key})
+    stack = [(os.fspath(root), 0)]
+    while stack:
+        directory, depth = stack.pop()
+        scan_directory(directory, depth, stats, options, visit, stack.append)
+
+    return stats
+
+
+def _thread_worker(tasks, stats, options, visit):
+    """Scan directories from the shared queue until a None sentinel."""
+    while True:
+        item = tasks.get()
+        try:
+            if item is None:
+                return
+            scan_directory(item[0], item[1], stats, options, visit, tasks.put)
+        finally:
+            tasks.task_done()
+
+
+def _process_worker(tasks, results, options, top_n):
+    """Process pool worker: scan from the shared queue, send back ScanStats."""
+    stats = ScanStats(top_n)
+    visit = make_visit(set())
+    while True:
+        item = tasks.get()
+        try:
+            if item is None:
+                break
+            scan_directory(item[0], item[1], stats, options, visit, tasks.put)
+        finally:
+            tasks.task_done()
+    results.put(stats)
+
+
+def scan_tree_parallel(root, workers=4, mode="thread", stats=None, symlinks="files",
+                       max_depth=None, exclude=(), one_filesystem=False, top_n=5):
+    """
+    Walk a directory tree with several workers.
+
+    Subdirectories found by any worker go to one shared queue, so idle
+    workers pick up (steal) pending directories from busy branches. Each
+    worker keeps its own ScanStats; they are merged at the end.
+
+    Threads work well because os.scandir and stat release the GIL. The
+    process mode also parallelizes the Python bookkeeping. symlinks="all"
+    always uses threads, since loop detection needs a shared visited set.
+
+    Args:
+        root: Directory to scan.
+        workers: Number of workers (1 = sequential scan_tree).
+        mode: "thread" or "process".
+        stats: ScanStats to fill (default: new one).
+        symlinks, max_depth, exclude, one_filesystem, top_n: See scan_tree.
+
+    Returns:
+        ScanStats with the aggregated results.
+    """
+    if mode not in SCAN_MODES:
+        raise ValueError(f"Unknown scan mode: {mode}")
+    if stats is None:
+        stats = ScanStats(top_n)
+    if workers <= 1:
+        return scan_tree(root, stats, symlinks, max_depth, exclude, one_filesystem, top_n)
+
+    options = ScanOptions(symlinks, max_depth, exclude, one_filesystem)
+    root_key = prepare_scan(root, options)
+    if root_key is None:
+        return stats
+
+    if mode == "process" and not options.follow_dirs:
+        worker_stats = _run_process_workers(root, workers, options, top_n)
+    else:
+        worker_stats = _run_thread_workers(root, workers, options, top_n, root_key)
+
+    for partial in worker_stats:
+        stats.merge(partial)
+    return stats
+
+
+def _run_thread_workers(root, workers, options, top_n, root_key):
+    """Run the parallel scan on threads, return the per-worker ScanStats."""
+    tasks = queue.LifoQueue()
+    tasks.put((os.fspath(root), 0))
+    visit = make_visit({root_key}, threading.Lock())
+
+    worker_stats = [ScanStats(top_n) for _ in range(workers)]
+    threads = [
+        threading.Thread(target=_thread_worker, args=(tasks, partial, options, visit), daemon=True)
+        for partial in worker_stats
+    ]
+    for thread in threads:
+        thread.start()
+
+    tasks.join()
+    for _ in threads:
+        tasks.put(None)
+    for thread in threads:
+        thread.join()
+
+    return worker_stats
+
+
+def _run_process_workers(root, workers, options, top_n):
+    """Run the parallel scan on processes, return the per-worker ScanStats."""
+    context = multiprocessing.get_context()
+    tasks = context.JoinableQueue()
+    results = context.Queue()
+    tasks.put((os.fspath(root), 0))
+
+    processes = [
+        context.Process(target=_process_worker, args=(tasks, results, options, top_n), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    tasks.join()
+    for _ in processes:
+        tasks.put(None)
+
+    worker_stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return worker_stats
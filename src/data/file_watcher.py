@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Live file statistics with inotify.
+This module keeps the extension histogram and largest files of a directory
+up to date from Linux inotify events (through ctypes, no extra service),
+with a fallback to periodic rescans.
+"""
+
+import ctypes
+import errno
+import heapq
+import os
+import struct
+import sys
+import time
+from stat import S_ISREG
+
+from .file_scanner import (
+    ScanOptions,
+    ScanStats,
+    file_extension,
+    is_excluded,
+    make_visit,
+    scan_directory,
+    scan_tree,
+)
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+def load_inotify():
+    """Return the libc handle if inotify is available, None otherwise."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+class WatchLimitError(OSError):
+    """Raised when the inotify watch limit is reached."""
+
+
+class _Recorder:
+    """ScanStats stand-in used by scan_directory to feed a FileWatcher."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def add(self, path, name, size):
+        self.watcher._set_size(path, size)
+
+
+class FileWatcher:
+    """
+    In-memory file statistics kept current by inotify events.
+
+    After one initial walk, each poll() only processes the changes, so the
+    files section costs O(changes) instead of O(tree). When inotify is not
+    available, the watch limit is hit or the event queue overflows, the
+    watcher falls back to full rescans (at most every rescan_interval
+    seconds in "rescan" mode).
+    """
+
+    def __init__(self, directory, symlinks="files", max_depth=None, exclude=(),
+                 one_filesystem=False, top_n=5, rescan_interval=300):
+        self.directory = os.fspath(directory)
+        self.options = ScanOptions(symlinks, max_depth, exclude, one_filesystem)
+        self.top_n = top_n
+        self.rescan_interval = rescan_interval
+
+        self.mode = "rescan"
+        self.fd = None
+        self.libc = None
+        self.rescans = 0
+        self.events = 0
+        self.last_scan = None
+        self._cached_stats = None
+
+        self.files = {}          # path -> size
+        self.extensions = ScanStats(top_n).extensions
+        self.dir_depth = {}      # watched directory -> depth
+        self.wd_to_dir = {}
+        self.dir_to_wd = {}
+        self._top = {}           # path -> size of the current top N
+        self._top_dirty = False
+        self._visit = make_visit(set())
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Open inotify and do the initial walk (or fall back to rescans)."""
+        self.libc = load_inotify()
+        if self.libc is not None:
+            fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+                self.mode = "inotify"
+
+        if self.mode == "inotify":
+            self.rescan()
+        return self
+
+    def close(self):
+        """Release the inotify file descriptor."""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self.mode = "rescan"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _fall_back(self, reason):
+        """Switch to periodic rescans."""
+        print(f"Warning: file watcher disabled ({reason}), using periodic rescans")
+        self.close()
+        self.files.clear()
+        self.dir_depth.clear()
+        self.wd_to_dir.clear()
+        self.dir_to_wd.clear()
+        self._top.clear()
+        self.last_scan = None
+
+    # --- Public API ---
+
+    def stats(self):
+        """
+        Return the current statistics as a ScanStats.
+
+        In inotify mode, pending events are applied first. In rescan mode
+        the tree is rescanned when the previous scan is too old.
+        """
+        if self.mode == "inotify":
+            self.poll()
+
+        if self.mode != "inotify":
+            now = time.monotonic()
+            if self.last_scan is None or now - self.last_scan >= self.rescan_interval:
+                options = self.options
+                self._cached_stats = scan_tree(
+                    self.directory, None, options.symlinks, options.max_depth,
+                    options.exclude, options.one_filesystem, self.top_n,
+                )
+                self.last_scan = now
+                self.rescans += 1
+            return self._cached_stats
+
+        if self._top_dirty:
+            self._top = {path: size for size, path in
+                         heapq.nlargest(self.top_n, ((s, p) for p, s in self.files.items()))}
+            self._top_dirty = False
+
+        stats = ScanStats(self.top_n)
+        stats.total_files = len(self.files)
+        stats.extensions = {ext: list(counter) for ext, counter in self.extensions.items()}
+        stats.largest = [(size, path) for path, size in self._top.items()]
+        heapq.heapify(stats.largest)
+        return stats
+
+    def rescan(self):
+        """Rebuild the in-memory state with a full walk (adds watches)."""
+        self.files.clear()
+        for counter in self.extensions.values():
+            counter[0] = counter[1] = 0
+        self._top.clear()
+        self._top_dirty = False
+        self.dir_depth.clear()
+        self.rescans += 1
+        self.last_scan = time.monotonic()
+
+        try:
+            root_stat = os.stat(self.directory)
+            self.options.root_dev = root_stat.st_dev
+            self._visit = make_visit({(root_stat.st_dev, root_stat.st_ino)})
+            self._walk(self.directory, 0)
+        except WatchLimitError as e:
+            self._fall_back(e)
+        except OSError:
+            pass
+
+    def poll(self):
+        """
+        Apply the pending inotify events.
+
+        Returns:
+            Number of events processed.
+        """
+        if self.fd is None:
+            return 0
+
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        try:
+            return self._process_events(b"".join(chunks))
+        except WatchLimitError as e:
+            self._fall_back(e)
+            return 0
+
+    # --- Internals ---
+
+    def _add_watch(self, directory):
+        """Watch one directory, raise WatchLimitError when the limit is hit."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise WatchLimitError(err, "inotify watch limit reached")
+            return None
+        old = self.wd_to_dir.get(wd)
+        if old is not None and old != directory:
+            self.dir_to_wd.pop(old, None)
+        self.wd_to_dir[wd] = directory
+        self.dir_to_wd[directory] = wd
+        return wd
+
+    def _walk(self, directory, depth):
+        """Watch and scan a directory tree, recording every file."""
+        recorder = _Recorder(self)
+        stack = [(directory, depth)]
+        while stack:
+            path, path_depth = stack.pop()
+            if self._add_watch(path) is None:
+                continue
+            self.dir_depth[path] = path_depth
+            scan_directory(path, path_depth, recorder, self.options, self._visit, stack.append)
+
+    def _set_size(self, path, size):
+        """Add or update one file."""
+        old = self.files.get(path)
+        counter = self.extensions.get(file_extension(os.path.basename(path))) or self.extensions[".other"]
+        if old is None:
+            counter[0] += 1
+            counter[1] += size
+        else:
+            counter[1] += size - old
+        self.files[path] = size
+        self._update_top(path, size)
+
+    def _remove_file(self, path):
+        """Forget one file."""
+        old = self.files.pop(path, None)
+        if old is None:
+            return
+        counter = self.extensions.get(file_extension(os.path.basename(path))) or self.extensions[".other"]
+        counter[0] -= 1
+        counter[1] -= old
+        self._update_top(path, None)
+
+    def _update_top(self, path, size):
+        """Keep the top N current; a shrinking top file forces a recompute."""
+        top = self._top
+        if path in top:
+            if size is not None and size >= top[path]:
+                top[path] = size
+            else:
+                self._top_dirty = True
+        elif size is not None and not self._top_dirty:
+            if len(top) < self.top_n:
+                top[path] = size
+            else:
+                smallest = min(top, key=top.get)
+                if size > top[smallest]:
+                    del top[smallest]
+                    top[path] = size
+
+    def _remove_tree(self, directory):
+        """
+        Forget a directory that was deleted or moved out of the tree.
+
+        This walks the whole file table, but only runs for directory
+        removals and moves (deleting a tree file by file is O(changes)).
+        """
+        prefix = directory + os.sep
+        for path in [p for p in self.files if p.startswith(prefix)]:
+            self._remove_file(path)
+        for path in [d for d in self.dir_depth if d == directory or d.startswith(prefix)]:
+            del self.dir_depth[path]
+            wd = self.dir_to_wd.pop(path, None)
+            if wd is not None and self.wd_to_dir.get(wd) == path:
+                del self.wd_to_dir[wd]
+                self.libc.inotify_rm_watch(self.fd, wd)
+
+    def _process_events(self, data):
+        """Decode an inotify buffer and update the state."""
+        count = 0
+        offset = 0
+        overflow = False
+        dirty = set()
+        new_dirs = []
+        options = self.options
+
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            count += 1
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+
+            directory = self.wd_to_dir.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.wd_to_dir[wd]
+                if self.dir_to_wd.get(directory) == wd:
+                    del self.dir_to_wd[directory]
+                continue
+            if not name:
+                continue
+
+            name = os.fsdecode(name)
+            path = os.path.join(directory, name)
+            if options.exclude and is_excluded(path, name, options.exclude):
+                continue
+
+            if mask & IN_ISDIR:
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._remove_tree(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    depth = self.dir_depth.get(directory, 0) + 1
+                    if options.max_depth is None or depth <= options.max_depth:
+                        new_dirs.append((path, depth))
+            else:
+                dirty.add(path)
+
+        self.events += count
+
+        if overflow:
+            print("Warning: inotify queue overflow, rescanning")
+            self.rescan()
+            return count
+
+        for path, depth in new_dirs:
+            self._remove_tree(path)
+            self._walk(path, depth)
+
+        for path in dirty:
+            try:
+                st = os.stat(path, follow_symlinks=options.follow_files)
+            except OSError:
+                self._remove_file(path)
+                continue
+            if S_ISREG(st.st_mode) and not (
+                    options.one_filesystem and st.st_dev != options.root_dev):
+                self._set_size(path, st.st_size)
+            else:
+                self._remove_file(path)
+
+        return count
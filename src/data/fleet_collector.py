@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Fleet collection from remote agents.
+This module polls many agents (monitor.py --agent) concurrently with
+asyncio: one keep-alive HTTP connection per agent, a timeout on every
+request and exponential backoff for agents that stop answering.
+"""
+
+import asyncio
+import gzip
+import json
+import random
+import time
+
+from .snapshot_model import Snapshot
+
+# Path of the agent payload
+AGENT_PATH = "/collect"
+
+
+class AgentError(Exception):
+    """Raised when an agent answers with an invalid response."""
+
+
+def parse_agent_address(address, default_port=8000):
+    """
+    Split "host[:port]" into (host, port).
+
+    Args:
+        address: Agent address.
+        default_port: Port used when none is given.
+    """
+    host, sep, port = address.strip().rpartition(":")
+    if not sep or not port.isdigit():
+        return address.strip(), default_port
+    return host.strip("[]"), int(port)
+
+
+class AgentClient:
+    """
+    HTTP/1.1 client for one agent, reusing its connection between polls.
+
+    After a failure the agent is skipped for a backoff delay doubling at
+    each consecutive failure (with jitter, up to max_backoff seconds).
+    """
+
+    def __init__(self, host, port, timeout=5.0, backoff=5.0, max_backoff=300.0,
+                 clock=time.monotonic):
+        self.host = host
+        self.port = port
+        self.name = f"{host}:{port}"
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+
+        self.reader = None
+        self.writer = None
+        self.connections = 0
+        self.failures = 0
+        self.next_attempt = 0.0
+
+    def due(self):
+        """True when the agent is not in backoff."""
+        return self.clock() >= self.next_attempt
+
+    async def close(self):
+        """Close the connection, if any."""
+        writer, self.reader, self.writer = self.writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.connections += 1
+
+    async def _request(self):
+        """Send one GET on the current connection, return the decoded payload."""
+        request = (
+            f"GET {AGENT_PATH} HTTP/1.1\r\n"
+            f"Host: {self.name}\r\n"
+            "Accept-Encoding: gzip\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        self.writer.write(request.encode("ascii"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by agent")
+        parts = status_line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise AgentError(f"invalid status line: {status_line[:80]!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        body = await self.reader.readexactly(length)
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+
+        if status != 200:
+            raise AgentError(f"HTTP {status}")
+        if headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        return json.loads(body)
+
+    async def fetch(self):
+        """
+        Fetch the agent payload.
+
+        A reused connection that turns out to be closed is reopened once.
+
+        Returns:
+            collect_all() data of the agent.
+        """
+        reused = self.writer is not None and not self.writer.is_closing()
+        if not reused:
+            await self.close()
+            await self._connect()
+        try:
+            return await self._request()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+        await self._connect()
+        return await self._request()
+
+    async def poll(self):
+        """
+        Fetch the payload with the timeout and backoff rules.
+
+        Returns:
+            Tuple (data or None, error message or None, latency seconds).
+        """
+        start = self.clock()
+        try:
+            data = await asyncio.wait_for(self.fetch(), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timeout after {self.timeout:g}s"
+        except (OSError, ValueError, AgentError, asyncio.IncompleteReadError) as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            self.failures = 0
+            self.next_attempt = 0.0
+            return data, None, self.clock() - start
+
+        await self.close()
+        self.failures += 1
+        delay = min(self.backoff * 2 ** (self.failures - 1), self.max_backoff)
+        self.next_attempt = self.clock() + delay * random.uniform(0.8, 1.0)
+        return None, error, self.clock() - start
+
+
+class FleetCollector:
+    """
+    Latest state of every agent of the fleet.
+
+    hosts maps each agent name to a dictionary: "status" ("up", "down" or
+    "pending"), "data" (last payload as a compact Snapshot, read like the
+    payload dictionary, kept while the agent is down),
+    "error", "failures", "latency", "last_seen" (Unix time) and "version"
+    (incremented with each new payload).
+    """
+
+    def __init__(self, addresses, timeout=5.0, backoff=5.0, max_backoff=300.0,
+                 concurrency=100, default_port=8000):
+        self.clients = []
+        for address in addresses:
+            host, port = parse_agent_address(address, default_port)
+            self.clients.append(AgentClient(host, port, timeout, backoff, max_backoff))
+        self.concurrency = concurrency
+        self.hosts = {
+            client.name: {
+                "status": "pending", "data": None, "error": None, "failures": 0,
+                "latency": None, "last_seen": None, "version": 0,
+            }
+            for client in self.clients
+        }
+
+    async def _poll_client(self, client, semaphore):
+        async with semaphore:
+            data, error, latency = await client.poll()
+        host = self.hosts[client.name]
+        host["failures"] = client.failures
+        host["latency"] = round(latency, 3)
+        if error is None:
+            if isinstance(data, dict):
+                data = Snapshot.from_dict(data)
+            host.update(status="up", data=data, error=None, last_seen=time.time())
+            host["version"] += 1
+        else:
+            host.update(status="down", error=error)
+
+    async def poll_once(self):
+        """
+        Poll every agent that is not in backoff, concurrently.
+
+        Returns:
+            Number of agents polled.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        due = [client for client in self.clients if client.due()]
+        await asyncio.gather(*(self._poll_client(client, semaphore) for client in due))
+        return len(due)
+
+    async def close(self):
+        """Close all agent connections."""
+        await asyncio.gather(*(client.close() for client in self.clients))
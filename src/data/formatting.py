@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Human-readable formatting of collected values.
+This module holds the formatters shared by the collectors and the compact
+snapshot model, without depending on psutil.
+"""
+
+
+def format_bytes(bytes_value):
+    """Format bytes into human-readable units."""
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if bytes_value < 1024:
+            return f"{bytes_value:.2f} {unit}"
+        bytes_value /= 1024
+    return f"{bytes_value:.2f} PB"
+
+
+def format_uptime(seconds):
+    """Format uptime duration."""
+    days = int(seconds // 86400)
+    hours = int((seconds % 86400) // 3600)
+    minutes = int((seconds % 3600) // 60)
+
+    parts = []
+    if days > 0:
+        parts.append(f"{days}d")
+    if hours > 0:
+        parts.append(f"{hours}h")
+    parts.append(f"{minutes}m")
+
+    return " ".join(parts)
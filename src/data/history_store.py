@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Metrics history store.
+This module appends collected samples to a SQLite time-series store with
+fixed retention and downsampling tiers (raw, 1-minute and 1-hour rollups).
+"""
+
+import os
+import sqlite3
+import time
+from array import array
+
+# Downsampling tiers: name -> (bucket seconds, retention seconds)
+TIERS = {
+    "raw": (0, 24 * 3600),
+    "1m": (60, 7 * 24 * 3600),
+    "1h": (3600, 365 * 24 * 3600),
+}
+
+# Scalar metrics stored for each sample (per-core values go in a blob)
+METRICS = (
+    "cpu", "memory", "swap", "disk",
+    "net_sent", "net_recv", "load1", "load5", "load15",
+)
+
+# Metrics that are cumulative counters: rollups keep the last value
+COUNTERS = ("net_sent", "net_recv")
+
+# Value returned by query() for a metric that was not collected
+NAN = float("nan")
+
+
+def _table_sql(table):
+    columns = ", ".join(f"{name} REAL" for name in METRICS)
+    return (f"CREATE TABLE IF NOT EXISTS {table} "
+            f"(ts REAL PRIMARY KEY, {columns}, cores BLOB, samples INTEGER NOT NULL DEFAULT 1)")
+
+
+def sample_from_data(raw_data, timestamp=None):
+    """
+    Extract one history sample from collected data.
+
+    Args:
+        raw_data: Data collected by collect_all.
+        timestamp: Sample time (default: now, in Unix seconds).
+
+    Returns:
+        Tuple (ts, metric values..., cores blob). Values of a section that
+        is missing or failed (timeout, --only) are None, stored as NULL.
+    """
+    def section(name):
+        value = raw_data.get(name)
+        return value if isinstance(value, dict) and "error" not in value else {}
+
+    cpu = section("cpu")
+    memory = section("memory")
+    disk = section("disk")
+    network = section("network")
+    cores = array("f", cpu.get("cpu_percent_per_core", []))
+
+    return (
+        timestamp if timestamp is not None else time.time(),
+        cpu.get("cpu_percent"),
+        memory.get("percent"),
+        memory.get("swap_percent"),
+        disk.get("percent"),
+        network.get("bytes_sent"),
+        network.get("bytes_recv"),
+        cpu.get("load_avg_1min"),
+        cpu.get("load_avg_5min"),
+        cpu.get("load_avg_15min"),
+        cores.tobytes(),
+    )
+
+
+class HistoryStore:
+    """
+    Append-only metrics history with rollup tiers.
+
+    Samples are buffered and written in batches; each flush also rolls
+    completed minutes/hours into the coarser tiers and applies retention.
+    """
+
+    def __init__(self, path, batch_size=12, flush_interval=60.0, tiers=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.tiers = tiers or TIERS
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            for tier in self.tiers:
+                self.connection.execute(_table_sql(f"samples_{tier}"))
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)"
+            )
+
+    def close(self):
+        """Flush pending samples and close the database."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Writing ---
+
+    def record(self, raw_data, timestamp=None):
+        """
+        Buffer one sample, flushing when the batch is full or old enough.
+
+        Args:
+            raw_data: Data collected by collect_all.
+            timestamp: Sample time (default: now).
+        """
+        self.pending.append(sample_from_data(raw_data, timestamp))
+        if (len(self.pending) >= self.batch_size
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self, now=None):
+        """Write pending samples, update rollups and apply retention."""
+        now = now if now is not None else time.time()
+        placeholders = ", ".join("?" * (len(METRICS) + 2))
+        columns = ", ".join(("ts",) + METRICS + ("cores",))
+
+        with self.connection:
+            if self.pending:
+                self.connection.executemany(
+                    f"INSERT OR REPLACE INTO samples_raw ({columns}) VALUES ({placeholders})",
+                    self.pending,
+                )
+                self.pending = []
+
+            source = "raw"
+            for tier, (bucket, _retention) in self.tiers.items():
+                if bucket:
+                    self._rollup(source, tier, bucket, now)
+                    source = tier
+
+            for tier, (_bucket, retention) in self.tiers.items():
+                self.connection.execute(f"DELETE FROM samples_{tier} WHERE ts < ?", (now - retention,))
+
+        self.last_flush = time.monotonic()
+
+    def _rollup(self, source, tier, bucket, now):
+        """Aggregate completed buckets of the source tier into a coarser tier."""
+        key = f"rollup_{tier}"
+        first, last = self.connection.execute(
+            f"SELECT MIN(ts), MAX(ts) FROM samples_{source}"
+        ).fetchone()
+        if first is None:
+            return
+
+        # A bucket is complete once a later sample exists
+        end = (min(last, now) // bucket) * bucket
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        start = row[0] if row else (first // bucket) * bucket
+        if start >= end:
+            return
+
+        columns = ", ".join(METRICS)
+        rows = self.connection.execute(
+            f"SELECT ts, {columns}, cores, samples FROM samples_{source} "
+            f"WHERE ts >= ? AND ts < ? ORDER BY ts",
+            (start, end),
+        ).fetchall()
+
+        buckets = {}
+        for row in rows:
+            buckets.setdefault((row[0] // bucket) * bucket, []).append(row)
+
+        aggregated = [self._aggregate(bucket_ts, bucket_rows)
+                      for bucket_ts, bucket_rows in buckets.items()]
+        placeholders = ", ".join("?" * (len(METRICS) + 3))
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO samples_{tier} (ts, {columns}, cores, samples) "
+            f"VALUES ({placeholders})",
+            aggregated,
+        )
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, end)
+        )
+
+    @staticmethod
+    def _aggregate(bucket_ts, rows):
+        """
+        Weighted average of a bucket (last value for counters).
+
+        NULL values (section not collected) are left out of the average;
+        a metric with no value in the bucket stays NULL.
+        """
+        weights = [row[-1] for row in rows]
+        total_weight = sum(weights)
+        values = []
+        for i, name in enumerate(METRICS, start=1):
+            known = [(row[i], w) for row, w in zip(rows, weights) if row[i] is not None]
+            if not known:
+                values.append(None)
+            elif name in COUNTERS:
+                values.append(known[-1][0])
+            else:
+                values.append(sum(value * w for value, w in known) / sum(w for _value, w in known))
+
+        core_sums = None
+        core_weight = 0
+        for row, w in zip(rows, weights):
+            cores = array("f", row[-2] or b"")
+            if not cores:
+                continue
+            if core_sums is None or len(cores) != len(core_sums):
+                core_sums = [0.0] * len(cores)
+                core_weight = 0
+            for j, value in enumerate(cores):
+                core_sums[j] += value * w
+            core_weight += w
+        cores = array("f", [value / core_weight for value in core_sums] if core_weight else [])
+
+        return (bucket_ts, *values, cores.tobytes(), total_weight)
+
+    # --- Reading ---
+
+    def pick_tier(self, start, end, max_points=2000):
+        """Choose the finest tier covering the window without too many points."""
+        now = time.time()
+        for tier, (bucket, retention) in self.tiers.items():
+            if start < now - retention:
+                continue
+            step = bucket or 1
+            if (end - start) / step <= max_points:
+                return tier
+        return list(self.tiers)[-1]
+
+    def query(self, start, end, tier=None, metrics=METRICS, with_cores=False):
+        """
+        Return the samples of a time window as arrays.
+
+        Only the requested rows and columns are read (range scan on the
+        timestamp primary key), never the whole history.
+
+        Args:
+            start: Window start (Unix seconds).
+            end: Window end (Unix seconds).
+            tier: "raw", "1m" or "1h" (default: picked from the window).
+            metrics: Names of the scalar metrics to return.
+            with_cores: Also return per-core values.
+
+        Returns:
+            Dictionary: "tier", "ts" and one array('d') per metric (NaN
+            where the value was not collected), plus "cores" (list of
+            array('f'), empty when not collected) when requested.
+        """
+        self.flush()
+        tier = tier or self.pick_tier(start, end)
+        unknown = set(metrics) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+
+        columns = ["ts", *metrics] + (["cores"] if with_cores else [])
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(columns)} FROM samples_{tier} WHERE ts >= ? AND ts <= ? ORDER BY ts",
+            (start, end),
+        )
+
+        result = {"tier": tier, "ts": array("d")}
+        for name in metrics:
+            result[name] = array("d")
+        if with_cores:
+            result["cores"] = []
+
+        series = [result[name] for name in ["ts", *metrics]]
+        for row in cursor:
+            for target, value in zip(series, row):
+                target.append(value if value is not None else NAN)
+            if with_cores:
+                result["cores"].append(array("f", row[-1] or b""))
+
+        return result
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Direct /proc reader for the hot collectors.
+This module reads /proc/stat, /proc/meminfo, /proc/loadavg, /proc/net/dev
+and /proc/diskstats through file descriptors opened once and re-read with
+pread at offset 0, parsing only the fields the collectors use. It offers
+the same functions as psutil for these counters, so system_collector can
+use either; anything it cannot read falls back to psutil.
+"""
+
+import os
+from collections import namedtuple
+
+import psutil
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+SECTOR_SIZE = 512
+
+# Same fields as psutil's Linux namedtuples (psutil fields not listed are
+# not read: their files are the cost being avoided)
+CpuTimes = namedtuple("CpuTimes", "user nice system idle iowait irq softirq steal guest guest_nice")
+VirtualMemory = namedtuple("VirtualMemory", "total available percent used free")
+SwapMemory = namedtuple("SwapMemory", "total used free percent")
+NetIO = namedtuple("NetIO", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+DiskIO = namedtuple("DiskIO", "read_count write_count read_bytes write_bytes read_time write_time "
+                              "read_merged_count write_merged_count busy_time")
+
+# Errors of a missing file or an unexpected format: the call goes to psutil
+READ_ERRORS = (OSError, ValueError, IndexError, KeyError)
+
+
+def usage_percent(used, total):
+    """Percentage rounded like psutil (0.0 for a zero total)."""
+    return round(used / total * 100, 1) if total > 0 else 0.0
+
+
+class ProcFile:
+    """
+    A /proc file kept open and re-read from offset 0.
+
+    /proc contents are generated at read time, so reading again from the
+    start returns fresh values without reopening the file. Reads continue
+    until end of file: record-based files (net/dev, diskstats) may return
+    less than requested before the end.
+    """
+
+    def __init__(self, path, size=8192):
+        self.path = path
+        self.size = size
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+
+    def read(self):
+        """Current content of the file (bytes)."""
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(self.fd, self.size, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        if len(chunks) > 2:
+            # Grow the buffer so the next read takes one call plus EOF
+            self.size = offset * 2
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ProcBackend:
+    """
+    psutil-compatible counters read straight from /proc (Linux).
+
+    Implements cpu_times, getloadavg, virtual_memory, swap_memory,
+    net_io_counters, disk_io_counters, boot_time and cpu_count with the
+    values psutil would return; the constant ones (boot time, physical
+    cores) are read once. A call that fails (file missing, format not
+    understood) is answered by psutil, with one warning per function.
+
+    Unlike psutil, counters are not corrected for 32-bit wraparound
+    (the kernel counters are 64-bit on 64-bit hosts; CounterRates skips
+    an interval where a counter went down).
+    """
+
+    FILES = ("stat", "meminfo", "loadavg", "net/dev", "diskstats")
+
+    def __init__(self, procfs="/proc"):
+        self.files = {}
+        for name in self.FILES:
+            try:
+                self.files[name] = ProcFile(f"{procfs}/{name}")
+            except OSError as e:
+                print(f"Warning: {procfs}/{name} unavailable, using psutil for it: {e}")
+        self._boot_time = None
+        self._physical_cores = None
+        self._warned = set()
+
+    def close(self):
+        """Close the file descriptors."""
+        for proc_file in self.files.values():
+            proc_file.close()
+        self.files = {}
+
+    def _read(self, name):
+        proc_file = self.files.get(name)
+        if proc_file is None:
+            raise OSError(f"/proc/{name} is not open")
+        return proc_file.read()
+
+    def _fallback(self, function, error, *args, **kwargs):
+        if function not in self._warned:
+            self._warned.add(function)
+            print(f"Warning: {function} read from psutil ({type(error).__name__}: {error})")
+        return getattr(psutil, function)(*args, **kwargs)
+
+    def cpu_times(self, percpu=False):
+        """Cumulative CPU times in seconds (per CPU: list, in CPU order)."""
+        try:
+            times = []
+            for line in self._read("stat").split(b"\n"):
+                if not line.startswith(b"cpu"):
+                    break
+                # "cpu " is the total, "cpuN" one CPU
+                if (line[3:4] != b" ") is percpu:
+                    values = [int(value) / CLOCK_TICKS for value in line.split()[1:11]]
+                    values += [0.0] * (10 - len(values))
+                    times.append(CpuTimes(*values))
+            if not times:
+                raise ValueError("no cpu lines")
+            return times if percpu else times[0]
+        except READ_ERRORS as e:
+            return self._fallback("cpu_times", e, percpu=percpu)
+
+    def boot_time(self):
+        """System boot time (Unix time), read once."""
+        if self._boot_time is None:
+            try:
+                data = self._read("stat")
+                start = data.index(b"\nbtime ") + 7
+                self._boot_time = float(data[start:data.index(b"\n", start)])
+            except READ_ERRORS as e:
+                self._boot_time = self._fallback("boot_time", e)
+        return self._boot_time
+
+    def cpu_count(self, logical=True):
+        """Number of logical CPUs, or of physical cores (read once)."""
+        if logical:
+            return os.cpu_count()
+        if self._physical_cores is None:
+            self._physical_cores = psutil.cpu_count(logical=False)
+        return self._physical_cores
+
+    def getloadavg(self):
+        """1, 5 and 15 minute load averages."""
+        try:
+            one, five, fifteen = self._read("loadavg").split()[:3]
+            return float(one), float(five), float(fifteen)
+        except READ_ERRORS as e:
+            return self._fallback("getloadavg", e)
+
+    def _meminfo(self, *keys):
+        """Values in bytes of the given /proc/meminfo keys (b"MemTotal"...)."""
+        wanted = set(keys)
+        values = {}
+        for line in self._read("meminfo").split(b"\n"):
+            key, _, rest = line.partition(b":")
+            if key in wanted:
+                values[key] = int(rest.split()[0]) * 1024
+                if len(values) == len(wanted):
+                    break
+        return values
+
+    def virtual_memory(self):
+        """Memory usage computed like psutil (used = total - available)."""
+        try:
+            mem = self._meminfo(b"MemTotal", b"MemFree", b"MemAvailable")
+            total, free = mem[b"MemTotal"], mem[b"MemFree"]
+            available = mem.get(b"MemAvailable", 0)
+            if available <= 0:
+                # Old kernels: psutil estimates it from the zone watermarks
+                raise ValueError("MemAvailable missing")
+            if available > total:
+                available = free
+            return VirtualMemory(total, available, usage_percent(total - available, total),
+                                 total - available, free)
+        except READ_ERRORS as e:
+            return self._fallback("virtual_memory", e)
+
+    def swap_memory(self):
+        """Swap usage (psutil also reads /proc/vmstat for sin/sout)."""
+        try:
+            mem = self._meminfo(b"SwapTotal", b"SwapFree")
+            total, free = mem[b"SwapTotal"], mem[b"SwapFree"]
+            return SwapMemory(total, total - free, free, usage_percent(total - free, total))
+        except READ_ERRORS as e:
+            return self._fallback("swap_memory", e)
+
+    def net_io_counters(self, pernic=False):
+        """Network counters, summed over all interfaces or per interface."""
+        try:
+            counters = {}
+            for line in self._read("net/dev").split(b"\n")[2:]:
+                colon = line.rfind(b":")
+                if colon < 0:
+                    continue
+                fields = line[colon + 1:].split()
+                counters[line[:colon].strip().decode()] = NetIO(
+                    int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]),
+                    int(fields[2]), int(fields[10]), int(fields[3]), int(fields[11]),
+                )
+        except READ_ERRORS as e:
+            return self._fallback("net_io_counters", e, pernic=pernic)
+        if pernic:
+            return counters
+        return NetIO(*(sum(values) for values in zip(*counters.values()))) if counters else None
+
+    def disk_io_counters(self, perdisk=False):
+        """
+        Per-device disk counters (bytes from 512-byte sectors, times in ms).
+
+        Totals (perdisk=False) only count whole disks, not their partitions:
+        they come from psutil, which knows the storage devices.
+        """
+        if not perdisk:
+            return psutil.disk_io_counters()
+        try:
+            counters = {}
+            for line in self._read("diskstats").split(b"\n"):
+                fields = line.split()
+                if len(fields) < 14:
+                    if fields:
+                        raise ValueError(f"unsupported diskstats line {line[:60]!r}")
+                    continue
+                (reads, reads_merged, read_sectors, read_time, writes, writes_merged,
+                 write_sectors, write_time, _in_flight, busy_time) = map(int, fields[3:13])
+                counters[fields[2].decode()] = DiskIO(
+                    reads, writes, read_sectors * SECTOR_SIZE, write_sectors * SECTOR_SIZE,
+                    read_time, write_time, reads_merged, writes_merged, busy_time,
+                )
+            return counters
+        except READ_ERRORS as e:
+            return self._fallback("disk_io_counters", e, perdisk=perdisk)
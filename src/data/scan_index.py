@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Incremental file-scan index.
+This module persists per-directory scan results in SQLite so a rescan only
+reads directories whose mtime changed since the previous run.
+"""
+
+import heapq
+import json
+import os
+import sqlite3
+import time
+
+from .file_scanner import ScanOptions, ScanStats, make_visit, prepare_scan, scan_directory, scan_tree
+
+# Bump when the stored format changes (forces a rebuild)
+INDEX_VERSION = 1
+
+# Directories modified this close to the scan are rescanned next time,
+# since later changes within the same mtime tick would go unnoticed
+RACY_WINDOW_NS = 2_000_000_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _signature(root, options, top_n):
+    """Describe the scan settings; a different signature invalidates the index."""
+    return json.dumps({
+        "version": INDEX_VERSION,
+        "root": os.path.abspath(root),
+        "symlinks": options.symlinks,
+        "max_depth": options.max_depth,
+        "exclude": list(options.exclude),
+        "one_filesystem": options.one_filesystem,
+        "top_n": top_n,
+    }, sort_keys=True)
+
+
+def _encode_entry(stats, subdirs):
+    """Serialize the direct-file statistics and subdirectories of one directory."""
+    return json.dumps({
+        "total": stats.total_files,
+        "ext": {ext: counter for ext, counter in stats.extensions.items() if counter[0]},
+        "top": stats.largest,
+        "subdirs": subdirs,
+    }, separators=(",", ":"))
+
+
+def _merge_entry(total, entry):
+    """Merge a decoded index entry into the running ScanStats."""
+    total.total_files += entry["total"]
+    extensions = total.extensions
+    for ext, (count, size) in entry["ext"].items():
+        counter = extensions.setdefault(ext, [0, 0])
+        counter[0] += count
+        counter[1] += size
+    largest = total.largest
+    for size, path in entry["top"]:
+        if len(largest) < total.top_n:
+            heapq.heappush(largest, (size, path))
+        elif size > largest[0][0]:
+            heapq.heapreplace(largest, (size, path))
+
+
+class ScanIndex:
+    """
+    SQLite index of per-directory scan results.
+
+    For each directory it stores the mtime and one JSON entry with the
+    aggregated statistics of the files directly inside it (extension
+    counts/sizes and top-N candidates) and the list of its subdirectories.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        directory = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(index_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def check_signature(self, signature, rebuild=False):
+        """
+        Clear the index if requested or if the scan settings changed.
+
+        Returns:
+            True if the existing entries can be reused.
+        """
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if rebuild or row is None or row[0] != signature:
+            with self.connection:
+                self.connection.execute("DELETE FROM dirs")
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,)
+                )
+            return False
+        return True
+
+    def get(self, path):
+        """Return (mtime_ns, decoded entry) for a directory or None."""
+        row = self.connection.execute(
+            "SELECT mtime_ns, data FROM dirs WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(self, path, mtime_ns, stats, subdirs):
+        """Store the scan result of one directory."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO dirs (path, mtime_ns, data) VALUES (?, ?, ?)",
+            (path, mtime_ns, _encode_entry(stats, subdirs)),
+        )
+
+    def delete_tree(self, path):
+        """Forget a directory and everything below it."""
+        prefix = path.rstrip(os.sep) + os.sep
+        self.connection.execute(
+            "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+            (path, len(prefix), prefix),
+        )
+
+
+def scan_tree_incremental(root, index_path, rebuild=False, symlinks="files", max_depth=None,
+                          exclude=(), one_filesystem=False, top_n=5):
+    """
+    Scan a tree, reusing the index for directories whose mtime is unchanged.
+
+    Every directory is still stat'ed, but only changed directories are
+    listed and their files stat'ed. Note that a file modified in place does
+    not change its directory mtime: use rebuild=True to force a full rescan.
+    If the index cannot be used, a cold scan_tree is done instead.
+
+    Args:
+        root: Directory to scan.
+        index_path: SQLite index file.
+        rebuild: Discard the index and rescan everything.
+        symlinks, max_depth, exclude, one_filesystem, top_n: See scan_tree.
+
+    Returns:
+        ScanStats with the aggregated results.
+    """
+    try:
+        index = ScanIndex(index_path)
+    except sqlite3.Error as e:
+        print(f"Warning: scan index unavailable ({e}), doing a full scan")
+        return scan_tree(root, None, symlinks, max_depth, exclude, one_filesystem, top_n)
+
+    with index:
+        try:
+            return _scan_with_index(index, root, rebuild, symlinks, max_depth,
+                                    exclude, one_filesystem, top_n)
+        except sqlite3.Error as e:
+            print(f"Warning: scan index error ({e}), doing a full scan")
+            return scan_tree(root, None, symlinks, max_depth, exclude, one_filesystem, top_n)
+
+
+def _scan_with_index(index, root, rebuild, symlinks, max_depth, exclude, one_filesystem, top_n):
+    """Incremental scan body (see scan_tree_incremental)."""
+    options = ScanOptions(symlinks, max_depth, exclude, one_filesystem)
+    total = ScanStats(top_n)
+
+    root_key = prepare_scan(root, options)
+    if root_key is None:
+        return total
+
+    index.check_signature(_signature(root, options, top_n), rebuild)
+
+    visit = make_visit({root_key})
+    racy_limit = time.time_ns() - RACY_WINDOW_NS
+    stack = [(os.fspath(root), 0)]
+
+    with index.connection:
+        while stack:
+            directory, depth = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                index.delete_tree(directory)
+                continue
+
+            row = index.get(directory)
+            if row is not None and row[0] == mtime_ns:
+                entry = row[1]
+                _merge_entry(total, entry)
+                stack.extend(entry["subdirs"])
+                continue
+
+            stats = ScanStats(top_n)
+            subdirs = []
+            scan_directory(directory, depth, stats, options, visit, subdirs.append)
+
+            if row is not None:
+                current = {path for path, _ in subdirs}
+                for path, _ in row[1]["subdirs"]:
+                    if path not in current:
+                        index.delete_tree(path)
+
+            stored_mtime = mtime_ns if mtime_ns < racy_limit else -1
+            index.put(directory, stored_mtime, stats, subdirs)
+
+            total.merge(stats)
+            stack.extend(subdirs)
+
+    return total
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Snapshot export for offline analysis.
+This module appends each collected snapshot to a JSON Lines or CSV file,
+optionally compressed, rotates the file by size, and streams snapshots
+back lazily (rotated files included) for replay.
+"""
+
+import csv
+import glob
+import importlib
+import importlib.util
+import json
+import math
+import os
+import re
+import time
+
+# Compression by file suffix: suffix -> module with a gzip-like open(),
+# imported on first use (monitor.py validates --export paths at startup)
+COMPRESSORS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+try:  # Python 3.14+
+    if importlib.util.find_spec("compression.zstd") is not None:
+        COMPRESSORS[".zst"] = "compression.zstd"
+except ImportError:
+    pass
+
+FORMATS = ("jsonl", "csv")
+
+# Part of a rotated file name between the stem and the suffix:
+# "-<YYYYmmdd-HHMMSS>" and "-<n>" when that second was already taken
+ROTATED_NAME = re.compile(r"-(\d{8}-\d{6})(?:-(\d+))?")
+
+# Shared encoder: compact separators, no indentation
+_encoder = json.JSONEncoder(separators=(",", ":"), default=str)
+
+
+def split_path(path):
+    """
+    Split an export path into (stem, format, compression suffix).
+
+    "snapshots.csv.gz" -> ("snapshots", "csv", ".gz").
+
+    Raises:
+        ValueError: Unknown format or compression.
+    """
+    name = os.fspath(path)
+    compression = ""
+    root, suffix = os.path.splitext(name)
+    if suffix in COMPRESSORS:
+        compression = suffix
+        name = root
+    elif suffix == ".zst":
+        raise ValueError("zstd compression needs Python 3.14 (compression.zstd)")
+    stem, suffix = os.path.splitext(name)
+    if suffix.lstrip(".") not in FORMATS:
+        raise ValueError(f"Unknown export format: {path} (expected .jsonl or .csv, "
+                         f"optionally with {', '.join(COMPRESSORS)})")
+    return stem, suffix.lstrip("."), compression
+
+
+def open_text(path, mode):
+    """Open a text file, compressed according to its suffix."""
+    module_name = COMPRESSORS.get(os.path.splitext(os.fspath(path))[1])
+    if module_name is None:
+        return open(path, mode, encoding="utf-8", newline="")
+    module = importlib.import_module(module_name)
+    if module_name == "gzip" and mode != "r":
+        # Level 9 (the default) costs several times level 6 for a few percent
+        return module.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    return module.open(path, mode + "t", encoding="utf-8", newline="")
+
+
+def rotated_files(stem, fmt, compression):
+    """
+    Rotated files of an export, oldest first.
+
+    Only names written by rotate() count: "metrics-raw.jsonl" shares the
+    "metrics-" prefix of the export "metrics.jsonl" but is another file.
+    """
+    suffix = f".{fmt}{compression}"
+    rotated = []
+    for path in glob.glob(glob.escape(stem) + "-*" + suffix):
+        match = ROTATED_NAME.fullmatch(path[len(stem):-len(suffix)])
+        if match:
+            # "x-20240115-103000" sorts before "x-20240115-103000-1" and "-2" before "-10"
+            rotated.append((match.group(1), int(match.group(2) or 0), path))
+    return [path for _time, _count, path in sorted(rotated)]
+
+
+def encode_cell(value):
+    """
+    CSV cell of one value: finite numbers as they are, None as an empty
+    cell and anything else (strings, booleans, NaN, lists, dictionaries) as
+    JSON, so a string that looks like a number reads back as a string.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return value
+    return _encoder.encode(value)
+
+
+def flatten(snapshot):
+    """
+    Flatten a snapshot into one level of "section.field" columns.
+
+    Only the first level is expanded: field values that are lists or
+    dictionaries (per-core values, process tables, extensions) are kept
+    whole. Cells are encoded with encode_cell(), so parse_cell() restores
+    their types.
+
+    Args:
+        snapshot: collect_all() or process_all() data.
+
+    Returns:
+        Dictionary column -> CSV cell (number or string).
+    """
+    flat = {}
+    for section, value in snapshot.items():
+        if isinstance(value, dict):
+            for field, field_value in value.items():
+                flat[f"{section}.{field}"] = encode_cell(field_value)
+        else:
+            flat[section] = encode_cell(value)
+    return flat
+
+
+def parse_cell(cell):
+    """Convert a CSV cell written by encode_cell() back to its value."""
+    if cell == "":
+        return None
+    try:
+        return json.loads(cell)
+    except ValueError:
+        return cell
+
+
+def unflatten(flat):
+    """
+    Rebuild a nested snapshot from flatten() columns (CSV rows).
+
+    Args:
+        flat: Dictionary column -> CSV cell.
+
+    Returns:
+        Nested snapshot dictionary (empty cells are left out).
+    """
+    snapshot = {}
+    for column, cell in flat.items():
+        value = parse_cell(cell) if isinstance(cell, str) else cell
+        if value is None:
+            continue
+        section, dot, field = column.partition(".")
+        if dot:
+            snapshot.setdefault(section, {})[field] = value
+        else:
+            snapshot[section] = value
+    return snapshot
+
+
+class SnapshotExporter:
+    """
+    Append snapshots to a JSON Lines or CSV file with size-based rotation.
+
+    The format and compression come from the path: snapshots.jsonl,
+    snapshots.csv.gz, snapshots.jsonl.xz, ... When the current file
+    reaches max_bytes (text written; the size on disk for a reopened
+    file), it is renamed with the rotation time
+    (snapshots-20240115-103000.jsonl.gz) and a new file is started; only
+    the newest keep rotated files are kept (None = all).
+
+    CSV columns are fixed by the first snapshot of each file (or by the
+    header of the file being appended to); later columns are dropped.
+    Cells other than numbers hold JSON (strings are quoted), so replayed
+    rows keep their types.
+    Compressed files are flushed on rotation and close only, so a killed
+    process may lose its last buffered snapshots.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, keep=10, clock=time.time):
+        self.path = os.fspath(path)
+        self.stem, self.format, self.compression = split_path(self.path)
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.clock = clock
+        self.file = None
+        self.writer = None
+        self.columns = None
+        self.size = 0
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+    def close(self):
+        """Flush and close the current file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self):
+        """Open the current file for appending, restoring the CSV header."""
+        self.columns = None
+        if self.format == "csv" and os.path.exists(self.path):
+            try:
+                with open_text(self.path, "r") as f:
+                    self.columns = next(csv.reader(f), None)
+            except (OSError, EOFError) as e:
+                print(f"Warning: cannot read the header of {self.path}: {e}")
+                self.rotate()
+
+        self.size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self.file = open_text(self.path, "a")
+        if self.format == "csv":
+            self.writer = csv.writer(self.file)
+
+    def rotate(self):
+        """Rename the current file with the rotation time and start a new one."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        rotated = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.clock()))
+        target = f"{self.stem}-{rotated}.{self.format}{self.compression}"
+        suffix = 1
+        while os.path.exists(target):
+            target = f"{self.stem}-{rotated}-{suffix}.{self.format}{self.compression}"
+            suffix += 1
+        os.replace(self.path, target)
+
+        if self.keep is None:
+            return
+        old_files = rotated_files(self.stem, self.format, self.compression)
+        for old in old_files[:max(len(old_files) - self.keep, 0)]:
+            try:
+                os.unlink(old)
+            except OSError as e:
+                print(f"Warning: cannot remove {old}: {e}")
+
+    def write(self, snapshot):
+        """
+        Append one snapshot.
+
+        Args:
+            snapshot: collect_all() or process_all() data. An "exported_at"
+                Unix time is added for replay.
+        """
+        if self.file is None:
+            self._open()
+        elif self.size >= self.max_bytes:
+            self.rotate()
+            self._open()
+
+        record = {"exported_at": round(self.clock(), 3)}
+        record.update(snapshot)
+
+        if self.format == "jsonl":
+            self.size += self.file.write(_encoder.encode(record) + "\n")
+        else:
+            flat = flatten(record)
+            if self.columns is None:
+                self.columns = list(flat)
+                self.size += self.writer.writerow(self.columns)
+            self.size += self.writer.writerow([flat.get(column, "") for column in self.columns])
+        if not self.compression:
+            self.file.flush()
+
+
+def export_paths(path):
+    """
+    Files of an export in time order: rotated files, then the current one.
+
+    Args:
+        path: Export path given to SnapshotExporter.
+
+    Returns:
+        List of existing paths.
+    """
+    paths = rotated_files(*split_path(path))
+    if os.path.exists(path):
+        paths.append(os.fspath(path))
+    return paths
+
+
+def read_snapshots(path, rotated=True):
+    """
+    Stream the snapshots of an export back, one at a time.
+
+    Files are read line by line, so memory use does not depend on the
+    export size. A truncated last record (killed writer) ends the file.
+
+    Args:
+        path: Export path given to SnapshotExporter.
+        rotated: Also read the rotated files, oldest first.
+
+    Yields:
+        Snapshot dictionaries (CSV rows are rebuilt with unflatten()).
+    """
+    _stem, fmt, _compression = split_path(path)
+    paths = export_paths(path) if rotated else [os.fspath(path)]
+
+    for file_path in paths:
+        try:
+            with open_text(file_path, "r") as f:
+                if fmt == "jsonl":
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            print(f"Warning: {file_path}: truncated record skipped")
+                else:
+                    reader = csv.reader(f)
+                    columns = next(reader, None)
+                    for row in reader:
+                        if len(row) == len(columns):
+                            yield unflatten(dict(zip(columns, row)))
+        except (EOFError, OSError) as e:
+            print(f"Warning: {file_path}: {e}")
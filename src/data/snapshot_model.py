@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Data Layer - Compact snapshot model.
+This module stores a collect_all() snapshot in __slots__ records holding
+raw values only: per-core percentages in a float array, process, mount
+and file rows in small records, and no "*_formatted" strings, which are
+rebuilt from the raw values when a section is read. A Snapshot is a
+read-only mapping with the collect_all() shape, so the processing
+functions accept it in place of the dictionary.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+
+from .formatting import format_bytes, format_uptime
+
+
+def format_rate(value):
+    """Bytes per second, "N/A" when unknown."""
+    return "N/A" if value is None else format_bytes(value) + "/s"
+
+
+class Record:
+    """
+    Base of the compact records.
+
+    KEYS lists the dictionary keys in collector order. Keys listed in
+    FORMATTED are not stored: they are rebuilt from their raw field by
+    to_dict() (a formatted value without its raw field is kept as is). Fields listed in
+    CODECS hold nested values in a compact form. Unknown keys are kept
+    as they are in extra, so a round trip loses nothing.
+    """
+
+    __slots__ = ("extra",)
+
+    KEYS = ()
+    FORMATTED = {}   # formatted key -> (raw field, formatter)
+    CODECS = {}      # field -> codec with encode() and decode()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a collector dictionary."""
+        record = cls.__new__(cls)
+        record.extra = None
+        for key, value in data.items():
+            formatted = cls.FORMATTED.get(key)
+            if formatted is not None and formatted[0] in data:
+                continue
+            if key in cls.CODECS:
+                setattr(record, key, cls.CODECS[key].encode(value))
+            elif key in cls.__slots__:
+                setattr(record, key, value)
+            else:
+                if record.extra is None:
+                    record.extra = {}
+                record.extra[key] = value
+        return record
+
+    def to_dict(self):
+        """Rebuild the collector dictionary, formatted strings included."""
+        data = {}
+        for key in self.KEYS:
+            formatted = self.FORMATTED.get(key)
+            if formatted is not None:
+                field, formatter = formatted
+                value = getattr(self, field, _MISSING)
+                if value is not _MISSING:
+                    data[key] = formatter(value)
+                continue
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                continue
+            codec = self.CODECS.get(key)
+            data[key] = codec.decode(value) if codec is not None else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+_MISSING = object()
+
+
+def record_class(name, keys, formatted=None, codecs=None):
+    """
+    Create a Record subclass with one slot per stored key.
+
+    Args:
+        name: Class name.
+        keys: Dictionary keys in collector order, formatted ones included.
+        formatted: Formatted key -> (raw field, formatter).
+        codecs: Field -> codec for nested values.
+    """
+    formatted = formatted or {}
+    attributes = {
+        "__slots__": tuple(key for key in keys if key not in formatted),
+        "KEYS": tuple(keys),
+        "FORMATTED": formatted,
+        "CODECS": codecs or {},
+    }
+    return type(name, (Record,), attributes)
+
+
+class FloatArray:
+    """Codec of a list of numbers: array of doubles (8 bytes per value)."""
+
+    @staticmethod
+    def encode(values):
+        try:
+            return array("d", values)
+        except TypeError:
+            return values  # not only numbers: kept as is
+
+    @staticmethod
+    def decode(values):
+        return values.tolist() if isinstance(values, array) else values
+
+
+class One:
+    """Codec of a nested dictionary: one record."""
+
+    def __init__(self, record_type):
+        self.record_type = record_type
+
+    def encode(self, row):
+        return self.record_type.from_dict(row) if isinstance(row, dict) else row
+
+    def decode(self, row):
+        return row.to_dict() if isinstance(row, Record) else row
+
+
+class ListOf:
+    """Codec of a list of row dictionaries: tuple of records."""
+
+    def __init__(self, record_type):
+        self.record_type = record_type
+
+    def encode(self, rows):
+        if not isinstance(rows, list):
+            return rows
+        return tuple(self.record_type.from_dict(row) if isinstance(row, dict) else row for row in rows)
+
+    def decode(self, rows):
+        if not isinstance(rows, tuple):
+            return rows
+        return [row.to_dict() if isinstance(row, Record) else row for row in rows]
+
+
+class MapOf:
+    """Codec of a name -> row dictionary mapping: name -> record."""
+
+    def __init__(self, record_type):
+        self.record_type = record_type
+
+    def encode(self, rows):
+        if not isinstance(rows, dict):
+            return rows
+        return {name: self.record_type.from_dict(row) if isinstance(row, dict) else row
+                for name, row in rows.items()}
+
+    def decode(self, rows):
+        if not isinstance(rows, dict):
+            return rows
+        return {name: row.to_dict() if isinstance(row, Record) else row for name, row in rows.items()}
+
+
+def _bytes_formatted(*fields):
+    return {f"{field}_formatted": (field, format_bytes) for field in fields}
+
+
+SystemRecord = record_class(
+    "SystemRecord",
+    ("hostname", "os", "os_version", "architecture", "boot_time", "uptime_seconds",
+     "uptime_formatted", "python_version"),
+    formatted={"uptime_formatted": ("uptime_seconds", format_uptime)},
+)
+
+CpuFreqRecord = record_class("CpuFreqRecord", ("current", "min", "max"))
+
+CpuRecord = record_class(
+    "CpuRecord",
+    ("physical_cores", "logical_cores", "cpu_percent", "cpu_percent_per_core",
+     "load_avg_1min", "load_avg_5min", "load_avg_15min", "cpu_freq"),
+    codecs={"cpu_percent_per_core": FloatArray, "cpu_freq": One(CpuFreqRecord)},
+)
+
+MemoryRecord = record_class(
+    "MemoryRecord",
+    ("total", "available", "used", "percent", "total_formatted", "available_formatted",
+     "used_formatted", "swap_total", "swap_used", "swap_percent", "swap_total_formatted",
+     "swap_used_formatted"),
+    formatted=_bytes_formatted("total", "available", "used", "swap_total", "swap_used"),
+)
+
+MountRecord = record_class(
+    "MountRecord",
+    ("mountpoint", "device", "fstype", "total", "used", "free", "percent",
+     "total_formatted", "used_formatted", "free_formatted"),
+    formatted=_bytes_formatted("total", "used", "free"),
+)
+
+DiskCountersRecord = record_class(
+    "DiskCountersRecord",
+    ("read_count", "write_count", "read_bytes", "write_bytes", "read_time", "write_time",
+     "busy_time"),
+)
+
+DiskRateRecord = record_class(
+    "DiskRateRecord",
+    ("read_iops", "write_iops", "read_bytes_per_s", "write_bytes_per_s", "await_ms",
+     "util_percent", "read_bytes_per_s_formatted", "write_bytes_per_s_formatted"),
+    formatted={
+        "read_bytes_per_s_formatted": ("read_bytes_per_s", format_rate),
+        "write_bytes_per_s_formatted": ("write_bytes_per_s", format_rate),
+    },
+)
+
+DiskRecord = record_class(
+    "DiskRecord",
+    ("total", "used", "free", "percent", "total_formatted", "used_formatted", "free_formatted",
+     "mounts", "io_counters", "io_interval", "io_rates"),
+    formatted=_bytes_formatted("total", "used", "free"),
+    codecs={
+        "mounts": ListOf(MountRecord),
+        "io_counters": MapOf(DiskCountersRecord),
+        "io_rates": MapOf(DiskRateRecord),
+    },
+)
+
+NetworkRateRecord = record_class(
+    "NetworkRateRecord",
+    ("bytes_sent_per_s", "bytes_recv_per_s", "packets_sent_per_s", "packets_recv_per_s",
+     "errors_per_s", "drops_per_s", "bytes_sent_per_s_formatted", "bytes_recv_per_s_formatted"),
+    formatted={
+        "bytes_sent_per_s_formatted": ("bytes_sent_per_s", format_rate),
+        "bytes_recv_per_s_formatted": ("bytes_recv_per_s", format_rate),
+    },
+)
+
+NetworkRecord = record_class(
+    "NetworkRecord",
+    ("bytes_sent", "bytes_recv", "bytes_sent_formatted", "bytes_recv_formatted",
+     "packets_sent", "packets_recv", "interfaces", "rates_interval", "bytes_sent_per_s",
+     "bytes_recv_per_s", "bytes_sent_per_s_formatted", "bytes_recv_per_s_formatted", "rates"),
+    formatted={
+        **_bytes_formatted("bytes_sent", "bytes_recv"),
+        "bytes_sent_per_s_formatted": ("bytes_sent_per_s", format_rate),
+        "bytes_recv_per_s_formatted": ("bytes_recv_per_s", format_rate),
+    },
+    codecs={"rates": MapOf(NetworkRateRecord)},
+)
+
+ProcessRecord = record_class("ProcessRecord", ("pid", "name", "cpu_percent", "memory_percent"))
+
+ProcessesRecord = record_class(
+    "ProcessesRecord",
+    ("total_count", "top_n", "top_3_cpu", "top_3_memory"),
+    codecs={"top_3_cpu": ListOf(ProcessRecord), "top_3_memory": ListOf(ProcessRecord)},
+)
+
+ExtensionRecord = record_class(
+    "ExtensionRecord",
+    ("count", "size", "size_formatted", "percentage"),
+    formatted=_bytes_formatted("size"),
+)
+
+LargestFileRecord = record_class(
+    "LargestFileRecord",
+    ("path", "name", "size", "size_formatted"),
+    formatted=_bytes_formatted("size"),
+)
+
+FilesRecord = record_class(
+    "FilesRecord",
+    ("directory", "total_files", "by_extension", "top_5_largest"),
+    codecs={"by_extension": MapOf(ExtensionRecord), "top_5_largest": ListOf(LargestFileRecord)},
+)
+
+# Section name -> record type
+SECTION_RECORDS = {
+    "system": SystemRecord,
+    "cpu": CpuRecord,
+    "memory": MemoryRecord,
+    "disk": DiskRecord,
+    "network": NetworkRecord,
+    "processes": ProcessesRecord,
+    "files": FilesRecord,
+}
+
+
+class Snapshot(Mapping):
+    """
+    Compact, read-only form of one collect_all() snapshot.
+
+    Sections are stored as records and rebuilt as dictionaries when read
+    (snapshot["cpu"], snapshot.get("memory", {})), so get_template_variables
+    and process_all accept a Snapshot directly. Failed sections (error
+    markers), sections left out by --only and other top-level values
+    (timestamp, collector_ages, exported_at) are kept as they are.
+    """
+
+    __slots__ = ("sections",)
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    @classmethod
+    def from_dict(cls, raw_data):
+        """
+        Build a snapshot from collect_all() data (or an agent payload).
+
+        Returns:
+            Snapshot.
+        """
+        sections = {}
+        for name, value in raw_data.items():
+            record_type = SECTION_RECORDS.get(name)
+            if record_type is not None and isinstance(value, dict) and "error" not in value:
+                value = record_type.from_dict(value)
+            sections[name] = value
+        return cls(sections)
+
+    def to_dict(self):
+        """Rebuild the collect_all() dictionary."""
+        return {name: self[name] for name in self.sections}
+
+    def record(self, name):
+        """Stored form of a section (record, error marker or None)."""
+        return self.sections.get(name)
+
+    def __getitem__(self, name):
+        value = self.sections[name]
+        return value.to_dict() if isinstance(value, Record) else value
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __repr__(self):
+        return f"Snapshot({', '.join(self.sections)})"
+
+
+def deep_size(value, seen=None):
+    """
+    Approximate memory used by a value and everything it references.
+
+    Counts dictionaries, lists, tuples, arrays, records and snapshots
+    recursively (each object once); strings and numbers by sys.getsizeof.
+
+    Returns:
+        Size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif isinstance(value, Snapshot):
+        size += deep_size(value.sections, seen)
+    elif isinstance(value, Record):
+        for cls in type(value).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                size += deep_size(getattr(value, slot, None), seen)
+    return size
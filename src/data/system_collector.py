@@ -1,41 +1,68 @@
 #!/usr/bin/env python3
 """
 Data Layer - System data collection via psutil.
-This module retrieves raw system information from the Linux system.
+This module retrieves raw system information from the Linux system
+(the hot counters optionally straight from /proc, see set_backend).
 """
 
+import heapq
 import os
-import platform
 import socket
+import threading
+import time
 from datetime import datetime
-from pathlib import Path
 
 import psutil
 
+from .counter_rates import CounterRates
+from .formatting import format_bytes, format_uptime
 
-def format_bytes(bytes_value):
-    """Format bytes into human-readable units."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if bytes_value < 1024:
-            return f"{bytes_value:.2f} {unit}"
-        bytes_value /= 1024
-    return f"{bytes_value:.2f} PB"
+# platform, concurrent.futures and the file scanner modules are imported
+# where they are used, so a run limited by --only does not load them
 
+# Collected sections, in collection order
+SECTIONS = ("system", "cpu", "memory", "disk", "network", "processes", "files")
 
-def format_uptime(seconds):
-    """Format uptime duration."""
-    days = int(seconds // 86400)
-    hours = int((seconds % 86400) // 3600)
-    minutes = int((seconds % 3600) // 60)
+# A CPU snapshot (per core or per process) saved by a previous run is used
+# as the baseline up to this age
+CPU_BASELINE_MAX_AGE = 900
 
-    parts = []
-    if days > 0:
-        parts.append(f"{days}d")
-    if hours > 0:
-        parts.append(f"{hours}h")
-    parts.append(f"{minutes}m")
+# Sources of the CPU, memory, load, network and disk I/O counters
+BACKENDS = ("psutil", "proc")
 
-    return " ".join(parts)
+# Backend in use: the psutil module itself, or a ProcBackend offering the
+# same functions (see set_backend)
+_backend = psutil
+
+
+def set_backend(name):
+    """
+    Select where the CPU, memory, load, network and disk I/O counters are read.
+
+    Args:
+        name: "psutil", or "proc" to read /proc directly through reused
+            file descriptors (Linux; psutil answers what /proc cannot).
+
+    Returns:
+        Name of the backend now in use ("psutil" when /proc is unavailable).
+
+    Raises:
+        ValueError: Unknown backend name.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r} (known: {', '.join(BACKENDS)})")
+    if _backend is not psutil:
+        _backend.close()
+        _backend = psutil
+    if name == "proc":
+        if not os.path.isfile("/proc/stat"):
+            print("Warning: /proc/stat not found, using psutil")
+            return "psutil"
+        from .proc_backend import ProcBackend
+
+        _backend = ProcBackend()
+    return name
 
 
 def get_cpu_freq():
@@ -55,7 +82,9 @@ def get_cpu_freq():
 
 def get_system_info():
     """Get general system information."""
-    boot_time = datetime.fromtimestamp(psutil.boot_time())
+    import platform
+
+    boot_time = datetime.fromtimestamp(_backend.boot_time())
     uptime = datetime.now() - boot_time
 
     return {
@@ -70,15 +99,165 @@ def get_system_info():
     }
 
 
-def get_cpu_info():
-    """Get CPU information."""
-    cpu_percent_per_core = psutil.cpu_percent(interval=1, percpu=True)
-    load_avg = psutil.getloadavg() if hasattr(psutil, "getloadavg") else (0, 0, 0)
+def refresh_uptime(system_info):
+    """
+    Return a copy of get_system_info() data with the uptime brought current.
 
+    Args:
+        system_info: Result of get_system_info().
+    """
+    uptime = datetime.now() - datetime.fromtimestamp(_backend.boot_time())
     return {
-        "physical_cores": psutil.cpu_count(logical=False) or 0,
-        "logical_cores": psutil.cpu_count(logical=True) or 0,
-        "cpu_percent": psutil.cpu_percent(interval=0.1),
+        **system_info,
+        "uptime_seconds": int(uptime.total_seconds()),
+        "uptime_formatted": format_uptime(uptime.total_seconds()),
+    }
+
+
+class CpuSampler:
+    """
+    Non-blocking CPU usage sampler.
+
+    Keeps the previous per-core cpu_times snapshot and computes usage from
+    the deltas between two collections, so no sleep is needed except for
+    one short priming sample on the first call. Calls closer together
+    than prime_interval return the previous result, as a window that short
+    only holds a few clock ticks.
+
+    With a state_name, the first sample is computed against the snapshot
+    saved by a previous run (if recent enough) instead of priming, so
+    one-shot runs report the usage since the last run without sleeping.
+
+    iowait counts as idle, as in psutil.cpu_percent(): the CPU is free to
+    run other work while a task waits for I/O. A disk-bound host can
+    therefore show low CPU usage, and the disk utilisation shows the wait.
+    """
+
+    def __init__(self, prime_interval=0.1, state_name=None):
+        self.prime_interval = prime_interval
+        # Snapshot persisted between runs (counter_rates.set_state_dir)
+        self._saved = CounterRates(state_name) if state_name else None
+        self._previous = None
+        self._previous_time = 0.0
+        self._last_result = None
+
+    def reset(self):
+        """Forget the previous snapshot (next sample primes again)."""
+        self._previous = None
+        self._last_result = None
+
+    @staticmethod
+    def _busy_and_total(times):
+        """Return (busy, total) jiffies for one cpu_times entry."""
+        total = sum(times)
+        # On Linux guest time is already counted in user/nice
+        total -= getattr(times, "guest", 0) + getattr(times, "guest_nice", 0)
+        # iowait is idle time spent waiting for I/O (psutil counts it the same way)
+        idle = times.idle + getattr(times, "iowait", 0)
+        return total - idle, total
+
+    def _saved_usage(self, current):
+        """
+        Usage since the snapshot saved by a previous run, saving this one.
+
+        Returns:
+            Tuple (overall percent, per-core percents), or None when there
+            is no usable snapshot (none, too old, other boot or core count).
+        """
+        counters = {str(i): times._asdict() for i, times in enumerate(current)}
+        interval, rates = self._saved.update(counters, epoch=int(_backend.boot_time()))
+        if not interval or interval > CPU_BASELINE_MAX_AGE or len(rates) != len(current):
+            return None
+
+        # Per-second deltas have the same busy/total ratio as raw deltas
+        per_core = []
+        busy_sum = total_sum = 0.0
+        for i, times in enumerate(current):
+            busy, total = self._busy_and_total(type(times)(**rates[str(i)]))
+            busy = max(busy, 0.0)
+            busy_sum += busy
+            total_sum += total
+            per_core.append(round(min(busy / total * 100, 100.0), 1) if total > 0 else 0.0)
+        overall = round(min(busy_sum / total_sum * 100, 100.0), 1) if total_sum > 0 else 0.0
+        return overall, per_core
+
+    def sample(self):
+        """
+        Compute CPU usage since the previous sample.
+
+        Returns:
+            Tuple (overall percent, list of per-core percents).
+        """
+        now = time.monotonic()
+        if self._last_result is not None and now - self._previous_time < self.prime_interval:
+            return self._last_result
+
+        current = _backend.cpu_times(percpu=True)
+
+        if self._previous is None and self._saved is not None:
+            result = self._saved_usage(current)
+            if result is not None:
+                self._previous, self._previous_time, self._last_result = current, now, result
+                return result
+
+        if self._previous is None or len(self._previous) != len(current):
+            self._previous = current
+            time.sleep(self.prime_interval)
+            current = _backend.cpu_times(percpu=True)
+            now = time.monotonic()
+
+        previous, self._previous = self._previous, current
+        self._previous_time = now
+
+        per_core = []
+        busy_sum = 0.0
+        total_sum = 0.0
+        for before, after in zip(previous, current):
+            busy_before, total_before = self._busy_and_total(before)
+            busy_after, total_after = self._busy_and_total(after)
+            busy = max(busy_after - busy_before, 0.0)
+            total = total_after - total_before
+
+            if total <= 0:
+                per_core.append(None)
+                continue
+
+            busy_sum += busy
+            total_sum += total
+            per_core.append(round(min(busy / total * 100, 100.0), 1))
+
+        # Samples taken within the same clock tick: keep the last values
+        if total_sum <= 0 and self._last_result is not None:
+            return self._last_result
+
+        last_per_core = self._last_result[1] if self._last_result else []
+        for i, value in enumerate(per_core):
+            if value is None:
+                per_core[i] = last_per_core[i] if i < len(last_per_core) else 0.0
+
+        overall = round(min(busy_sum / total_sum * 100, 100.0), 1) if total_sum > 0 else 0.0
+        self._last_result = (overall, per_core)
+        return self._last_result
+
+
+# Shared sampler: keeps its baseline between collections
+_cpu_sampler = CpuSampler(state_name="cpu")
+
+
+def get_cpu_info(sampler=None):
+    """
+    Get CPU information.
+
+    Args:
+        sampler: CpuSampler to use (default: shared module sampler).
+    """
+    cpu_percent, cpu_percent_per_core = (sampler or _cpu_sampler).sample()
+    load_avg = _backend.getloadavg() if hasattr(_backend, "getloadavg") else (0, 0, 0)
+
+    return {
+        "physical_cores": _backend.cpu_count(logical=False) or 0,
+        "logical_cores": _backend.cpu_count(logical=True) or 0,
+        "cpu_percent": cpu_percent,
         "cpu_percent_per_core": cpu_percent_per_core,
         "load_avg_1min": round(load_avg[0], 2),
         "load_avg_5min": round(load_avg[1], 2),
@@ -89,8 +268,8 @@ def get_cpu_info():
 
 def get_memory_info():
     """Get memory information."""
-    mem = psutil.virtual_memory()
-    swap = psutil.swap_memory()
+    mem = _backend.virtual_memory()
+    swap = _backend.swap_memory()
 
     return {
         "total": mem.total,
@@ -108,24 +287,251 @@ def get_memory_info():
     }
 
 
-def get_disk_info():
-    """Get disk information."""
-    disk = psutil.disk_usage("/")
+# Filesystems that hold no user data (skipped in the mount list)
+PSEUDO_FILESYSTEMS = frozenset((
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs",
+    "devpts", "devtmpfs", "efivarfs", "fuse.lxcfs", "fuse.portal", "fusectl",
+    "hugetlbfs", "mqueue", "nfsd", "nsfs", "overlay", "proc", "pstore", "ramfs",
+    "rootfs", "rpc_pipefs", "securityfs", "selinuxfs", "squashfs", "sysfs",
+    "tmpfs", "tracefs",
+))
+
+# Seconds allowed for the usage of all mounts (a hung NFS mount times out)
+DISK_USAGE_TIMEOUT = 2.0
+
+# Mount point -> thread still blocked in a previous statvfs() call
+_usage_threads = {}
+_usage_lock = threading.Lock()
+
+# Usage values of a mount, also reported at the top level for "/"
+DISK_USAGE_KEYS = (
+    "total", "used", "free", "percent", "total_formatted", "used_formatted", "free_formatted",
+)
+
+# Per-device counters used for the I/O rates
+DISK_IO_COUNTERS = (
+    "read_count", "write_count", "read_bytes", "write_bytes",
+    "read_time", "write_time", "busy_time",
+)
+
+# Previous per-device counters (persisted with counter_rates.set_state_dir)
+_disk_io_rates = CounterRates("disk_io")
+
+
+def list_mounts():
+    """
+    List the mounts holding real data.
+
+    All mounts are read, network ones (NFS, CIFS) included; pseudo
+    filesystems are skipped and bind mounts of the same device are listed
+    once (shortest mount point); "/" is always listed.
+
+    Returns:
+        List of (mountpoint, device, fstype) tuples.
+    """
+    mounts = {}
+    for part in psutil.disk_partitions(all=True):
+        if part.mountpoint != "/" and (part.fstype in PSEUDO_FILESYSTEMS
+                                       or part.device.startswith("/dev/loop")):
+            continue
+        key = part.device if part.device.startswith("/") else part.mountpoint
+        known = mounts.get(key)
+        if known is None or len(part.mountpoint) < len(known[0]):
+            mounts[key] = (part.mountpoint, part.device, part.fstype)
+    if not any(mountpoint == "/" for mountpoint, _device, _fstype in mounts.values()):
+        mounts["/"] = ("/", "", "")
+    return sorted(mounts.values())
+
+
+def _usage_worker(mountpoint, results):
+    try:
+        results[mountpoint] = psutil.disk_usage(mountpoint)
+    except OSError as e:
+        results[mountpoint] = e
+
+
+def get_mounts_usage(mounts, timeout=DISK_USAGE_TIMEOUT):
+    """
+    Query the usage of several mounts concurrently.
+
+    Each query runs in a daemon thread; a mount that does not answer
+    before the deadline is reported as an error, and is not queried again
+    while its previous call is still blocked.
+
+    Args:
+        mounts: List of (mountpoint, device, fstype) from list_mounts().
+        timeout: Seconds allowed for all the queries.
+
+    Returns:
+        Dictionary mountpoint -> psutil usage tuple or error message.
+    """
+    results = {}
+    threads = {}
+    with _usage_lock:
+        for mountpoint, _device, _fstype in mounts:
+            blocked = _usage_threads.get(mountpoint)
+            if blocked is not None and blocked.is_alive():
+                results[mountpoint] = "not responding"
+                continue
+            thread = threading.Thread(target=_usage_worker, args=(mountpoint, results),
+                                      name="disk-usage", daemon=True)
+            thread.start()
+            threads[mountpoint] = thread
+            _usage_threads[mountpoint] = thread
+
+    deadline = time.monotonic() + timeout
+    for mountpoint, thread in threads.items():
+        thread.join(max(deadline - time.monotonic(), 0))
+
+    usage = {}
+    for mountpoint, _device, _fstype in mounts:
+        result = results.get(mountpoint)
+        if result is None:
+            usage[mountpoint] = f"timeout after {timeout}s"
+        elif isinstance(result, Exception):
+            usage[mountpoint] = f"{type(result).__name__}: {result}"
+        else:
+            usage[mountpoint] = result
+    return usage
+
+
+def get_disk_io_rates(perdisk):
+    """
+    Compute per-device I/O rates since the previous collection.
+
+    Args:
+        perdisk: Result of disk_io_counters(perdisk=True) (psutil or ProcBackend).
+
+    Returns:
+        Tuple (interval seconds or None, {device: rates}).
+    """
+    counters = {
+        device: {name: getattr(io, name, 0) for name in DISK_IO_COUNTERS}
+        for device, io in perdisk.items()
+        if not device.startswith(("loop", "ram"))
+    }
+    interval, rates = _disk_io_rates.update(counters, epoch=int(_backend.boot_time()))
+
+    result = {}
+    for device, values in rates.items():
+        operations = values["read_count"] + values["write_count"]
+        result[device] = {
+            "read_iops": values["read_count"],
+            "write_iops": values["write_count"],
+            "read_bytes_per_s": values["read_bytes"],
+            "write_bytes_per_s": values["write_bytes"],
+            # Times are in ms: ms of I/O per operation, busy ms per second
+            "await_ms": (values["read_time"] + values["write_time"]) / operations if operations else 0.0,
+            "util_percent": min(values["busy_time"] / 10, 100.0),
+            "read_bytes_per_s_formatted": format_bytes(values["read_bytes"]) + "/s",
+            "write_bytes_per_s_formatted": format_bytes(values["write_bytes"]) + "/s",
+        }
+    return interval, result
+
+
+def get_disk_info(usage_timeout=DISK_USAGE_TIMEOUT):
+    """
+    Get disk information.
+
+    The top-level values are those of the root filesystem; "mounts" lists
+    every real mount, "io_counters" and "io_rates" the per-device I/O
+    counters and rates (empty on the first collection).
+
+    Args:
+        usage_timeout: Seconds allowed for the usage of all mounts.
+    """
+    mounts = list_mounts()
+    usage = get_mounts_usage(mounts, usage_timeout)
+
+    mounts_info = []
+    for mountpoint, device, fstype in mounts:
+        result = usage[mountpoint]
+        info = {"mountpoint": mountpoint, "device": device, "fstype": fstype}
+        if isinstance(result, str):
+            info["error"] = result
+        else:
+            info.update({
+                "total": result.total,
+                "used": result.used,
+                "free": result.free,
+                "percent": result.percent,
+                "total_formatted": format_bytes(result.total),
+                "used_formatted": format_bytes(result.used),
+                "free_formatted": format_bytes(result.free),
+            })
+        mounts_info.append(info)
+
+    # Top-level values of "/" (left out when it did not answer: its row
+    # carries the error, the other mounts and the I/O rates are kept)
+    root = next(info for info in mounts_info if info["mountpoint"] == "/")
+    root_usage = {key: root[key] for key in DISK_USAGE_KEYS if key in root}
+
+    try:
+        perdisk = _backend.disk_io_counters(perdisk=True) or {}
+    except (OSError, RuntimeError):
+        perdisk = {}
+    interval, rates = get_disk_io_rates(perdisk)
 
     return {
-        "total": disk.total,
-        "used": disk.used,
-        "free": disk.free,
-        "percent": disk.percent,
-        "total_formatted": format_bytes(disk.total),
-        "used_formatted": format_bytes(disk.used),
-        "free_formatted": format_bytes(disk.free),
+        **root_usage,
+        "mounts": mounts_info,
+        "io_counters": {
+            device: {name: getattr(counters, name, 0) for name in DISK_IO_COUNTERS}
+            for device, counters in perdisk.items()
+            if not device.startswith(("loop", "ram"))
+        },
+        "io_interval": round(interval, 2) if interval else None,
+        "io_rates": rates,
+    }
+
+
+# Per-interface counters used for the network rates
+NETWORK_COUNTERS = (
+    "bytes_sent", "bytes_recv", "packets_sent", "packets_recv",
+    "errin", "errout", "dropin", "dropout",
+)
+
+# Previous per-interface counters (persisted with counter_rates.set_state_dir)
+_network_rates = CounterRates("network")
+
+
+def get_network_rates(pernic):
+    """
+    Compute per-interface rates since the previous collection.
+
+    Args:
+        pernic: Result of net_io_counters(pernic=True) (psutil or ProcBackend).
+
+    Returns:
+        Tuple (interval seconds or None, {iface: {counter_per_s: value}}).
+    """
+    counters = {
+        iface: {name: getattr(nic, name) for name in NETWORK_COUNTERS}
+        for iface, nic in pernic.items()
     }
+    interval, rates = _network_rates.update(counters, epoch=int(_backend.boot_time()))
+
+    result = {}
+    for iface, values in rates.items():
+        result[iface] = {
+            "bytes_sent_per_s": values["bytes_sent"],
+            "bytes_recv_per_s": values["bytes_recv"],
+            "packets_sent_per_s": values["packets_sent"],
+            "packets_recv_per_s": values["packets_recv"],
+            "errors_per_s": values["errin"] + values["errout"],
+            "drops_per_s": values["dropin"] + values["dropout"],
+            "bytes_sent_per_s_formatted": format_bytes(values["bytes_sent"]) + "/s",
+            "bytes_recv_per_s_formatted": format_bytes(values["bytes_recv"]) + "/s",
+        }
+    return interval, result
 
 
 def get_network_info():
     """Get network information."""
-    net_io = psutil.net_io_counters()
+    # One read for both: the totals are the sums over the interfaces
+    pernic = _backend.net_io_counters(pernic=True)
+    net_io = {name: sum(getattr(nic, name) for nic in pernic.values())
+              for name in ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv")}
 
     interfaces = {}
     net_if_addrs = psutil.net_if_addrs()
@@ -135,115 +541,302 @@ def get_network_info():
                 interfaces[iface] = addr.address
                 break
 
+    interval, rates = get_network_rates(pernic)
+    sent_rate = sum(r["bytes_sent_per_s"] for r in rates.values()) if rates else None
+    recv_rate = sum(r["bytes_recv_per_s"] for r in rates.values()) if rates else None
+
     return {
-        "bytes_sent": net_io.bytes_sent,
-        "bytes_recv": net_io.bytes_recv,
-        "bytes_sent_formatted": format_bytes(net_io.bytes_sent),
-        "bytes_recv_formatted": format_bytes(net_io.bytes_recv),
-        "packets_sent": net_io.packets_sent,
-        "packets_recv": net_io.packets_recv,
+        "bytes_sent": net_io["bytes_sent"],
+        "bytes_recv": net_io["bytes_recv"],
+        "bytes_sent_formatted": format_bytes(net_io["bytes_sent"]),
+        "bytes_recv_formatted": format_bytes(net_io["bytes_recv"]),
+        "packets_sent": net_io["packets_sent"],
+        "packets_recv": net_io["packets_recv"],
         "interfaces": interfaces,
+        "rates_interval": round(interval, 2) if interval else None,
+        "bytes_sent_per_s": sent_rate,
+        "bytes_recv_per_s": recv_rate,
+        "bytes_sent_per_s_formatted": format_bytes(sent_rate) + "/s" if rates else "N/A",
+        "bytes_recv_per_s_formatted": format_bytes(recv_rate) + "/s" if rates else "N/A",
+        "rates": rates,
     }
 
 
-def get_processes_info():
-    """Get process information."""
-    processes = []
+class ProcessSampler:
+    """
+    Process table sampler keeping state between collections.
 
-    for proc in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent"]):
-        try:
-            pinfo = proc.info
-            processes.append({
-                "pid": pinfo["pid"],
-                "name": pinfo["name"],
-                "cpu_percent": pinfo["cpu_percent"] or 0,
-                "memory_percent": round(pinfo["memory_percent"] or 0, 2),
-            })
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+    Process objects (or /proc tick counters) are kept from one sample to
+    the next, so CPU usage is computed from real deltas instead of being 0
+    on a first cpu_percent() call. Only the top N entries become dicts.
+    Calls closer together than prime_interval reuse the previous table.
+
+    With a state_name, the first sample measures CPU usage against the
+    per-process CPU times saved by a previous run (if recent enough)
+    instead of sleeping prime_interval, as CpuSampler does; processes
+    started since then show 0%.
+    """
 
-    # Sort by CPU then by memory
-    processes.sort(key=lambda x: (x["cpu_percent"], x["memory_percent"]), reverse=True)
-    top_3_cpu = processes[:3]
+    def __init__(self, use_proc=False, prime_interval=0.1, state_name=None):
+        self.use_proc = use_proc and os.path.isdir("/proc/self")
+        self.prime_interval = prime_interval
+        # CPU times persisted between runs (counter_rates.set_state_dir)
+        self._saved = CounterRates(state_name) if state_name else None
+        self._cpu_times = None  # pid -> (start time, CPU seconds), first read only
+        self.processes = {}   # pid -> psutil.Process
+        self.ticks = {}       # pid -> (start time, cpu ticks) for the /proc reader
+        self.ticks_time = None
+        self._last_rows = None
+        self._last_time = 0.0
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
 
-    # Sort by memory
-    processes.sort(key=lambda x: x["memory_percent"], reverse=True)
-    top_3_memory = processes[:3]
+    def sample(self, top_n=3):
+        """
+        Read the process table.
 
-    return {
-        "total_count": len(processes),
-        "top_3_cpu": top_3_cpu,
-        "top_3_memory": top_3_memory,
-    }
+        Args:
+            top_n: Number of processes to keep in each ranking.
+
+        Returns:
+            Dictionary with total_count, top_3_cpu and top_3_memory (the
+            key names are kept for compatibility, lists hold top_n entries).
+        """
+        read = self._read_proc if self.use_proc else self._read_psutil
+        now = time.monotonic()
+        if self._last_rows is not None and now - self._last_time < self.prime_interval:
+            rows = self._last_rows
+        else:
+            first = self._last_rows is None
+            if first and self._saved is not None:
+                self._cpu_times = {}
+            rows = read()
+            saved_rows = self._saved_rows(rows) if first and self._saved is not None else None
+            if saved_rows is not None:
+                rows = saved_rows
+            elif first:
+                time.sleep(self.prime_interval)
+                rows = read()
+            self._last_rows = rows
+            self._last_time = time.monotonic()
+
+        top_cpu = heapq.nlargest(top_n, rows, key=lambda row: (row[0], row[1]))
+        top_memory = heapq.nlargest(top_n, rows, key=lambda row: row[1])
+
+        return {
+            "total_count": len(rows),
+            "top_n": top_n,
+            "top_3_cpu": [self._as_dict(row) for row in top_cpu],
+            "top_3_memory": [self._as_dict(row) for row in top_memory],
+        }
+
+    def _saved_rows(self, rows):
+        """
+        Rows with the CPU usage since the CPU times saved by a previous
+        run, saving this run's.
+
+        Returns:
+            List of rows, or None when there is no usable snapshot (none,
+            too old or from another boot).
+        """
+        cpu_times, self._cpu_times = self._cpu_times, None
+        keys = {pid: f"{pid}-{start}" for pid, (start, _seconds) in cpu_times.items()}
+        counters = {keys[pid]: {"cpu": seconds} for pid, (_start, seconds) in cpu_times.items()}
+        interval, rates = self._saved.update(counters, epoch=int(_backend.boot_time()))
+        if not interval or interval > CPU_BASELINE_MAX_AGE:
+            return None
+
+        saved_rows = []
+        for _cpu_percent, memory_percent, pid, name in rows:
+            rate = rates.get(keys.get(pid))
+            saved_rows.append((rate["cpu"] * 100 if rate else 0.0, memory_percent, pid, name))
+        return saved_rows
 
+    @staticmethod
+    def _as_dict(row):
+        cpu_percent, memory_percent, pid, name = row
+        return {
+            "pid": pid,
+            "name": name,
+            "cpu_percent": round(cpu_percent, 1),
+            "memory_percent": round(memory_percent, 2),
+        }
 
-def get_files_info(files_directory="/home", recursive=True):
+    def _read_psutil(self):
+        """Sample with psutil, reusing Process objects across calls."""
+        rows = []
+        alive = {}
+        for pid in psutil.pids():
+            proc = self.processes.get(pid)
+            try:
+                if proc is None:
+                    proc = psutil.Process(pid)
+                with proc.oneshot():
+                    rows.append((
+                        proc.cpu_percent(None),
+                        proc.memory_percent(),
+                        pid,
+                        proc.name(),
+                    ))
+                    if self._cpu_times is not None:
+                        times = proc.cpu_times()
+                        self._cpu_times[pid] = (proc.create_time(), times.user + times.system)
+                alive[pid] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        self.processes = alive
+        return rows
+
+    def _read_proc(self):
+        """Sample by reading /proc/[pid]/stat directly (Linux)."""
+        now = time.monotonic()
+        elapsed = (now - self.ticks_time) if self.ticks_time else None
+        total_memory = _backend.virtual_memory().total
+        rows = []
+        ticks = {}
+
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/stat", "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+
+            # comm is in parentheses and may contain spaces
+            end = data.rfind(b")")
+            name = data[data.find(b"(") + 1:end].decode("utf-8", "replace")
+            fields = data[end + 2:].split()
+            pid = int(entry.name)
+            cpu_ticks = int(fields[11]) + int(fields[12])
+            start_time = fields[19]
+            rss = int(fields[21]) * self._page_size
+
+            previous = self.ticks.get(pid)
+            if previous and previous[0] == start_time and elapsed:
+                cpu_percent = (cpu_ticks - previous[1]) / self._clock_ticks / elapsed * 100
+            else:
+                cpu_percent = 0.0
+            ticks[pid] = (start_time, cpu_ticks)
+            if self._cpu_times is not None:
+                self._cpu_times[pid] = (start_time.decode(), cpu_ticks / self._clock_ticks)
+            rows.append((cpu_percent, rss / total_memory * 100, pid, name))
+
+        self.ticks = ticks
+        self.ticks_time = now
+        return rows
+
+
+# Shared samplers: keep their baselines between collections
+_process_samplers = {}
+
+
+def get_processes_info(top_n=3, use_proc=False, sampler=None):
+    """
+    Get process information.
+
+    Args:
+        top_n: Number of processes in the CPU and memory rankings.
+        use_proc: Read /proc/[pid]/stat directly instead of psutil.
+        sampler: ProcessSampler to use (default: shared module sampler).
+    """
+    if sampler is None:
+        sampler = _process_samplers.get(use_proc)
+        if sampler is None:
+            sampler = _process_samplers[use_proc] = ProcessSampler(
+                use_proc=use_proc, state_name="processes_proc" if use_proc else "processes")
+    return sampler.sample(top_n)
+
+
+def get_files_info(files_directory="/home", recursive=True, symlinks="files",
+                   max_depth=None, exclude=None, one_filesystem=False, top_n=5,
+                   workers=1, scan_mode="thread", index_path=None, rebuild_index=False,
+                   watcher=None):
     """
     Analyze files in the specified directory.
 
     Args:
         files_directory: Directory to analyze for files.
         recursive: If True, recursively analyze subdirectories.
+        symlinks: Symbolic link policy ("none", "files" or "all").
+        max_depth: Maximum directory depth (None = unlimited).
+        exclude: Glob patterns of files/directories to skip.
+        one_filesystem: Do not cross filesystem boundaries.
+        top_n: Number of largest files to report.
+        workers: Number of parallel scan workers (1 = sequential).
+        scan_mode: Parallel scan pool, "thread" or "process".
+        index_path: SQLite scan index for incremental rescans (None = full scan).
+        rebuild_index: Discard the scan index and rescan everything.
+        watcher: Started FileWatcher providing live statistics (other
+            scan options are then taken from the watcher).
     """
-    extensions = {
-        ".txt": {"count": 0, "size": 0},
-        ".py": {"count": 0, "size": 0},
-        ".pdf": {"count": 0, "size": 0},
-        ".jpg": {"count": 0, "size": 0},
-        ".jpeg": {"count": 0, "size": 0},
-        ".png": {"count": 0, "size": 0},
-        ".md": {"count": 0, "size": 0},
-        ".html": {"count": 0, "size": 0},
-        ".css": {"count": 0, "size": 0},
-        ".json": {"count": 0, "size": 0},
-        ".other": {"count": 0, "size": 0},
-    }
+    if watcher is not None:
+        return build_files_info(files_directory, watcher.stats())
 
-    total_files = 0
-    largest_files = []
+    if not recursive:
+        max_depth = 0
 
-    try:
-        path = Path(files_directory)
-        pattern = "**/*" if recursive else "*"
+    if index_path:
+        from .scan_index import scan_tree_incremental
 
-        for file_path in path.glob(pattern):
-            if file_path.is_file():
-                try:
-                    size = file_path.stat().st_size
-                    ext = file_path.suffix.lower()
-
-                    if ext in extensions:
-                        extensions[ext]["count"] += 1
-                        extensions[ext]["size"] += size
-                    else:
-                        extensions[".other"]["count"] += 1
-                        extensions[".other"]["size"] += size
-
-                    total_files += 1
-                    largest_files.append({
-                        "path": str(file_path),
-                        "name": file_path.name,
-                        "size": size,
-                        "size_formatted": format_bytes(size),
-                    })
-                except (PermissionError, OSError):
-                    continue
-    except (PermissionError, OSError):
-        pass
+        stats = scan_tree_incremental(
+            files_directory,
+            index_path,
+            rebuild=rebuild_index,
+            symlinks=symlinks,
+            max_depth=max_depth,
+            exclude=tuple(exclude or ()),
+            one_filesystem=one_filesystem,
+            top_n=top_n,
+        )
+        return build_files_info(files_directory, stats)
 
-    # Top 5 largest files
-    largest_files.sort(key=lambda x: x["size"], reverse=True)
-    top_5_largest = largest_files[:5]
+    from .file_scanner import scan_tree_parallel
+
+    stats = scan_tree_parallel(
+        files_directory,
+        workers=workers,
+        mode=scan_mode,
+        symlinks=symlinks,
+        max_depth=max_depth,
+        exclude=tuple(exclude or ()),
+        one_filesystem=one_filesystem,
+        top_n=top_n,
+    )
+    return build_files_info(files_directory, stats)
+
+
+def build_files_info(files_directory, stats):
+    """
+    Convert ScanStats into the files section of the collected data.
+
+    Args:
+        files_directory: Directory that was analyzed.
+        stats: ScanStats with the aggregated results.
+    """
+    total_files = stats.total_files
+
+    # Top largest files
+    top_5_largest = [
+        {
+            "path": path,
+            "name": os.path.basename(path),
+            "size": size,
+            "size_formatted": format_bytes(size),
+        }
+        for size, path in stats.top_files()
+    ]
 
     # Calculate percentages
     file_stats = {}
-    for ext, data in extensions.items():
-        if data["count"] > 0:
-            percentage = (data["count"] / total_files * 100) if total_files > 0 else 0
+    for ext, (count, size) in stats.extensions.items():
+        if count > 0:
+            percentage = (count / total_files * 100) if total_files > 0 else 0
             file_stats[ext] = {
-                "count": data["count"],
-                "size": data["size"],
-                "size_formatted": format_bytes(data["size"]),
+                "count": count,
+                "size": size,
+                "size_formatted": format_bytes(size),
                 "percentage": round(percentage, 1),
             }
 
@@ -255,23 +848,204 @@ def get_files_info(files_directory="/home", recursive=True):
     }
 
 
-def collect_all(files_directory="/home"):
+# Item count reported by the timings of each collector
+COLLECTOR_ITEMS = {
+    "cpu": lambda data: len(data.get("cpu_percent_per_core", [])),
+    "disk": lambda data: len(data.get("mounts", [])),
+    "network": lambda data: len(data.get("interfaces", {})),
+    "processes": lambda data: data.get("total_count"),
+    "files": lambda data: data.get("total_files"),
+}
+
+# Per-collector timeouts (seconds) for parallel collection
+COLLECTOR_TIMEOUTS = {
+    "system": 5,
+    "cpu": 5,
+    "memory": 5,
+    "disk": 10,
+    "network": 5,
+    "processes": 15,
+    "files": 60,
+}
+
+
+def get_collectors(files_directory="/home", files_options=None, processes_options=None,
+                   sections=None):
     """
-    Collect all system data.
+    Build the table of independent collectors.
 
     Args:
         files_directory: Directory to analyze for files.
+        files_options: Extra keyword arguments for get_files_info.
+        processes_options: Extra keyword arguments for get_processes_info.
+        sections: Names of the sections to collect (None = all SECTIONS).
+
+    Returns:
+        Dictionary section name -> callable returning the section data.
     """
-    return {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "system": get_system_info(),
-        "cpu": get_cpu_info(),
-        "memory": get_memory_info(),
-        "disk": get_disk_info(),
-        "network": get_network_info(),
-        "processes": get_processes_info(),
-        "files": get_files_info(files_directory),
+    collectors = {
+        "system": get_system_info,
+        "cpu": get_cpu_info,
+        "memory": get_memory_info,
+        "disk": get_disk_info,
+        "network": get_network_info,
+        "processes": lambda: get_processes_info(**(processes_options or {})),
+        "files": lambda: get_files_info(files_directory, **(files_options or {})),
     }
+    if sections is None:
+        return collectors
+    return {name: func for name, func in collectors.items() if name in sections}
+
+
+# Worker threads shared by all parallel collections (a hung collector
+# holds one until it returns)
+COLLECTOR_WORKERS = 16
+
+# Created on first use (see get_collector_pool)
+_collector_pool = None
+_collector_pool_lock = threading.Lock()
+
+# Section name -> future of a collection that has not returned yet
+_running_collectors = {}
+
+
+class CollectorPool:
+    """
+    Bounded pool of daemon worker threads for the collectors.
+
+    Unlike ThreadPoolExecutor workers, which the interpreter joins at
+    exit, daemon workers stuck in a hung call (statvfs on a dead NFS
+    server...) do not keep the process alive. Workers are started on
+    demand, up to max_workers, and reused across collections.
+    """
+
+    def __init__(self, max_workers=COLLECTOR_WORKERS):
+        import queue
+
+        self.max_workers = max_workers
+        self.tasks = queue.SimpleQueue()
+        self.idle = threading.Semaphore(0)
+        self.lock = threading.Lock()
+        self.workers = 0
+
+    def submit(self, func):
+        """
+        Queue func() and return a concurrent.futures.Future of its result.
+
+        Queued calls wait for a free worker when all max_workers are busy.
+        """
+        from concurrent.futures import Future
+
+        future = Future()
+        self.tasks.put((future, func))
+        if not self.idle.acquire(blocking=False):
+            with self.lock:
+                if self.workers < self.max_workers:
+                    self.workers += 1
+                    threading.Thread(target=self._work, name=f"collector-{self.workers}",
+                                     daemon=True).start()
+        return future
+
+    def _work(self):
+        while True:
+            future, func = self.tasks.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func()
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            del future, func
+            self.idle.release()
+
+
+def get_collector_pool():
+    """Pool shared by parallel collections and collector caches."""
+    global _collector_pool
+    with _collector_pool_lock:
+        if _collector_pool is None:
+            _collector_pool = CollectorPool()
+        return _collector_pool
+
+
+def collect_parallel(collectors, timeouts=None):
+    """
+    Run collectors concurrently on the shared collector pool.
+
+    A collector that fails or exceeds its timeout yields
+    {"error": "..."} instead of blocking the other sections. A collector
+    whose previous call has still not returned is not called again (its
+    section reports an error) so hung calls do not pile up.
+
+    Args:
+        collectors: Dictionary section name -> callable.
+        timeouts: Dictionary section name -> timeout in seconds.
+
+    Returns:
+        Dictionary section name -> collected data or error marker.
+    """
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    timeouts = timeouts or COLLECTOR_TIMEOUTS
+    pool = get_collector_pool()
+    start = time.monotonic()
+
+    futures = {}
+    results = {}
+    with _collector_pool_lock:
+        for name, func in collectors.items():
+            previous = _running_collectors.get(name)
+            if previous is not None and not previous.done():
+                results[name] = {"error": "previous collection still running"}
+                continue
+            futures[name] = _running_collectors[name] = pool.submit(func)
+
+    for name, future in futures.items():
+        timeout = timeouts.get(name, 30)
+        remaining = max(start + timeout - time.monotonic(), 0)
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            # Still queued: dropped; already running: left to finish
+            future.cancel()
+            results[name] = {"error": f"timeout after {timeout}s"}
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    # Collector order, as with sequential collection
+    return {name: results[name] for name in collectors}
+
+
+def collect_all(files_directory="/home", parallel=False, timeouts=None, files_options=None,
+                processes_options=None, timings=None, sections=None):
+    """
+    Collect all system data.
+
+    Args:
+        files_directory: Directory to analyze for files.
+        parallel: If True, run collectors concurrently with timeouts.
+        timeouts: Per-collector timeouts for parallel mode.
+        files_options: Extra keyword arguments for get_files_info.
+        processes_options: Extra keyword arguments for get_processes_info.
+        timings: StageTimings recording each collector as "collect.<name>".
+        sections: Names of the sections to collect (None = all); the
+            others are absent from the result.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    collectors = get_collectors(files_directory, files_options, processes_options, sections)
+    if timings is not None:
+        collectors = {
+            name: timings.wrap(f"collect.{name}", func, COLLECTOR_ITEMS.get(name))
+            for name, func in collectors.items()
+        }
+
+    if parallel:
+        results = collect_parallel(collectors, timeouts)
+    else:
+        results = {name: func() for name, func in collectors.items()}
+
+    return {"timestamp": timestamp, **results}
 
 
 if __name__ == "__main__":
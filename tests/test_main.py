@@ -3,9 +3,58 @@
 Triple A Project - Basic tests
 """
 
-from src.data.system_collector import collect_all, format_bytes
-from src.core.data_processor import get_color_class, get_template_variables
-from src.api.html_generator import load_template
+import asyncio
+import json
+import math
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from array import array
+from pathlib import Path
+from types import SimpleNamespace
+
+import psutil
+
+from src.data import counter_rates, proc_backend, system_collector
+from src.data.collector_cache import CollectorCache
+from src.data.fleet_collector import FleetCollector
+from src.data.counter_rates import CounterRates
+from src.data.file_watcher import FileWatcher
+from src.data.history_store import HistoryStore
+from src.data.proc_backend import ProcBackend
+from src.data.snapshot_export import SnapshotExporter, encode_cell, parse_cell, read_snapshots
+from src.data.snapshot_model import Snapshot, deep_size
+from src.data.system_collector import (
+    CpuSampler,
+    ProcessSampler,
+    collect_all,
+    collect_parallel,
+    format_bytes,
+    get_files_info,
+)
+from src.core.data_processor import get_color_class, get_template_variables, process_all, process_disk
+from src.core.alert_engine import AlertEngine, parse_rule
+from src.core.instrumentation import StageTimings
+from src.api.html_generator import (
+    compile_template,
+    generate_file,
+    load_compiled_template,
+    load_template,
+    render,
+    write_atomic,
+)
+from src.api.agent import create_agent_server
+from src.api.alert_sinks import AlertDispatcher
+from src.api.fleet_generator import generate_fleet
+from src.api.metrics_exporter import format_metrics
+from src.api.server import create_server
+from src.core.scheduler import run_periodic
 
 
 # --- Collector tests ---
@@ -25,6 +74,364 @@ def test_format_bytes():
     assert format_bytes(1048576) == "1.00 MB"
 
 
+def test_cpu_sampler_non_blocking():
+    """Only the first CPU sample waits, later ones use the deltas."""
+    sampler = CpuSampler(prime_interval=0.05)
+    overall, per_core = sampler.sample()
+
+    assert len(per_core) == psutil.cpu_count(logical=True)
+    assert 0 <= overall <= 100
+
+    time.sleep(0.06)
+    start = time.perf_counter()
+    overall, per_core = sampler.sample()
+    assert time.perf_counter() - start < 0.05
+    assert all(0 <= value <= 100 for value in per_core)
+
+
+def test_collect_parallel_partial_results():
+    """A slow or failing collector yields an error marker only."""
+    def fail():
+        raise OSError("boom")
+
+    start = time.perf_counter()
+    results = collect_parallel(
+        {"fast": lambda: {"ok": True}, "slow": lambda: time.sleep(2), "bad": fail},
+        timeouts={"fast": 1, "slow": 0.2, "bad": 1},
+    )
+
+    assert time.perf_counter() - start < 1
+    assert results["fast"] == {"ok": True}
+    assert "timeout" in results["slow"]["error"]
+    assert "boom" in results["bad"]["error"]
+
+    # The hung collector is not called again, and cannot block interpreter exit
+    calls = []
+    results = collect_parallel({"slow": lambda: calls.append(1), "fast": lambda: 2},
+                               timeouts={"slow": 1, "fast": 1})
+    assert results == {"slow": {"error": "previous collection still running"}, "fast": 2}
+    assert calls == []
+    workers = [t for t in threading.enumerate() if t.name.startswith("collector-")]
+    assert workers and all(t.daemon for t in workers)
+
+
+def test_process_sampler_top_n():
+    """Both process readers measure CPU from deltas and keep only top N."""
+    for use_proc in (False, True):
+        sampler = ProcessSampler(use_proc=use_proc, prime_interval=0.05)
+        info = sampler.sample(top_n=2)
+
+        assert info["total_count"] > 0
+        assert len(info["top_3_cpu"]) == min(2, info["total_count"])
+        memory = [proc["memory_percent"] for proc in info["top_3_memory"]]
+        assert memory == sorted(memory, reverse=True)
+        assert any(proc["pid"] == os.getpid() for proc in sampler.sample(top_n=1000)["top_3_cpu"])
+
+
+def test_process_sampler_uses_saved_cpu_times(tmp_path):
+    """A later run measures process CPU against the saved times, without priming."""
+    counter_rates.set_state_dir(str(tmp_path))
+    try:
+        for use_proc in (False, True):
+            name = f"processes_{use_proc}"
+            ProcessSampler(use_proc=use_proc, prime_interval=0.05, state_name=name).sample()
+            deadline = time.process_time() + 0.3
+            while time.process_time() < deadline:
+                pass
+
+            # The prime sleep would take 30 s
+            start = time.monotonic()
+            info = ProcessSampler(use_proc=use_proc, prime_interval=30, state_name=name).sample(
+                top_n=1000)
+            assert time.monotonic() - start < 10
+            own = next(proc for proc in info["top_3_cpu"] if proc["pid"] == os.getpid())
+            assert own["cpu_percent"] > 0
+    finally:
+        counter_rates.set_state_dir(None)
+
+
+def make_tree(root):
+    """Create a small directory tree for the file scanner tests."""
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "skip").mkdir()
+    (root / "top.py").write_bytes(b"x" * 10)
+    (root / "a" / "doc.md").write_bytes(b"x" * 300)
+    (root / "a" / "b" / "big.bin").write_bytes(b"x" * 5000)
+    (root / "skip" / "huge.txt").write_bytes(b"x" * 9000)
+    for i in range(8):
+        (root / "a" / f"note{i}.txt").write_bytes(b"x" * (i + 1))
+
+
+def test_files_info_scan(tmp_path):
+    """The scanner counts files and keeps only the top N largest."""
+    make_tree(tmp_path)
+    info = get_files_info(str(tmp_path))
+
+    assert info["total_files"] == 12
+    assert info["by_extension"][".txt"]["count"] == 9
+    assert info["by_extension"][".other"]["size"] == 5000
+    assert [f["size"] for f in info["top_5_largest"]] == [9000, 5000, 300, 10, 8]
+
+
+def test_files_info_options(tmp_path):
+    """Exclude globs and maximum depth limit the scan."""
+    make_tree(tmp_path)
+
+    info = get_files_info(str(tmp_path), exclude=["skip"], max_depth=1)
+    assert info["total_files"] == 10
+    assert info["top_5_largest"][0]["name"] == "doc.md"
+
+    info = get_files_info(str(tmp_path), recursive=False)
+    assert info["total_files"] == 1
+
+
+def test_files_info_parallel_matches_sequential(tmp_path):
+    """Parallel scans merge to the same result as a sequential scan."""
+    make_tree(tmp_path)
+    expected = get_files_info(str(tmp_path))
+
+    assert get_files_info(str(tmp_path), workers=3) == expected
+    assert get_files_info(str(tmp_path), workers=2, scan_mode="process") == expected
+
+
+def test_files_info_incremental_index(tmp_path):
+    """The scan index reuses unchanged directories until a rebuild."""
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    make_tree(tree)
+    index_path = str(tmp_path / "index.db")
+    expected = get_files_info(str(tree))
+
+    for directory in (tree, tree / "a", tree / "a" / "b", tree / "skip"):
+        os.utime(directory, ns=(0, 0))
+    assert get_files_info(str(tree), index_path=index_path) == expected
+
+    # New file hidden by restoring the directory mtime: index is reused
+    (tree / "a" / "b" / "new.py").write_bytes(b"x" * 20000)
+    os.utime(tree / "a" / "b", ns=(0, 0))
+    assert get_files_info(str(tree), index_path=index_path) == expected
+
+    rebuilt = get_files_info(str(tree), index_path=index_path, rebuild_index=True)
+    assert rebuilt["total_files"] == 13
+    assert rebuilt["top_5_largest"][0]["name"] == "new.py"
+
+    # Removed directory: its subtree disappears from the index
+    (tree / "skip" / "huge.txt").unlink()
+    (tree / "skip").rmdir()
+    assert get_files_info(str(tree), index_path=index_path)["total_files"] == 12
+
+
+def test_file_watcher_tracks_changes(tmp_path):
+    """The inotify watcher matches a fresh scan after changes."""
+    make_tree(tmp_path)
+    with FileWatcher(str(tmp_path)) as watcher:
+        assert get_files_info(str(tmp_path), watcher=watcher) == get_files_info(str(tmp_path))
+
+        (tmp_path / "a" / "b" / "new.py").write_bytes(b"x" * 20000)
+        (tmp_path / "skip" / "huge.txt").unlink()
+        (tmp_path / "a").rename(tmp_path / "moved")
+        (tmp_path / "c" / "d").mkdir(parents=True)
+        (tmp_path / "c" / "d" / "late.json").write_bytes(b"x" * 7)
+
+        info = get_files_info(str(tmp_path), watcher=watcher)
+        assert info == get_files_info(str(tmp_path))
+        assert info["top_5_largest"][0]["path"] == str(tmp_path / "moved" / "b" / "new.py")
+
+
+def test_history_store_rollups(tmp_path):
+    """Samples are stored raw and rolled up into 1-minute buckets."""
+    base = (time.time() // 3600) * 3600 - 3600
+    with HistoryStore(str(tmp_path / "history.db"), batch_size=50) as history:
+        for i in range(0, 600, 10):
+            data = {
+                "cpu": {"cpu_percent": i % 60, "cpu_percent_per_core": [10.0, 30.0]},
+                "network": {"bytes_sent": i},
+            }
+            history.record(data, timestamp=base + i)
+
+        raw = history.query(base, base + 600, tier="raw")
+        minutes = history.query(base, base + 600, tier="1m", with_cores=True)
+
+    assert len(raw["ts"]) == 60
+    assert len(minutes["ts"]) == 9
+    assert list(minutes["cpu"]) == [25.0] * 9
+    assert minutes["net_sent"][0] == 50
+    assert list(minutes["cores"][0]) == [10.0, 30.0]
+    # Sections not collected are NULL, not 0
+    assert all(math.isnan(value) for value in raw["memory"])
+
+
+def test_history_store_skips_missing_sections(tmp_path):
+    """Failed or excluded sections do not pull the rollup averages down."""
+    base = (time.time() // 3600) * 3600 - 3600
+    samples = [
+        {"cpu": {"cpu_percent": 40.0, "cpu_percent_per_core": [40.0]}, "memory": {"percent": 50.0}},
+        {"cpu": {"error": "timeout after 5s"}, "memory": {"percent": 70.0}},
+        {"memory": {"percent": 60.0}},
+        {"cpu": {"cpu_percent": 60.0, "cpu_percent_per_core": [60.0]}, "memory": {"percent": 80.0}},
+    ]
+    with HistoryStore(str(tmp_path / "history.db")) as history:
+        for i, data in enumerate(samples):
+            history.record(data, timestamp=base + i * 10)
+        history.record({"memory": {"percent": 0.0}}, timestamp=base + 60)
+
+        raw = history.query(base, base + 60, tier="raw")
+        minutes = history.query(base, base + 60, tier="1m", with_cores=True)
+
+    assert math.isnan(raw["cpu"][1]) and math.isnan(raw["cpu"][2])
+    assert list(minutes["cpu"]) == [50.0]
+    assert list(minutes["memory"]) == [65.0]
+    assert math.isnan(minutes["disk"][0])
+    assert list(minutes["cores"][0]) == [50.0]
+
+
+def test_counter_rates_persisted(tmp_path):
+    """Rates use the snapshot of the previous run; resets give no rate."""
+    now = [1000.0]
+    counter_rates.set_state_dir(str(tmp_path))
+    try:
+        first = CounterRates("net", clock=lambda: now[0])
+        assert first.update({"eth0": {"bytes": 2 ** 32 - 100}}, epoch=1) == (None, {})
+
+        # New process: the snapshot comes from the state file
+        now[0] = 1010.0
+        second = CounterRates("net", clock=lambda: now[0])
+        interval, rates = second.update({"eth0": {"bytes": 2 ** 32 + 900}, "wlan0": {"bytes": 5}},
+                                        epoch=1)
+        assert interval == 10.0
+        assert rates == {"eth0": {"bytes": 100.0}}
+
+        # Counter reset (interface re-created): no rate for this interval only
+        now[0] = 1020.0
+        assert second.update({"eth0": {"bytes": 900}, "wlan0": {"bytes": 55}}, epoch=1) == (
+            10.0, {"wlan0": {"bytes": 5.0}})
+        now[0] = 1030.0
+        assert second.update({"eth0": {"bytes": 1900}}, epoch=1)[1] == {"eth0": {"bytes": 100.0}}
+
+        # Counters from another boot are not compared
+        now[0] = 1040.0
+        assert second.update({"eth0": {"bytes": 10}}, epoch=2) == (None, {})
+    finally:
+        counter_rates.set_state_dir(None)
+
+
+def test_counter_delta_wrap_and_reset():
+    """A decrease is a wrap only for counters known to be 32-bit."""
+    assert counter_rates.counter_delta(100, 250) == 150
+    assert counter_rates.counter_delta(2 ** 32 - 100, 900) is None
+    assert counter_rates.counter_delta(2 ** 32 - 100, 900, bits=32) == 1000
+    assert counter_rates.counter_delta(2 ** 40, 900, bits=32) is None
+
+
+def test_disk_info_mounts_and_io_rates(monkeypatch):
+    """Real mounts are listed, a hung mount times out and I/O rates are computed."""
+    hang = threading.Event()
+
+    def disk_usage(path):
+        if path == "/mnt/nfs":
+            hang.wait(5)
+        return SimpleNamespace(total=100, used=90, free=10, percent=90.0)
+
+    partitions = [("/dev/sda1", "/", "ext4"), ("/dev/sda1", "/srv/bind", "ext4"),
+                  ("tmpfs", "/run", "tmpfs"), ("server:/x", "/mnt/nfs", "nfs4"),
+                  ("/dev/sdb1", "/var", "xfs")]
+    # Like psutil, all=False leaves out the mounts without a device (NFS...)
+    monkeypatch.setattr(psutil, "disk_partitions", lambda all=False: [
+        SimpleNamespace(device=device, mountpoint=mountpoint, fstype=fstype)
+        for device, mountpoint, fstype in partitions if all or device.startswith("/dev/")])
+    monkeypatch.setattr(psutil, "disk_usage", disk_usage)
+
+    now = [1000.0]
+    monkeypatch.setattr(system_collector, "_disk_io_rates", CounterRates("disk_io", clock=lambda: now[0]))
+    counters = {"read_count": 100, "write_count": 50, "read_bytes": 4096, "write_bytes": 0,
+                "read_time": 30, "write_time": 0, "busy_time": 10}
+    monkeypatch.setattr(psutil, "disk_io_counters", lambda perdisk=False: {
+        "sda": SimpleNamespace(**counters), "loop0": SimpleNamespace(**counters)})
+
+    try:
+        start = time.monotonic()
+        first = system_collector.get_disk_info(usage_timeout=0.2)
+        assert time.monotonic() - start < 2
+        assert [m["mountpoint"] for m in first["mounts"]] == ["/", "/mnt/nfs", "/var"]
+        assert first["mounts"][1]["error"] == "timeout after 0.2s"
+        assert first["percent"] == 90.0 and first["io_rates"] == {}
+
+        now[0] += 10
+        counters.update(read_count=200, read_time=130, busy_time=510)
+        second = system_collector.get_disk_info(usage_timeout=0.2)
+        assert second["mounts"][1]["error"] == "not responding"
+        assert list(second["io_rates"]) == ["sda"]
+        rates = second["io_rates"]["sda"]
+        assert rates["read_iops"] == 10.0 and rates["await_ms"] == 1.0 and rates["util_percent"] == 5.0
+
+        rows = process_disk({"disk": second})
+        assert rows["mounts"][1]["usage"] == "not responding"
+        assert rows["io"][0]["name"] == "sda"
+
+        # A hung root filesystem only fails its own row
+        partitions[0] = ("server:/root", "/", "nfs4")
+        partitions[3] = ("server:/x", "/mnt/nfs2", "nfs4")
+        monkeypatch.setattr(system_collector, "_usage_threads", {})
+        monkeypatch.setattr(psutil, "disk_usage", lambda path: disk_usage("/mnt/nfs" if path == "/" else path))
+        third = system_collector.get_disk_info(usage_timeout=0.2)
+        assert third["mounts"][0] == {"mountpoint": "/", "device": "server:/root", "fstype": "nfs4",
+                                      "error": "timeout after 0.2s"}
+        assert "percent" not in third and third["mounts"][-1]["percent"] == 90.0
+        assert process_disk({"disk": third})["total"] == "N/A"
+    finally:
+        hang.set()
+
+
+def test_proc_backend_parses_proc_files(tmp_path):
+    """The /proc backend parses re-read files like psutil and falls back to it."""
+    (tmp_path / "net").mkdir()
+    (tmp_path / "stat").write_text(
+        "cpu  400 0 200 1400 0 0 0 0 0 0\n"
+        "cpu0 100 0 100 800 0 0 0 0 0 0\ncpu1 300 0 100 600 0 0 0 0 0 0\n"
+        "intr 1 2 3\nbtime 1700000000\n")
+    (tmp_path / "meminfo").write_text(
+        "MemTotal:       1000 kB\nMemFree:         200 kB\nMemAvailable:    400 kB\n"
+        "SwapTotal:       100 kB\nSwapFree:         25 kB\n")
+    (tmp_path / "loadavg").write_text("0.50 0.25 0.10 1/100 4242\n")
+    (tmp_path / "net" / "dev").write_text(
+        "Inter-|   Receive\n face |bytes packets errs drop fifo frame compressed multicast|...\n"
+        "  eth0: 1000 10 1 2 0 0 0 0 500 5 3 4 0 0 0 0\n")
+
+    backend = ProcBackend(procfs=str(tmp_path))
+    try:
+        cores = backend.cpu_times(percpu=True)
+        assert cores[1]._fields == psutil.cpu_times()._fields and cores[1].user == 300 / proc_backend.CLOCK_TICKS
+        assert len(cores) == 2 and backend.boot_time() == 1700000000.0
+        memory = backend.virtual_memory()
+        assert (memory.total, memory.available, memory.used, memory.percent) == (1024000, 409600, 614400, 60.0)
+        assert backend.swap_memory().percent == 75.0
+        assert backend.getloadavg() == (0.5, 0.25, 0.1)
+        eth0 = backend.net_io_counters(pernic=True)["eth0"]
+        assert (eth0.bytes_recv, eth0.bytes_sent, eth0.errin, eth0.dropout) == (1000, 500, 1, 4)
+
+        # Same descriptor, fresh content
+        (tmp_path / "loadavg").write_text("2.00 1.00 0.50 1/100 4242\n")
+        assert backend.getloadavg() == (2.0, 1.0, 0.5)
+
+        # diskstats is missing: psutil answers with the same schema
+        assert set(backend.disk_io_counters(perdisk=True)) == set(psutil.disk_io_counters(perdisk=True))
+    finally:
+        backend.close()
+
+
+def test_proc_backend_keeps_collector_schema():
+    """Collectors return the same keys whichever backend reads the counters."""
+    collectors = (system_collector.get_memory_info, system_collector.get_cpu_info,
+                  system_collector.get_network_info)
+    expected = [set(collect()) for collect in collectors]
+    assert system_collector.set_backend("proc") == "proc"
+    try:
+        assert [set(collect()) for collect in collectors] == expected
+        assert system_collector.get_memory_info()["total"] == psutil.virtual_memory().total
+    finally:
+        system_collector.set_backend("psutil")
+
+
 # --- Processor tests ---
 
 def test_colors():
@@ -39,6 +446,47 @@ def test_colors():
     assert get_color_class(90) == "gauge-red"
 
 
+def test_alert_engine_hysteresis_and_growth():
+    """Rules fire once after N samples, clear below the hysteresis, and track growth."""
+    engine = AlertEngine([parse_rule("memory > 90 for 3"),
+                          parse_rule("fill: disk_used growth > 1GB/hour window 2")])
+    gib = 1024 ** 3
+    states = []
+    for t, memory in enumerate([95, 95, 95, 96, 88, 86, 85, 84, 84, 95]):
+        sample = {"memory": {"percent": memory}, "disk": {"used": 10 * gib + t * gib // 1800}}
+        states.append([(e["rule"], e["state"]) for e in engine.evaluate(sample, now=t)])
+
+    assert states[2] == [("memory > 90 for 3", "firing")]
+    # 88 and 86 stay above the clearing threshold (85.5): still firing
+    assert states[3] == states[4] == states[5] == []
+    assert states[8] == [("memory > 90 for 3", "resolved")]
+    assert ("fill", "firing") in states[1]
+    assert all(("fill", "firing") not in s for s in states[2:])
+    assert engine.active() == ["fill"]
+
+
+def test_alert_dispatcher_never_blocks():
+    """A slow sink does not delay submit() and overflow is dropped."""
+    release = threading.Event()
+    received = []
+
+    class SlowSink:
+        def send(self, event):
+            release.wait(5)
+            received.append(event["rule"])
+
+    dispatcher = AlertDispatcher([SlowSink()], queue_size=2)
+    start = time.monotonic()
+    queued = dispatcher.submit([{"rule": str(i), "message": str(i)} for i in range(5)])
+    assert time.monotonic() - start < 0.5
+    assert queued + dispatcher.dropped == 5 and dispatcher.dropped >= 2
+
+    release.set()
+    dispatcher.close()
+    # Which events found room depends on when the worker took the first one
+    assert len(received) == queued and received == sorted(received, key=int)
+
+
 # --- HTML generator tests ---
 
 def test_generator_missing_file():
@@ -48,6 +496,574 @@ def test_generator_missing_file():
     assert content == ""
 
 
+def test_compiled_template_render():
+    """The compiled template fills slots with a single pass."""
+    template = compile_template("<p>{{ a }}-{{b}}-{{ a }}</p>")
+
+    assert template.render({"a": 1, "b": "x"}) == "<p>1-x-1</p>"
+    assert template.missing({"a": 1}) == ["b"]
+    assert render("{{a}}", {"a": "\\1"}) == "\\1"
+
+
+def test_compiled_template_cache(tmp_path):
+    """Compiled templates are reused until the file changes."""
+    path = tmp_path / "page.html"
+    path.write_text("{{x}}", encoding="utf-8")
+
+    first = load_compiled_template(path)
+    assert load_compiled_template(path) is first
+
+    path.write_text("<b>{{x}}</b>", encoding="utf-8")
+    os.utime(path, ns=(0, 0))
+    second = load_compiled_template(path)
+    assert second is not first
+    assert second.render({"x": 2}) == "<b>2</b>"
+
+
+def test_compiled_template_reports_missing_once(tmp_path, capsys):
+    """Missing variables are reported at compile time, then only when they change."""
+    path = tmp_path / "page.html"
+    path.write_text("{{x}} {{y}}", encoding="utf-8")
+
+    template = load_compiled_template(path, {"x": 1})
+    assert "Template variables without value: ['y']" in capsys.readouterr().out
+    template.render({"x": 1})
+    assert capsys.readouterr().out == ""
+    template.render({"y": 1})
+    assert "Unsubstituted variables: ['{{x}}']" in capsys.readouterr().out
+
+
+def test_write_atomic(tmp_path):
+    """Atomic writes replace the file and leave no temporary file."""
+    output = tmp_path / "out" / "index.html"
+    write_atomic(output, "first")
+    write_atomic(output, "second")
+
+    assert output.read_text(encoding="utf-8") == "second"
+    assert os.listdir(output.parent) == ["index.html"]
+
+
+def test_fragments_escaped_and_streamed(tmp_path):
+    """Values from the machine are escaped and pages are written in chunks."""
+    data = collect_all(files_directory=str(tmp_path))
+    data["processes"]["top_3_cpu"] = [
+        {"pid": 1, "name": "<script>x</script>", "cpu_percent": 1.0, "memory_percent": 2.0}]
+    data["files"]["directory"] = "/srv/<b>&data"
+    data["system"]["hostname"] = 'web"1<'
+    variables = get_template_variables(data)
+
+    assert "&lt;script&gt;x&lt;/script&gt;" in variables["processes_top_cpu_html"]
+    assert "<script>" not in variables["processes_top_cpu_html"]
+    assert variables["files_directory"] == "/srv/&lt;b&gt;&amp;data"
+    assert variables["system_hostname"] == "web&quot;1&lt;"
+    assert variables["page_refresh_html"].startswith("<meta ")
+
+    template = compile_template("<ul>{{rows}}</ul>")
+    chunks = list(template.iter_render({"rows": "<li>a</li>"}))
+    assert chunks == ["<ul>", "<li>a</li>", "</ul>"]
+    assert write_atomic(tmp_path / "page.html", iter(chunks)) == 19
+    assert (tmp_path / "page.html").read_text(encoding="utf-8") == "<ul><li>a</li></ul>"
+
+
+def start_test_server(collect, interval=60.0, **options):
+    """Start the dashboard server on a free port, return (server, sampler, url)."""
+    template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "template.html")
+    server, sampler = create_server(collect, template_path, port=0, interval=interval, **options)
+    sampler.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, sampler, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stop_test_server(server, sampler):
+    """Stop a server started by start_test_server."""
+    sampler.stop()
+    server.shutdown()
+    server.server_close()
+
+
+def test_server_renders_once_and_supports_etag():
+    """Many requests reuse one rendered snapshot; ETags give 304."""
+    calls = []
+
+    def collect():
+        calls.append(1)
+        return {"timestamp": "2024-01-15 10:30:00", "system": {"hostname": "test-vm"}}
+
+    server, sampler, url = start_test_server(collect)
+    try:
+        for _ in range(5):
+            with urllib.request.urlopen(url + "/") as response:
+                page = response.read().decode("utf-8")
+        assert "test-vm" in page
+
+        with urllib.request.urlopen(url + "/api/data") as response:
+            etag = response.headers["ETag"]
+            assert json.loads(response.read())["system"]["hostname"] == "test-vm"
+
+        request = urllib.request.Request(url + "/api/data", headers={"If-None-Match": etag})
+        try:
+            urllib.request.urlopen(request)
+            status = 200
+        except urllib.error.HTTPError as e:
+            status = e.code
+        assert status == 304
+        assert len(calls) == 1
+    finally:
+        stop_test_server(server, sampler)
+
+
+def read_event(stream):
+    """Read one Server-Sent Event, return (event name, data)."""
+    event, data = None, None
+    while True:
+        line = stream.readline().decode("utf-8").rstrip("\n")
+        if not line:
+            if data is not None:
+                return event, json.loads(data)
+            continue
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = line[len("data: "):]
+
+
+def test_server_events_push_changed_variables():
+    """/events sends all variables first, then only the changed ones."""
+    ticks = iter(["10:30:00", "10:30:01"])
+
+    def collect():
+        return {"timestamp": f"2024-01-15 {next(ticks)}", "system": {"hostname": "test-vm"}}
+
+    server, sampler, url = start_test_server(collect)
+    try:
+        with urllib.request.urlopen(url + "/") as response:
+            page = response.read().decode("utf-8")
+        assert '<meta http-equiv="refresh"' not in page
+        assert 'data-var="timestamp"' in page
+
+        with urllib.request.urlopen(url + "/events", timeout=10) as stream:
+            assert stream.headers["Content-Type"] == "text/event-stream"
+            event, variables = read_event(stream)
+            assert event == "full"
+            assert variables["system_hostname"] == "test-vm"
+
+            sampler.sample_once()
+            event, changes = read_event(stream)
+            assert event == "patch"
+            assert changes["timestamp"] == "2024-01-15 10:30:01"
+            # Only the values that changed (stage timings vary with each sample)
+            assert set(changes) <= {"timestamp", "timings_html", "timings_total"}
+    finally:
+        stop_test_server(server, sampler)
+
+
+def test_template_slots_have_live_update_hooks():
+    """Every value slot of template.html is patched by the /events client."""
+    import re
+
+    template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "template.html")
+    with open(template_path, encoding="utf-8") as f:
+        page = f.read()
+    # Head-only slots: the meta refresh and the title (set by the script)
+    body = page[page.index("<body>"):]
+
+    missing = []
+    for match in re.finditer(r"\{\{(\w+)\}\}", body):
+        name = match.group(1)
+        before = body[:match.start()]
+        tag = before[before.rindex("<"):]
+        if ">" in tag:
+            # Text slot: the element right around it carries its hook
+            opening, _, text = tag.partition(">")
+            hooked = not text.strip() and (f'data-var="{name}"' in opening
+                                           or f'data-html-var="{name}"' in opening)
+        else:
+            # Attribute slot (gauge width or colour class)
+            element = tag + body[match.start():body.index(">", match.end())]
+            hooked = f'data-width-var="{name}"' in element or f'data-class-var="{name}"' in element
+        if not hooked:
+            missing.append(name)
+    assert missing == []
+    assert 'setAttribute("aria-valuenow", value)' in page
+
+
+def test_format_metrics_types_and_labels():
+    """Metrics have TYPE lines, escaped labels and a down marker for failed collectors."""
+    raw_data = {
+        "cpu": {"cpu_percent": 12.5, "cpu_percent_per_core": [10.0, 15.0]},
+        "network": {"bytes_sent": 1000, "bytes_recv": 2000},
+        "files": {
+            "directory": '/home/a"b',
+            "total_files": 3,
+            "by_extension": {".txt": {"count": 3, "size": 42}},
+        },
+        "disk": {"error": "timeout after 10s"},
+    }
+
+    text = format_metrics(raw_data, age=1.5)
+
+    assert "# TYPE aaa_monitor_network_transmit_bytes_total counter" in text
+    assert "aaa_monitor_network_transmit_bytes_total 1000.0" in text
+    assert 'aaa_monitor_cpu_core_usage_percent{core="1"} 15.0' in text
+    assert 'aaa_monitor_files_by_extension_bytes{directory="/home/a\\"b",extension=".txt"} 42.0' in text
+    assert 'aaa_monitor_collector_up{collector="disk"} 0.0' in text
+    assert "aaa_monitor_disk_bytes" not in text
+    assert "aaa_monitor_data_age_seconds 1.5" in text
+
+
+def test_server_metrics_scrapes_share_one_collection():
+    """Concurrent scrapes within the TTL reuse the last collection."""
+    calls = []
+
+    def collect():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"timestamp": "2024-01-15 10:30:00", "processes": {"total_count": 42}}
+
+    server, sampler, url = start_test_server(collect)
+    try:
+        bodies = []
+
+        def scrape():
+            with urllib.request.urlopen(url + "/metrics") as response:
+                bodies.append(response.read().decode("utf-8"))
+
+        threads = [threading.Thread(target=scrape) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(bodies) == 8
+        assert all("aaa_monitor_processes 42.0" in body for body in bodies)
+        assert len(calls) == 1
+    finally:
+        stop_test_server(server, sampler)
+
+
+def test_server_scrapes_do_not_record_samples():
+    """Only sampler cycles run the per-sample hook, not /metrics collections."""
+    calls, recorded = [], []
+
+    def collect():
+        calls.append(1)
+        return {"timestamp": f"2024-01-15 10:30:{len(calls):02d}", "processes": {"total_count": 42}}
+
+    server, sampler, url = start_test_server(
+        collect, metrics_ttl=0, on_sample=lambda raw_data, data: recorded.append(raw_data["timestamp"]))
+    try:
+        for _ in range(3):
+            with urllib.request.urlopen(url + "/metrics") as response:
+                response.read()
+        sampler.sample_once()
+
+        assert len(calls) == 5
+        assert recorded == ["2024-01-15 10:30:01", "2024-01-15 10:30:05"]
+    finally:
+        stop_test_server(server, sampler)
+
+
+def test_served_history_records_cycles_only(tmp_path, monkeypatch):
+    """With --serve --history, scrapes add no history rows."""
+    import sqlite3
+
+    import monitor
+
+    history_path = str(tmp_path / "history.db")
+    monkeypatch.setattr(sys, "argv", ["monitor.py", "--serve", "--only", "cpu,memory",
+                                      "--history", history_path])
+    collect, record, cleanup = monitor.make_collector(monitor.parse_arguments())
+    server, sampler, url = start_test_server(collect, metrics_ttl=0, on_sample=record)
+    try:
+        for _ in range(3):
+            with urllib.request.urlopen(url + "/metrics") as response:
+                response.read()
+        sampler.sample_once()
+    finally:
+        stop_test_server(server, sampler)
+        cleanup()
+
+    with sqlite3.connect(history_path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM samples_raw").fetchone() == (2,)
+
+
+def test_served_alerts_count_cycles_only(capsys, monkeypatch):
+    """Scrapes do not advance the "for N samples" count of a rule."""
+    import monitor
+
+    monkeypatch.setattr(sys, "argv", ["monitor.py", "--serve", "--only", "memory",
+                                      "--alert", "memory >= 0 for 3"])
+    collect, record, cleanup = monitor.make_collector(monitor.parse_arguments())
+    server, sampler, url = start_test_server(collect, metrics_ttl=0, on_sample=record)
+    try:
+        for _ in range(4):
+            with urllib.request.urlopen(url + "/metrics") as response:
+                response.read()
+        sampler.sample_once()
+        assert "[FIRING]" not in capsys.readouterr().out
+
+        sampler.sample_once()
+        assert "[FIRING]" in capsys.readouterr().out
+    finally:
+        stop_test_server(server, sampler)
+        cleanup()
+
+
+# --- Snapshot export tests ---
+
+def test_snapshot_export_rotates_and_replays(tmp_path):
+    """Snapshots are appended, rotated and streamed back in order."""
+    snapshot = {
+        "timestamp": "2024-01-15 10:30:00",
+        "cpu": {"cpu_percent": 12.5, "cpu_percent_per_core": [10.0, 15.0]},
+        "files": {"by_extension": {".py": {"count": 2}}, "directory": "/data"},
+    }
+    now = [1000.0]
+    for name in ("snapshots.jsonl.gz", "snapshots.csv"):
+        path = tmp_path / name
+        with SnapshotExporter(path, max_bytes=300, keep=2, clock=lambda: now[0]) as exporter:
+            for i in range(12):
+                now[0] += 5
+                exporter.write(dict(snapshot, sequence=i))
+
+        replayed = read_snapshots(path)
+        assert next(replayed)["cpu"] == snapshot["cpu"]
+        rest = list(replayed)
+        assert [s["sequence"] for s in rest] == sorted(s["sequence"] for s in rest)
+        assert rest[-1]["sequence"] == 11
+        assert rest[-1]["files"] == snapshot["files"]
+        assert len(list(tmp_path.glob(f"snapshots-*{path.suffix}"))) == 2
+
+
+def test_snapshot_export_csv_keeps_types(tmp_path):
+    """Strings that look like numbers or booleans replay unchanged from CSV."""
+    snapshot = {
+        "timestamp": "2024-01-15 10:30:00",
+        "system": {"hostname": "1234", "os_version": "22.04", "boot_time": "True",
+                   "uptime_seconds": 3600, "python_version": ""},
+        "cpu": {"cpu_percent": 12.5, "cpu_freq": None, "cpu_percent_per_core": [10.0, 15.0]},
+        "network": {"interfaces": {"0": "10.0.0.5"}, "up": True},
+    }
+    path = tmp_path / "snapshots.csv"
+    with SnapshotExporter(path, clock=lambda: 1000.0) as exporter:
+        exporter.write(snapshot)
+
+    replayed = next(read_snapshots(path))
+    assert replayed.pop("exported_at") == 1000.0
+    # None cells are left out
+    del snapshot["cpu"]["cpu_freq"]
+    assert replayed == snapshot
+
+    # Non-finite numbers keep their type; a cell that is not JSON is kept as text
+    assert math.isnan(parse_cell(encode_cell(float("nan"))))
+    assert parse_cell(encode_cell(float("-inf"))) == float("-inf")
+    assert parse_cell("True") == "True" and parse_cell("1.5x") == "1.5x"
+
+
+def test_snapshot_export_ignores_neighbouring_exports(tmp_path):
+    """Files sharing the export's name prefix are neither replayed nor removed."""
+    neighbour = tmp_path / "metrics-raw.jsonl"
+    neighbour.write_text('{"sequence": -1}\n')
+    now = [1_700_000_000.0]
+    path = tmp_path / "metrics.jsonl"
+    with SnapshotExporter(path, max_bytes=50, keep=1, clock=lambda: now[0]) as exporter:
+        for i in range(12):
+            now[0] += 5
+            exporter.write({"sequence": i, "padding": "x" * 40})
+
+    sequences = [snapshot["sequence"] for snapshot in read_snapshots(path)]
+    assert -1 not in sequences and sequences == sorted(sequences)
+    assert neighbour.read_text() == '{"sequence": -1}\n'
+    assert len(list(tmp_path.glob("metrics-2*.jsonl"))) == 1
+
+
+# --- Snapshot model tests ---
+
+def test_snapshot_model_round_trip_and_smaller():
+    """A compact snapshot rebuilds the same data and renders the same page."""
+    raw_data = json.loads(json.dumps(collect_all(files_directory=".")))
+    raw_data["files"] = {"error": "timeout after 30s"}
+    snapshot = Snapshot.from_dict(raw_data)
+
+    assert snapshot.to_dict() == raw_data and snapshot == raw_data
+    assert isinstance(snapshot.record("cpu").cpu_percent_per_core, array)
+    assert not hasattr(snapshot.record("memory"), "total_formatted")
+    assert snapshot["memory"]["total_formatted"] == raw_data["memory"]["total_formatted"]
+    assert get_template_variables(snapshot) == get_template_variables(raw_data)
+    assert deep_size(snapshot) < deep_size(raw_data) * 0.75
+
+
+# --- Collector cache tests ---
+
+def test_collector_cache_serves_stale_while_refreshing():
+    """A stale section is returned at once and refreshed in the background."""
+    now = [0.0]
+    memory_values = iter([{"percent": 10}, {"percent": 20}])
+    release = threading.Event()
+    files_calls = []
+
+    def slow_files():
+        # Refreshes run on daemon workers: a hung one does not block exit
+        files_calls.append(threading.current_thread().daemon)
+        if len(files_calls) > 1:
+            release.wait(5)
+        return {"total_files": len(files_calls)}
+
+    cache = CollectorCache(
+        {"memory": lambda: next(memory_values), "files": slow_files},
+        ttls={"memory": 1, "files": 600},
+        clock=lambda: now[0],
+    )
+    try:
+        sections, ages = cache.collect()
+        assert sections["memory"] == {"percent": 10}
+        assert sections["files"] == {"total_files": 1}
+
+        # files is stale and blocked: the previous value is served meanwhile
+        now[0] = 700.0
+        sections, ages = cache.collect()
+        assert sections["files"] == {"total_files": 1}
+        assert ages["files"] == 700.0
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while any(entry.future for entry in cache.entries.values()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sections, ages = cache.collect()
+        assert sections["memory"] == {"percent": 20}
+        assert sections["files"] == {"total_files": 2}
+        assert ages == {"memory": 0.0, "files": 0.0}
+        assert files_calls == [True, True]
+    finally:
+        cache.close()
+
+
+# --- Fleet tests ---
+
+def test_fleet_polls_local_agents(tmp_path):
+    """Agents are polled over kept-alive connections; dead ones are backed off."""
+    servers = []
+    for i in range(3):
+        def collect(i=i):
+            return {"system": {"hostname": f"node-{i}"}, "cpu": {"cpu_percent": 10.0 * i}}
+        server = create_agent_server(collect, host="127.0.0.1", port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+
+    # A port nobody listens on
+    dead = create_agent_server(lambda: {}, host="127.0.0.1", port=0)
+    dead_address = f"127.0.0.1:{dead.server_address[1]}"
+    dead.server_close()
+
+    addresses = [f"127.0.0.1:{server.server_address[1]}" for server in servers] + [dead_address]
+    collector = FleetCollector(addresses, timeout=2, backoff=60)
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(collector.poll_once()) == 4
+        assert loop.run_until_complete(collector.poll_once()) == 3
+
+        for client in collector.clients[:3]:
+            assert client.connections == 1
+        host = collector.hosts[addresses[1]]
+        assert host["status"] == "up"
+        assert host["data"]["system"]["hostname"] == "node-1"
+        assert host["version"] == 2
+        assert collector.hosts[dead_address]["status"] == "down"
+        assert collector.hosts[dead_address]["failures"] == 1
+
+        template_dir = os.path.dirname(os.path.dirname(__file__))
+        assert generate_fleet(
+            collector.hosts,
+            os.path.join(template_dir, "fleet_template.html"),
+            os.path.join(template_dir, "template.html"),
+            tmp_path,
+        )
+        overview = (tmp_path / "fleet.html").read_text()
+        assert "node-2" in overview
+        assert 'href="fleet-127-0-0-1-' in overview
+        assert "<strong>3</strong> / 4" in overview
+        assert len(list(tmp_path.glob("fleet-*.html"))) == 3
+    finally:
+        loop.run_until_complete(collector.close())
+        loop.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_fleet_page_names_are_unique():
+    """Agent names that slug the same still get their own page."""
+    from src.core.fleet_processor import host_page_name
+
+    names = ["10.0.0.5:8000", "10-0-0-5:8000", "a.b", "a-b", "a b"]
+    pages = [host_page_name(name) for name in names]
+    assert len(set(pages)) == len(names)
+    assert pages[0].startswith("fleet-10-0-0-5-8000-") and pages[0] == host_page_name(names[0])
+
+
+# --- Scheduler tests ---
+
+def test_run_periodic_no_drift():
+    """Cycles stay aligned on the interval and overruns skip slots."""
+    now = [0.0]
+    starts = []
+    durations = iter([0.3, 2.5, 0.1])
+
+    def task():
+        starts.append(now[0])
+        now[0] += next(durations)
+        return True
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    failures = run_periodic(task, 1.0, max_cycles=3, clock=lambda: now[0], sleep=sleep)
+
+    assert failures == 0
+    assert starts == [0.0, 1.0, 4.0]
+
+
+# --- Instrumentation tests ---
+
+def test_stage_timings_cover_pipeline(tmp_path):
+    """Every collector, processing step and render is recorded as a stage."""
+    (tmp_path / "a.txt").write_text("a")
+    timings = StageTimings()
+    raw_data = collect_all(files_directory=str(tmp_path), timings=timings)
+    raw_data["cpu"] = {"error": "timeout after 5s"}
+    data = process_all(raw_data, timings)
+    variables = get_template_variables(raw_data, data, timings)
+    template = tmp_path / "t.html"
+    template.write_text("<p>{{cpu_percent}}</p>")
+    assert generate_file(str(template), variables, str(tmp_path / "out.html"), timings)
+
+    summary = timings.as_dict()
+    stages = {stage["stage"]: stage for stage in summary["stages"]}
+    assert {"collect.files", "process.cpu", "render.load", "render"} <= set(stages)
+    assert stages["collect.files"]["items"] == 1
+    assert all(stage["seconds"] >= 0 for stage in summary["stages"])
+    assert "render.load" in timings.format_table(budget=1.0)
+    assert json.loads(json.dumps(summary))["total_seconds"] >= stages["render"]["seconds"]
+    assert "collect.files" in variables["timings_html"]
+
+
+def test_timings_total_counts_nested_stages_once():
+    """A stage run inside another one does not add to the total twice."""
+    timings = StageTimings()
+
+    def collect():
+        return timings.call("collect.cpu", time.sleep, 0.1)
+
+    timings.call("collect", collect)
+    raw_data = collect_all(sections=["system"])
+    variables = get_template_variables(raw_data, timings=timings)
+
+    stages = {stage["stage"]: stage["seconds"] for stage in timings.as_dict()["stages"]}
+    nested_sum = (stages["collect"] + stages["collect.cpu"]) * 1000
+    total_ms = float(variables["timings_total"].split()[0])
+    assert stages["collect"] * 1000 <= total_ms < nested_sum - 50
+
+
 # --- Full pipeline test ---
 
 def test_pipeline():
@@ -61,3 +1077,64 @@ def test_pipeline():
     # Step 3: Verify we have variables for HTML
     assert "cpu_percent" in variables
     assert "memory_percent" in variables
+
+
+def test_pipeline_with_failed_sections():
+    """Sections with an error marker still produce template variables."""
+    data = collect_all(files_directory=".", parallel=True)
+    data["cpu"] = {"error": "timeout after 5s"}
+    data["files"] = {"error": "PermissionError: denied"}
+
+    variables = get_template_variables(data)
+
+    assert variables["cpu_percent"] == 0
+    assert variables["files_total"] == 0
+
+
+def test_pipeline_only_sections():
+    """Collecting a subset of sections skips the others but still renders."""
+    data = collect_all(sections=("cpu", "memory"))
+    assert set(data) == {"timestamp", "cpu", "memory"}
+
+    variables = get_template_variables(data)
+    assert variables["memory_percent"] == data["memory"]["percent"]
+    assert variables["disk_percent"] == 0
+
+
+def test_daemon_flushes_history_on_sigterm(tmp_path):
+    """SIGTERM stops the daemon through the Ctrl+C path, flushing the history."""
+    history = tmp_path / "history.db"
+    output = tmp_path / "out.html"
+    command = [sys.executable, "monitor.py", "--daemon", "--interval", "0.2", "--only", "cpu,memory",
+               "--history", str(history), "--output", str(output), "--state-dir", str(tmp_path)]
+    process = subprocess.Popen(command, cwd=Path(__file__).resolve().parent.parent,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        deadline = time.monotonic() + 20
+        while not output.exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        time.sleep(0.5)
+        process.send_signal(signal.SIGTERM)
+        stdout, _ = process.communicate(timeout=20)
+    finally:
+        process.kill()
+
+    assert process.returncode == 0, stdout
+    assert "Daemon stopped." in stdout
+    # Fewer samples than one batch: only close() writes them
+    connection = sqlite3.connect(history)
+    try:
+        assert connection.execute("SELECT COUNT(*) FROM samples_raw").fetchone()[0] >= 2
+    finally:
+        connection.close()
+
+
+def test_package_imports_are_lazy():
+    """Importing the packages does not load psutil or asyncio until used."""
+    code = ("import sys, src, src.data, src.core, src.api; "
+            "from src.data import counter_rates; "
+            "print('psutil' in sys.modules, 'asyncio' in sys.modules); "
+            "src.data.CollectorCache; print('psutil' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=Path(__file__).resolve().parent.parent, check=True)
+    assert result.stdout.split() == ["False", "False", "False"]